@@ -81,6 +81,24 @@ class BrandArcAPI {
         });
     }
 
+    /**
+     * Search saved names, e.g. { prefix: 'nov', minScore: 80, sort: 'score' }
+     */
+    async searchNames(query = {}) {
+        return this.request(`/api/brand/names/search?${new URLSearchParams(query)}`, {
+            method: 'GET'
+        });
+    }
+
+    /**
+     * Get the most often generated names, e.g. { industry: 'Technology', limit: 10 }
+     */
+    async getPopularNames(query = {}) {
+        return this.request(`/api/brand/names/popular?${new URLSearchParams(query)}`, {
+            method: 'GET'
+        });
+    }
+
     // =====================
     // Logo API
     // =====================
@@ -159,11 +177,12 @@ class BrandArcAPI {
 
     /**
      * Generate design system
+     * options: { primaryColor, palette, tone }
      */
-    async generateDesignSystem(brandName) {
+    async generateDesignSystem(brandName, options = {}) {
         return this.request('/api/design-system/generate', {
             method: 'POST',
-            body: JSON.stringify({ brandName })
+            body: JSON.stringify({ brandName, ...options })
         });
     }
 
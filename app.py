@@ -2,12 +2,21 @@
 BrandArc Backend - Modular Flask Application
 Main application file with blueprint registration
 """
-from flask import Flask, jsonify, send_from_directory
+from flask import Flask, Response, jsonify, send_from_directory
 from flask_cors import CORS
 from config import get_config
+from utils.compression import init_compression
+from utils.json_provider import FastJSONProvider
+from utils.metrics import REGISTRY, instrument_app
+from utils.profiler import init_profiling
+from utils.rate_limit import init_rate_limiting
+from utils.response_cache import cached_response
+from services.content_service import ContentService
+from startup import REPORT, Lazy, resolve
+from importlib import import_module
 import os
 
-# Import blueprints
+# Import blueprints (eagerly: Flask takes no new routes once it has served a request)
 from api.brand import brand_bp
 from api.logo import logo_bp
 from api.auth import auth_bp
@@ -24,8 +33,41 @@ def create_app(config_name=None):
     config_class = get_config()
     app.config.from_object(config_class)
     
+    # JSON encoding (orjson when installed)
+    if config_class.JSON_FAST_ENCODER:
+        app.json = FastJSONProvider(app)
+    
     # Enable CORS
-    CORS(app, origins=config_class.CORS_ORIGINS)
+    CORS(app, origins=config_class.CORS_ORIGINS,
+         expose_headers=['Retry-After', 'X-RateLimit-Limit', 'X-RateLimit-Remaining', 'X-RateLimit-Reset'])
+    
+    # Per-endpoint latency / throughput metrics
+    if config_class.METRICS_ENABLED:
+        instrument_app(app)
+    
+    # Per-client token buckets (after metrics, so rejected requests are counted)
+    if config_class.RATE_LIMIT_ENABLED:
+        init_rate_limiting(app)
+    
+    # Opt-in sampling profiler
+    if config_class.PROFILING_ENABLED:
+        init_profiling(app)
+    
+    # gzip / brotli for large responses
+    if config_class.COMPRESSION_ENABLED:
+        init_compression(app)
+    
+    # Palettes (cached per (baseColor, scheme)) and design systems; with
+    # LAZY_INIT numpy and the color math are only loaded on first use
+    eager = not config_class.LAZY_INIT
+    palette_service = Lazy('palette_service', lambda: import_module('services.palette_service')
+                           .create_palette_service(config_class), eager=eager)
+    app.extensions['palette_service'] = palette_service
+    content_service = ContentService()
+    app.extensions['content_service'] = content_service
+    design_system_service = Lazy('design_system_service', lambda: import_module('services.design_system_service')
+                                 .create_design_system_service(config_class), eager=eager)
+    app.extensions['design_system_service'] = design_system_service
     
     # Register blueprints
     app.register_blueprint(brand_bp, url_prefix='/api/brand')
@@ -38,151 +80,242 @@ def create_app(config_name=None):
     def generate_palette():
         """Generate color palettes"""
         from flask import request
-        import random
+        from services.palette_service import normalize_color
         
-        data = request.get_json()
+        data = request.get_json(silent=True)
+        if data is None:
+            data = {}
+        if not isinstance(data, dict):
+            return jsonify({
+                'success': False,
+                'error': 'Request body must be a JSON object'
+            }), 400
         base_color = data.get('baseColor', '#6366f1')
         scheme = data.get('scheme', 'complementary')
         
-        palettes = []
-        for i in range(5):
-            colors = [base_color]
-            for _ in range(4):
-                colors.append(f'#{random.randint(0, 255):02x}{random.randint(0, 255):02x}{random.randint(0, 255):02x}')
-            
-            palettes.append({
-                'id': f'palette_{i+1}',
-                'name': f'{scheme.capitalize()} Palette {i+1}',
-                'colors': colors,
-                'scheme': scheme
-            })
+        # Palettes are deterministic per (baseColor, scheme), so `seed` is not needed
+        try:
+            palettes = palette_service.generate(base_color, scheme)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
         
         return jsonify({
             'success': True,
             'data': {
-                'palettes': palettes
+                'palettes': palettes,
+                'baseColor': normalize_color(base_color)
             }
         }), 200
     
+    @app.route('/api/palette/generate/batch', methods=['POST'])
+    def generate_palette_batch():
+        """
+        Generate palettes for many base colors or brand names in one request
+        
+        Request JSON:
+        {
+            "jobs": [
+                {"baseColor": "#6366f1", "scheme": "triadic"},
+                {"brandName": "Nexora", "scheme": "analogous"}
+            ]
+        }
+        
+        A job without baseColor gets a stable color derived from brandName.
+        Response (application/x-ndjson), one line per job in request order:
+        {"index": 0, "success": true, "data": {"palettes": [...], "baseColor": "#6366f1"}}
+        """
+        from flask import request
+        from services.palette_service import normalize_color, normalize_scheme
+        
+        data = request.get_json(silent=True)
+        jobs = data.get('jobs') if isinstance(data, dict) else None
+        if not isinstance(jobs, list) or not jobs:
+            return jsonify({
+                'success': False,
+                'error': 'A non-empty "jobs" list is required'
+            }), 400
+        if len(jobs) > config_class.MAX_BATCH_JOBS:
+            return jsonify({
+                'success': False,
+                'error': f'Too many jobs (max {config_class.MAX_BATCH_JOBS})'
+            }), 400
+        
+        # Validate every job first, then build all palettes in one vectorized pass
+        lines = [None] * len(jobs)
+        valid = []
+        named = [i for i, job in enumerate(jobs)
+                 if isinstance(job, dict) and not job.get('baseColor') and isinstance(job.get('brandName'), str)]
+        name_colors = dict(zip(named, palette_service.colors_for_names([jobs[i]['brandName'] for i in named])))
+        for i, job in enumerate(jobs):
+            try:
+                if not isinstance(job, dict):
+                    raise ValueError('Job must be an object')
+                if job.get('brandName') is not None and not isinstance(job['brandName'], str):
+                    raise ValueError('brandName must be a string')
+                base_color = name_colors.get(i) or normalize_color(job.get('baseColor', '#6366f1'))
+                valid.append((i, base_color, normalize_scheme(job.get('scheme', 'complementary'))))
+            except ValueError as e:
+                lines[i] = {'index': i, 'success': False, 'error': str(e)}
+        
+        results = palette_service.generate_many([(color, scheme) for _, color, scheme in valid])
+        for (i, base_color, _), palettes in zip(valid, results):
+            line = {'index': i, 'success': True, 'data': {'palettes': palettes, 'baseColor': base_color}}
+            if isinstance(jobs[i].get('brandName'), str):
+                line['data']['brandName'] = jobs[i]['brandName']
+            lines[i] = line
+        
+        dumps = app.json.dumps
+        return Response((dumps(line) + '\n' for line in lines), mimetype='application/x-ndjson')
+    
     @app.route('/api/content/generate', methods=['POST'])
     def generate_content():
         """Generate marketing content"""
         from flask import request
-        import random
         
         data = request.get_json()
-        content_type = data.get('type', 'tagline')
-        brand_name = data.get('brandName', 'BrandArc')
-        industry = data.get('industry', 'Technology')
-        tone = data.get('tone', 'Professional')
-        
-        templates = {
-            'tagline': [
-                f"{brand_name} - Where Innovation Meets Excellence",
-                f"Transform Your {industry} Experience with {brand_name}",
-                f"{brand_name}: Empowering {industry} for Tomorrow",
-                f"The Future of {industry} Starts Here",
-            ],
-            'description': [
-                f"{brand_name} is a leading {industry} platform that helps businesses grow and succeed through innovative solutions.",
-                f"Discover how {brand_name} is revolutionizing the {industry} industry with cutting-edge technology and expert insights.",
-                f"Join thousands of satisfied customers who trust {brand_name} for their {industry} needs.",
-            ],
-            'social': [
-                f"🚀 Excited to announce our latest update! #Innovation #{industry}",
-                f"💡 Did you know? {brand_name} helps you achieve more in less time.",
-                f"🌟 Join us on this incredible journey. Let's transform {industry} together!",
-            ]
-        }
-        
-        content_list = templates.get(content_type, templates['tagline'])
-        results = []
-        
-        for text in content_list:
-            results.append({
-                'text': text,
-                'type': content_type,
-                'tone': tone,
-                'length': len(text)
-            })
+        content = content_service.generate(
+            data.get('type', 'tagline'),
+            data.get('brandName', 'BrandArc'),
+            data.get('industry', 'Technology'),
+            data.get('tone', 'Professional')
+        )
         
         return jsonify({
             'success': True,
             'data': {
-                'content': results
+                'content': content
             }
         }), 200
     
+    @app.route('/api/content/generate/batch', methods=['POST'])
+    def generate_content_batch():
+        """
+        Generate marketing content for many brands in one request
+        
+        Request JSON:
+        {
+            "types": ["tagline", "social"],
+            "jobs": [
+                {"brandName": "Nexora", "industry": "Technology", "tone": "Modern"},
+                {"brandName": "Crumbly", "industry": "Food", "types": ["description"]}
+            ]
+        }
+        
+        "types" (or a single "type") applies to every job that does not set its own.
+        Unknown types are rejected (per job, or with 400 at the top level).
+        Response (application/x-ndjson), one line per job, written as it is rendered:
+        {"index": 0, "success": true, "data": {"brandName": "Nexora", "content": [...]}}
+        """
+        from flask import request
+        
+        data = request.get_json(silent=True)
+        jobs = data.get('jobs') if isinstance(data, dict) else None
+        if not isinstance(jobs, list) or not jobs:
+            return jsonify({
+                'success': False,
+                'error': 'A non-empty "jobs" list is required'
+            }), 400
+        if len(jobs) > config_class.MAX_CONTENT_BATCH:
+            return jsonify({
+                'success': False,
+                'error': f'Too many jobs (max {config_class.MAX_CONTENT_BATCH})'
+            }), 400
+        
+        def content_types(spec, default):
+            types = spec.get('types', spec.get('type'))
+            if types is None:
+                return default
+            if isinstance(types, str):
+                types = [types]
+            if not (isinstance(types, list) and types and all(isinstance(t, str) for t in types)):
+                raise ValueError('"types" must be a content type or a non-empty list of them')
+            unknown = [t for t in types if t not in content_service.plans]
+            if unknown:
+                raise ValueError(f'Unknown content type {unknown[0]!r}, expected one of: '
+                                 f'{", ".join(content_service.types)}')
+            # Each type is rendered once, in the order first given
+            return list(dict.fromkeys(types))
+        
+        try:
+            default_types = content_types(data, ['tagline'])
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        def generate():
+            dumps = app.json.dumps
+            for i, job in enumerate(jobs):
+                try:
+                    if not isinstance(job, dict):
+                        raise ValueError('Job must be an object')
+                    types = content_types(job, default_types)
+                    brand_name = job.get('brandName', 'BrandArc')
+                    industry = job.get('industry', 'Technology')
+                    tone = job.get('tone', 'Professional')
+                    content = []
+                    for content_type in types:
+                        content.extend(content_service.generate(content_type, brand_name, industry, tone))
+                    line = {'index': i, 'success': True, 'data': {'brandName': brand_name, 'content': content}}
+                except ValueError as e:
+                    line = {'index': i, 'success': False, 'error': str(e)}
+                yield dumps(line) + '\n'
+        
+        return Response(generate(), mimetype='application/x-ndjson')
+    
+    def design_system_response(fmt, data):
+        """A design system format, served from the pre-serialized cache (ETag / 304)"""
+        from services.design_system_service import FORMATS, normalize_inputs
+        
+        try:
+            key = normalize_inputs(data.get('primaryColor'), data.get('palette'), data.get('tone'))
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        return cached_response(
+            design_system_service.cache, (fmt, *key),
+            lambda: design_system_service.render(fmt, key, app.json.dumps),
+            mimetype=FORMATS[fmt]
+        )
+    
     @app.route('/api/design-system/generate', methods=['POST'])
     def generate_design_system():
-        """Generate complete design system"""
+        """
+        Generate complete design system
+        
+        Request JSON (all optional):
+        {"brandName": "BrandArc", "primaryColor": "#6366f1", "palette": ["#6366f1", ...], "tone": "Modern"}
+        
+        Responses are identical for identical inputs and carry a strong ETag;
+        If-None-Match with that ETag is answered with 304.
+        """
         from flask import request
         
-        data = request.get_json()
-        brand_name = data.get('brandName', 'BrandArc')
+        data = request.get_json(silent=True)
+        return design_system_response('json', data if isinstance(data, dict) else {})
+    
+    @app.route('/api/design-system/export/<fmt>', methods=['GET', 'POST'])
+    def export_design_system(fmt):
+        """
+        Export a design system as CSS custom properties (css) or design tokens JSON (tokens)
         
-        design_system = {
-            'colors': {
-                'primary': '#6366f1',
-                'secondary': '#8b5cf6',
-                'accent': '#ec4899',
-                'success': '#10b981',
-                'warning': '#f59e0b',
-                'error': '#ef4444',
-                'background': '#ffffff',
-                'surface': '#f8fafc',
-                'text': '#1e293b',
-                'textSecondary': '#64748b'
-            },
-            'typography': {
-                'fontFamily': "'Inter', sans-serif",
-                'headingFont': "'Poppins', sans-serif",
-                'fontSize': {
-                    'xs': '12px',
-                    'sm': '14px',
-                    'base': '16px',
-                    'lg': '18px',
-                    'xl': '20px',
-                    '2xl': '24px',
-                    '3xl': '30px',
-                    '4xl': '36px'
-                },
-                'fontWeight': {
-                    'normal': 400,
-                    'medium': 500,
-                    'semibold': 600,
-                    'bold': 700
-                }
-            },
-            'spacing': {
-                'xs': '4px',
-                'sm': '8px',
-                'md': '16px',
-                'lg': '24px',
-                'xl': '32px',
-                '2xl': '48px'
-            },
-            'borderRadius': {
-                'sm': '4px',
-                'md': '8px',
-                'lg': '12px',
-                'xl': '16px',
-                'full': '9999px'
-            },
-            'shadows': {
-                'sm': '0 1px 2px 0 rgba(0, 0, 0, 0.05)',
-                'md': '0 4px 6px -1px rgba(0, 0, 0, 0.1)',
-                'lg': '0 10px 15px -3px rgba(0, 0, 0, 0.1)',
-                'xl': '0 20px 25px -5px rgba(0, 0, 0, 0.1)'
-            }
-        }
+        Inputs as for /api/design-system/generate, in the JSON body or the
+        query string (palette as comma-separated colors).
+        """
+        from flask import request
         
-        return jsonify({
-            'success': True,
-            'data': {
-                'designSystem': design_system
-            }
-        }), 200
+        if fmt not in ('css', 'tokens'):
+            return jsonify({
+                'success': False,
+                'error': f'Unknown format {fmt!r}, expected css or tokens'
+            }), 404
+        
+        data = request.get_json(silent=True) if request.method == 'POST' else None
+        if not isinstance(data, dict):
+            data = request.args.to_dict()
+            if data.get('palette'):
+                data['palette'] = [color for color in data['palette'].split(',') if color.strip()]
+        return design_system_response(fmt, data)
     
     # Root and utility routes
     @app.route('/')
@@ -212,6 +345,13 @@ def create_app(config_name=None):
             'version': '1.0.0'
         })
     
+    @app.route('/metrics')
+    def metrics():
+        """Prometheus metrics endpoint"""
+        if not app.config['METRICS_ENABLED']:
+            return not_found(None)
+        return Response(REGISTRY.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+    
     # Error handlers
     @app.errorhandler(404)
     def not_found(e):
@@ -239,6 +379,20 @@ def create_app(config_name=None):
     
     return app
 
+def warm_up(app):
+    """
+    Build everything LAZY_INIT defers, plus the brand service's candidate
+    indexes (serve.py runs this once before forking workers).
+    
+    Returns the number of candidate indexes built.
+    """
+    from api.brand import brand_service
+    
+    for service in (app.extensions['palette_service'], app.extensions['design_system_service'], brand_service):
+        resolve(service)
+    with REPORT.step('warm brand_service candidate indexes'):
+        return brand_service.warm()
+
 if __name__ == '__main__':
     app = create_app()
     
@@ -251,7 +405,9 @@ if __name__ == '__main__':
     print("\n📋 Available API Endpoints:")
     print("   Brand Generation:")
     print("   - POST /api/brand/generate")
+    print("   - POST /api/brand/generate/batch")
     print("   - POST /api/brand/check-availability")
+    print("   - POST /api/brand/check-availability/batch")
     print("   - GET  /api/brand/suggestions")
     print("\n   Logo Generation:")
     print("   - POST /api/logo/generate")
@@ -270,11 +426,15 @@ if __name__ == '__main__':
     print("   - DEL  /api/chat/clear")
     print("\n   Other Services:")
     print("   - POST /api/palette/generate")
+    print("   - POST /api/palette/generate/batch")
     print("   - POST /api/content/generate")
+    print("   - POST /api/content/generate/batch")
     print("   - POST /api/design-system/generate")
+    print("   - GET  /api/design-system/export/<css|tokens>")
     print("\n   Utility:")
     print("   - GET  / (API info)")
     print("   - GET  /health (Health check)")
+    print("   - GET  /metrics (Prometheus metrics)")
     print("\n✅ Server ready to accept requests!")
     print("="*60 + "\n")
     
@@ -0,0 +1,566 @@
+"""
+Availability Service
+Pluggable domain, trademark and social handle lookups behind a shared cache
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import quote
+
+SOCIAL_NETWORKS = ('twitter', 'instagram', 'facebook')
+
+def normalize_name(name):
+    """Normalize a brand name into the label used for lookups and cache keys"""
+    return ''.join(name.split()).lower()
+
+def alternative_domains(label):
+    """(label, tld) pairs offered as alternatives to <label>.com"""
+    return [
+        (label, 'io'),
+        (label, 'ai'),
+        (label, 'co'),
+        (f'get{label}', 'com')
+    ]
+
+
+class AvailabilityProvider:
+    """
+    Interface for availability backends.
+
+    Names passed in are already normalized (see normalize_name). Real
+    registrar, trademark and social integrations subclass this.
+    """
+
+    def lookup_domain(self, label, tld):
+        """Return {'available': bool, 'price': int or None} for <label>.<tld>"""
+        raise NotImplementedError
+
+    def lookup_trademark(self, name):
+        """Return {'available': bool, 'conflicts': [str, ...]}"""
+        raise NotImplementedError
+
+    def lookup_social(self, handle, network):
+        """Return True if the handle is free on the given network"""
+        raise NotImplementedError
+
+    # Bulk lookups - override when the backend has a batch API
+
+    def lookup_domains(self, pairs):
+        """Return {(label, tld): lookup_domain result} for many domains"""
+        return {(label, tld): self.lookup_domain(label, tld) for label, tld in pairs}
+
+    def lookup_trademarks(self, names):
+        """Return {name: lookup_trademark result} for many names"""
+        return {name: self.lookup_trademark(name) for name in names}
+
+    def lookup_socials(self, pairs):
+        """Return {(handle, network): lookup_social result} for many handles"""
+        return {(handle, network): self.lookup_social(handle, network) for handle, network in pairs}
+
+
+class MockAvailabilityProvider(AvailabilityProvider):
+    """Random results - stands in for real APIs during development"""
+
+    def lookup_domain(self, label, tld):
+        available = random.choice([True, False])
+        return {
+            'available': available,
+            'price': random.randint(10, 50) if available else None
+        }
+
+    def lookup_trademark(self, name):
+        available = random.choice([True, False])
+        return {
+            'available': available,
+            'conflicts': [] if available else ['Similar trademark found in class 42']
+        }
+
+    def lookup_social(self, handle, network):
+        return random.choice([True, False])
+
+
+class AvailabilityCache:
+    """
+    Thread-safe LRU cache with per-entry TTLs.
+
+    "Available" results expire sooner than "taken" ones since a free name
+    can be registered at any moment, while a taken one rarely frees up.
+    """
+
+    def __init__(self, max_size=10000, ttl=3600, available_ttl=300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.available_ttl = available_ttl
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Return (hit, value) for a key"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, entry[1]
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def set(self, key, value, available):
+        """Store a lookup result; `available` selects the TTL"""
+        ttl = self.available_ttl if available else self.ttl
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'maxSize': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+
+class CachedAvailabilityProvider(AvailabilityProvider):
+    """
+    Wraps a provider with an AvailabilityCache keyed by (name, tld).
+
+    Trademark and social results share the cache under pseudo-TLDs
+    ('@trademark', '@twitter', ...) so one size bound covers everything.
+    """
+
+    def __init__(self, provider, cache=None):
+        self.provider = provider
+        self.cache = cache or AvailabilityCache()
+
+    def lookup_domain(self, label, tld):
+        return self._cached((label, tld), self.provider.lookup_domain, label, tld,
+                            available=lambda r: r['available'])
+
+    def lookup_trademark(self, name):
+        return self._cached((name, '@trademark'), self.provider.lookup_trademark, name,
+                            available=lambda r: r['available'])
+
+    def lookup_social(self, handle, network):
+        return self._cached((handle, f'@{network}'), self.provider.lookup_social, handle, network,
+                            available=bool)
+
+    def lookup_domains(self, pairs):
+        return self._cached_bulk(pairs, lambda pair: pair, self.provider.lookup_domains,
+                                 available=lambda r: r['available'])
+
+    def lookup_trademarks(self, names):
+        return self._cached_bulk(names, lambda name: (name, '@trademark'), self.provider.lookup_trademarks,
+                                 available=lambda r: r['available'])
+
+    def lookup_socials(self, pairs):
+        return self._cached_bulk(pairs, lambda pair: (pair[0], f'@{pair[1]}'), self.provider.lookup_socials,
+                                 available=bool)
+
+    def _cached(self, key, lookup, *args, available):
+        hit, value = self.cache.get(key)
+        if hit:
+            return value
+        value = lookup(*args)
+        self.cache.set(key, value, available(value))
+        return value
+
+    def _cached_bulk(self, items, cache_key, bulk_lookup, available):
+        """Serve cached items and send only the misses to the bulk lookup"""
+        results = {}
+        misses = []
+        for item in items:
+            hit, value = self.cache.get(cache_key(item))
+            if hit:
+                results[item] = value
+            else:
+                misses.append(item)
+        if misses:
+            for item, value in bulk_lookup(misses).items():
+                self.cache.set(cache_key(item), value, available(value))
+                results[item] = value
+        return results
+
+
+class LatencyStubProvider(AvailabilityProvider):
+    """
+    Adds artificial latency (seconds per lookup kind) in front of another
+    provider. Used to exercise timeouts and the concurrent path locally.
+    """
+
+    def __init__(self, provider=None, domain=0.0, trademark=0.0, social=0.0):
+        self.provider = provider or MockAvailabilityProvider()
+        self.latency = {'domain': domain, 'trademark': trademark, 'social': social}
+
+    def lookup_domain(self, label, tld):
+        time.sleep(self.latency['domain'])
+        return self.provider.lookup_domain(label, tld)
+
+    def lookup_trademark(self, name):
+        time.sleep(self.latency['trademark'])
+        return self.provider.lookup_trademark(name)
+
+    def lookup_social(self, handle, network):
+        time.sleep(self.latency['social'])
+        return self.provider.lookup_social(handle, network)
+
+    # Bulk calls pay the latency once, like a backend batch endpoint
+
+    def lookup_domains(self, pairs):
+        time.sleep(self.latency['domain'])
+        return self.provider.lookup_domains(pairs)
+
+    def lookup_trademarks(self, names):
+        time.sleep(self.latency['trademark'])
+        return self.provider.lookup_trademarks(names)
+
+    def lookup_socials(self, pairs):
+        time.sleep(self.latency['social'])
+        return self.provider.lookup_socials(pairs)
+
+
+class TrademarkIndexProvider(AvailabilityProvider):
+    """
+    Answers trademark lookups from a local similarity index (see
+    services.trademark_service.TrademarkIndex) and passes domain and social
+    lookups through to another provider.
+    """
+
+    def __init__(self, provider, index):
+        self.provider = provider
+        self.index = index
+
+    def lookup_domain(self, label, tld):
+        return self.provider.lookup_domain(label, tld)
+
+    def lookup_trademark(self, name):
+        return _trademark_result(self.index.search(name))
+
+    def lookup_social(self, handle, network):
+        return self.provider.lookup_social(handle, network)
+
+    def lookup_domains(self, pairs):
+        return self.provider.lookup_domains(pairs)
+
+    def lookup_trademarks(self, names):
+        return {name: _trademark_result(matches) for name, matches in self.index.search_bulk(names).items()}
+
+    def lookup_socials(self, pairs):
+        return self.provider.lookup_socials(pairs)
+
+
+def _trademark_result(matches):
+    """lookup_trademark result for TrademarkIndex matches"""
+    conflicts = []
+    for match in matches:
+        kind = 'Similar-sounding' if match['phonetic'] and match['distance'] else 'Similar'
+        if match['distance'] == 0:
+            kind = 'Identical'
+        where = f" in class {match['class']}" if match['class'] else ''
+        conflicts.append(f"{kind} trademark \"{match['mark']}\" found{where}")
+    return {
+        'available': not matches,
+        'conflicts': conflicts,
+        'matches': matches
+    }
+
+
+class AvailabilityFanout:
+    """
+    Runs the independent lookups for a name concurrently on a shared pool.
+
+    Each lookup kind ('domain', 'trademark', 'social') has its own pool,
+    sized to the kind's concurrency limit, so a slow backend only ties up
+    its own threads; kinds without a limit share a pool of `max_workers`.
+    Lookups still running at the deadline are reported as timed out; they
+    keep running in the background and fill the cache when they finish.
+    Lookups that never got a thread are cancelled and timed out too.
+    """
+
+    def __init__(self, max_workers=32, timeout=2.0, limits=None):
+        self.timeout = timeout
+        limits = limits or {'domain': 16, 'trademark': 4, 'social': 8}
+        self._executors = {
+            kind: ThreadPoolExecutor(max_workers=n, thread_name_prefix=f'availability-{kind}')
+            for kind, n in limits.items()
+        }
+        self._default_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='availability')
+
+    def run(self, lookups, timeout=None):
+        """
+        Run {key: (kind, fn, args)} lookups and wait up to `timeout` seconds.
+
+        Returns (results, timed_out): results maps each finished key to its
+        value; timed_out lists the keys that missed the deadline or failed.
+        """
+        futures = {
+            self._executors.get(kind, self._default_executor).submit(fn, *args): key
+            for key, (kind, fn, args) in lookups.items()
+        }
+        done, pending = wait(futures, timeout=self.timeout if timeout is None else timeout)
+
+        results = {}
+        timed_out = []
+        for future in done:
+            if future.exception() is None:
+                results[futures[future]] = future.result()
+            else:
+                timed_out.append(futures[future])
+        for future in pending:
+            future.cancel()
+            timed_out.append(futures[future])
+        return results, timed_out
+
+    def shutdown(self):
+        for executor in (*self._executors.values(), self._default_executor):
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# --- Async mode ------------------------------------------------------------------
+#
+# Async providers have the AvailabilityProvider methods, but every method
+# returns an awaitable. They are driven by an AsyncAvailabilityFanout, whose
+# event loop keeps any number of lookups in flight on one thread.
+
+class HTTPAvailabilityProvider(AvailabilityProvider):
+    """
+    Async lookups against an HTTP backend over pooled keep-alive connections
+    (utils.http_pool):
+        GET <base>/domains/<label>.<tld>       {"available": bool, "price": int or null}
+        GET <base>/trademarks/<name>           {"available": bool, "conflicts": [str, ...]}
+        GET <base>/social/<network>/<handle>   {"available": bool}
+
+    Bulk lookups send every request at once; lookups that fail are left out
+    of the result, so they show up as timed out.
+    """
+
+    def __init__(self, base_url, pool):
+        self.base_url = base_url.rstrip('/')
+        self.pool = pool
+
+    async def lookup_domain(self, label, tld):
+        data = await self.pool.get_json(f'{self.base_url}/domains/{_segment(label)}.{_segment(tld)}')
+        return {'available': bool(data['available']), 'price': data.get('price')}
+
+    async def lookup_trademark(self, name):
+        data = await self.pool.get_json(f'{self.base_url}/trademarks/{_segment(name)}')
+        return {'available': bool(data['available']), 'conflicts': list(data.get('conflicts', []))}
+
+    async def lookup_social(self, handle, network):
+        data = await self.pool.get_json(f'{self.base_url}/social/{_segment(network)}/{_segment(handle)}')
+        return bool(data['available'])
+
+    async def lookup_domains(self, pairs):
+        return await _gather_lookups(pairs, lambda pair: self.lookup_domain(*pair))
+
+    async def lookup_trademarks(self, names):
+        return await _gather_lookups(names, self.lookup_trademark)
+
+    async def lookup_socials(self, pairs):
+        return await _gather_lookups(pairs, lambda pair: self.lookup_social(*pair))
+
+
+def _segment(value):
+    # Escapes '/' too, so a name cannot change which backend path is requested
+    return quote(str(value), safe='')
+
+
+async def _gather_lookups(items, lookup):
+    items = list(items)
+    values = await asyncio.gather(*(lookup(item) for item in items), return_exceptions=True)
+    return {item: value for item, value in zip(items, values) if not isinstance(value, Exception)}
+
+
+class AsyncProviderAdapter(AvailabilityProvider):
+    """Makes a blocking provider async by running its calls on the loop's default executor"""
+
+    def __init__(self, provider):
+        self.provider = provider
+
+    def lookup_domain(self, label, tld):
+        return asyncio.to_thread(self.provider.lookup_domain, label, tld)
+
+    def lookup_trademark(self, name):
+        return asyncio.to_thread(self.provider.lookup_trademark, name)
+
+    def lookup_social(self, handle, network):
+        return asyncio.to_thread(self.provider.lookup_social, handle, network)
+
+    def lookup_domains(self, pairs):
+        return asyncio.to_thread(self.provider.lookup_domains, pairs)
+
+    def lookup_trademarks(self, names):
+        return asyncio.to_thread(self.provider.lookup_trademarks, names)
+
+    def lookup_socials(self, pairs):
+        return asyncio.to_thread(self.provider.lookup_socials, pairs)
+
+
+class AsyncCachedAvailabilityProvider(CachedAvailabilityProvider):
+    """CachedAvailabilityProvider around an async provider"""
+
+    async def _cached(self, key, lookup, *args, available):
+        hit, value = self.cache.get(key)
+        if hit:
+            return value
+        value = await lookup(*args)
+        self.cache.set(key, value, available(value))
+        return value
+
+    async def _cached_bulk(self, items, cache_key, bulk_lookup, available):
+        results = {}
+        misses = []
+        for item in items:
+            hit, value = self.cache.get(cache_key(item))
+            if hit:
+                results[item] = value
+            else:
+                misses.append(item)
+        if misses:
+            for item, value in (await bulk_lookup(misses)).items():
+                self.cache.set(cache_key(item), value, available(value))
+                results[item] = value
+        return results
+
+
+class AsyncTrademarkIndexProvider(TrademarkIndexProvider):
+    """TrademarkIndexProvider around an async provider (the index itself is local)"""
+
+    async def lookup_trademark(self, name):
+        return _trademark_result(self.index.search(name))
+
+    async def lookup_trademarks(self, names):
+        return {name: _trademark_result(matches) for name, matches in self.index.search_bulk(names).items()}
+
+
+class AsyncAvailabilityFanout:
+    """
+    AvailabilityFanout for async providers: lookups run as tasks on one
+    event loop thread per process, so a worker can have thousands in
+    flight while request threads only wait for their own results.
+
+    As with the thread pool, lookups still running at the deadline are
+    reported as timed out and left to finish (and fill the cache). The
+    loop is started on first use and again after a fork.
+    """
+
+    def __init__(self, timeout=2.0):
+        self.timeout = timeout
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._loop = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._background = set()
+
+    def run(self, lookups, timeout=None):
+        """Same contract as AvailabilityFanout.run; blocks the calling thread only"""
+        timeout = self.timeout if timeout is None else timeout
+        return asyncio.run_coroutine_threadsafe(self._run(lookups, timeout), self._get_loop()).result()
+
+    async def _run(self, lookups, timeout):
+        tasks = {asyncio.ensure_future(fn(*args)): key for key, (kind, fn, args) in lookups.items()}
+        if not tasks:
+            return {}, []
+        self.in_flight += len(tasks)
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        for task in tasks:
+            task.add_done_callback(self._finished)
+        done, pending = await asyncio.wait(tasks, timeout=timeout)
+
+        results = {}
+        timed_out = []
+        for task in done:
+            if task.exception() is None:
+                results[tasks[task]] = task.result()
+            else:
+                timed_out.append(tasks[task])
+        for task in pending:
+            self._background.add(task)
+            timed_out.append(tasks[task])
+        return results, timed_out
+
+    def _finished(self, task):
+        self.in_flight -= 1
+        self._background.discard(task)
+        if not task.cancelled():
+            task.exception()  # retrieved, so late failures are not logged as unhandled
+
+    def _get_loop(self):
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    loop = asyncio.new_event_loop()
+                    threading.Thread(target=loop.run_forever, name='availability-loop', daemon=True).start()
+                    self._loop, self._pid = loop, os.getpid()
+                    self.in_flight = 0
+                    self._background = set()
+        return self._loop
+
+    def stats(self):
+        return {'inFlight': self.in_flight, 'peakInFlight': self.peak_in_flight}
+
+    def shutdown(self):
+        if self._loop is not None and self._pid == os.getpid():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._pid = None
+
+
+def create_availability_provider(config, trademark_index=None):
+    """Build the default cached provider from a Config class"""
+    cache = AvailabilityCache(
+        max_size=config.AVAILABILITY_CACHE_SIZE,
+        ttl=config.AVAILABILITY_CACHE_TTL,
+        available_ttl=config.AVAILABILITY_CACHE_AVAILABLE_TTL
+    )
+    if config.AVAILABILITY_ASYNC:
+        if config.AVAILABILITY_BACKEND_URL:
+            from utils.http_pool import HTTPPool
+            # Requests outlive the lookup deadline (late results fill the cache), up to a bound
+            pool = HTTPPool(max_connections=config.AVAILABILITY_POOL_CONNECTIONS,
+                            idle_timeout=config.AVAILABILITY_POOL_IDLE_TIMEOUT,
+                            timeout=max(config.AVAILABILITY_TIMEOUT * 5, 10.0))
+            provider = HTTPAvailabilityProvider(config.AVAILABILITY_BACKEND_URL, pool)
+        else:
+            provider = AsyncProviderAdapter(MockAvailabilityProvider())
+        if trademark_index is not None:
+            provider = AsyncTrademarkIndexProvider(provider, trademark_index)
+        return AsyncCachedAvailabilityProvider(provider, cache)
+
+    provider = MockAvailabilityProvider()
+    if trademark_index is not None:
+        provider = TrademarkIndexProvider(provider, trademark_index)
+    return CachedAvailabilityProvider(provider, cache)
+
+def create_availability_fanout(config):
+    """Build the concurrent lookup runner from a Config class, or None if disabled"""
+    if config.AVAILABILITY_ASYNC:
+        # Async providers can only be driven by the event loop, whatever AVAILABILITY_CONCURRENT says
+        return AsyncAvailabilityFanout(timeout=config.AVAILABILITY_TIMEOUT)
+    if not config.AVAILABILITY_CONCURRENT:
+        return None
+    return AvailabilityFanout(
+        max_workers=config.AVAILABILITY_MAX_WORKERS,
+        timeout=config.AVAILABILITY_TIMEOUT,
+        limits=config.AVAILABILITY_CONCURRENCY_LIMITS
+    )
@@ -0,0 +1,179 @@
+"""
+Availability Stub Server
+Local HTTP backend for async availability mode, with configurable latency
+
+Serves the protocol of services.availability_service.HTTPAvailabilityProvider
+with keep-alive, answering from a hash of the name so results are stable:
+    python availability_stub.py --port 8090 --latency 0.05
+    AVAILABILITY_ASYNC=true AVAILABILITY_BACKEND_URL=http://127.0.0.1:8090 python app.py
+
+GET /stats reports connections accepted, requests served and the most
+requests handled at once.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import sys
+import threading
+from urllib.parse import unquote
+
+
+class StubAvailabilityServer:
+    """
+    The stub as an object: start() runs it on a background thread and
+    returns its base URL (port 0 picks a free port).
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, jitter=0.0):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.connections = 0
+        self.requests = 0
+        self.active = 0
+        self.peak_active = 0
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._writers = set()
+
+    @property
+    def url(self):
+        return f'http://{self.host}:{self.port}'
+
+    def start(self):
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._server = self._loop.run_until_complete(
+                asyncio.start_server(self._handle, self.host, self.port, backlog=4096))
+            self.port = self._server.sockets[0].getsockname()[1]
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name='availability-stub', daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self.url
+
+    def stop(self):
+        """Stop listening and drop every open connection"""
+        if self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self._close(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop = None
+
+    async def _close(self):
+        # Transports close their sockets on a later loop iteration, so wait
+        # for that before the loop stops
+        self._server.close()
+        writers = list(self._writers)
+        for writer in writers:
+            writer.close()
+        await asyncio.gather(*(writer.wait_closed() for writer in writers), return_exceptions=True)
+        await self._server.wait_closed()
+
+    async def serve_forever(self):
+        server = await asyncio.start_server(self._handle, self.host, self.port, backlog=4096)
+        async with server:
+            await server.serve_forever()
+
+    def stats(self):
+        return {'connections': self.connections, 'requests': self.requests, 'peakConcurrent': self.peak_active}
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        self._writers.add(writer)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                if 'content-length' in headers:
+                    await reader.readexactly(int(headers['content-length']))
+
+                method, path = request_line.decode('latin-1').split()[:2]
+                self.requests += 1
+                self.active += 1
+                self.peak_active = max(self.peak_active, self.active)
+                try:
+                    if self.latency or self.jitter:
+                        await asyncio.sleep(self.latency + random.uniform(0, self.jitter))
+                    status, body = self._respond(method, path)
+                finally:
+                    self.active -= 1
+
+                close = headers.get('connection', '').lower() == 'close'
+                payload = json.dumps(body).encode()
+                writer.write(
+                    f'HTTP/1.1 {status}\r\nContent-Type: application/json\r\n'
+                    f'Content-Length: {len(payload)}\r\nConnection: {"close" if close else "keep-alive"}\r\n\r\n'
+                    .encode('latin-1') + payload
+                )
+                await writer.drain()
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    def _respond(self, method, path):
+        parts = [unquote(part) for part in path.split('?', 1)[0].strip('/').split('/')]
+        if method != 'GET':
+            return '405 Method Not Allowed', {'error': 'GET only'}
+        if parts == ['stats']:
+            return '200 OK', self.stats()
+        if len(parts) == 2 and parts[0] == 'domains':
+            available = _coin(parts[1])
+            return '200 OK', {'available': available, 'price': 10 + _number(parts[1]) % 41 if available else None}
+        if len(parts) == 2 and parts[0] == 'trademarks':
+            available = _coin('tm:' + parts[1])
+            return '200 OK', {'available': available,
+                              'conflicts': [] if available else ['Similar trademark found in class 42']}
+        if len(parts) == 3 and parts[0] == 'social':
+            return '200 OK', {'available': _coin(f'{parts[1]}:{parts[2]}')}
+        return '404 Not Found', {'error': 'Unknown lookup'}
+
+
+def _number(text):
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=4).digest(), 'little')
+
+
+def _coin(text):
+    return _number(text) % 2 == 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='BrandArc availability stub backend')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds added to every lookup')
+    parser.add_argument('--jitter', type=float, default=0.0, help='random extra seconds, 0 to this')
+    args = parser.parse_args(argv)
+
+    server = StubAvailabilityServer(args.host, args.port, args.latency, args.jitter)
+    print(f'🧪 Availability stub on http://{args.host}:{args.port} ({args.latency * 1000:.0f} ms latency)')
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
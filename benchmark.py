@@ -0,0 +1,440 @@
+"""
+BrandArc Benchmarks
+Measures the generation and availability hot paths and the Flask routes
+
+Usage:
+    python benchmark.py                          # full run, writes benchmark_results.json
+    python benchmark.py --quick                  # fewer iterations
+    python benchmark.py --only generate          # benchmarks whose name contains "generate"
+    python benchmark.py --compare old.json       # flag regressions against a previous run
+"""
+import argparse
+import gc
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+# Route benchmarks send thousands of requests from one client; measure the
+# limiter on its own (rate_limit.* entries) instead of tripping it
+os.environ.setdefault('RATE_LIMIT_ENABLED', 'false')
+
+from config import Config
+
+COUNT_SWEEP = [1, 5, 10, 25, Config.MAX_BRAND_COUNT]
+TONES = ['Modern', 'Playful', 'Professional', 'Creative', 'Tech']
+INDUSTRIES = ['Technology', 'Healthcare', 'Finance', 'Education', 'Retail', 'Food', 'Fashion', 'Travel']
+NAME_STORE_ROWS = 100000  # generated names saved before the name_store benchmarks
+
+
+class Benchmark:
+    """A named callable plus the parameters it was run with"""
+
+    def __init__(self, name, fn, params=None, iterations=None):
+        self.name = name
+        self.fn = fn
+        self.params = params or {}
+        self.iterations = iterations
+
+
+def select(benches, only):
+    """Benchmarks whose name contains `only`, or all of them when it is not set"""
+    return [bench for bench in benches if not only or only in bench.name]
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def run_benchmark(bench, iterations, warmup):
+    """Time `iterations` calls, then measure allocations over a separate pass"""
+    for _ in range(warmup):
+        bench.fn()
+
+    gc.collect()
+    timings = []
+    clock = time.perf_counter
+    started = clock()
+    for _ in range(iterations):
+        t0 = clock()
+        bench.fn()
+        timings.append(clock() - t0)
+    elapsed = clock() - started
+
+    # Allocation pass - tracemalloc slows calls down, so it is kept out of the timings
+    alloc_iterations = max(1, min(iterations, 50))
+    gc.collect()
+    blocks_before = sys.getallocatedblocks()
+    tracemalloc.start()
+    peak_total = 0
+    for _ in range(alloc_iterations):
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        bench.fn()
+        _, peak = tracemalloc.get_traced_memory()
+        peak_total += peak - base
+    tracemalloc.stop()
+    gc.collect()
+    net_blocks = sys.getallocatedblocks() - blocks_before
+
+    timings.sort()
+    return {
+        'name': bench.name,
+        'params': bench.params,
+        'iterations': iterations,
+        'throughput': round(iterations / elapsed, 2) if elapsed else None,  # calls per second
+        'meanMs': round(elapsed / iterations * 1000, 4),
+        'p50Ms': round(percentile(timings, 50) * 1000, 4),
+        'p95Ms': round(percentile(timings, 95) * 1000, 4),
+        'p99Ms': round(percentile(timings, 99) * 1000, 4),
+        'peakAllocBytes': peak_total // alloc_iterations,  # per call
+        'netBlocks': round(net_blocks / alloc_iterations, 2)  # retained per call
+    }
+
+
+def service_benchmarks(only=None):
+    """BrandService methods called directly"""
+    from services.brand_service import BrandService
+
+    service = BrandService()
+    names = [n['name'] for n in service.generate_names('Technology', 'ai, smart, future', 'Modern', 1000)]
+    benches = []
+
+    for count in COUNT_SWEEP:
+        benches.append(Benchmark(
+            f'service.generate_names[count={count}]',
+            lambda count=count: service.generate_names('Technology', 'AI, Smart', 'Modern', count),
+            {'count': count}
+        ))
+        benches.append(Benchmark(
+            f'service.generate_names_ranked[count={count}]',
+            lambda count=count: service.generate_names('Technology', 'AI, Smart', 'Modern', count, ranked=True),
+            {'count': count, 'ranked': True}
+        ))
+
+    benches.append(Benchmark(
+        f'service.generate_records[count={Config.MAX_BRAND_COUNT}]',
+        lambda: service.generate_records('Technology', 'AI, Smart', 'Modern', Config.MAX_BRAND_COUNT),
+        {'count': Config.MAX_BRAND_COUNT}
+    ))
+
+    for tone in TONES:
+        for industry in INDUSTRIES:
+            benches.append(Benchmark(
+                f'service.generate_names[tone={tone},industry={industry}]',
+                lambda tone=tone, industry=industry: service.generate_names(industry, '', tone, 10),
+                {'tone': tone, 'industry': industry, 'count': 10}
+            ))
+
+    benches.append(Benchmark(
+        'service.calculate_memorability[scalar,n=1000]',
+        lambda: [service._calculate_memorability(name) for name in names],
+        {'names': len(names)}
+    ))
+    benches.append(Benchmark(
+        'service.calculate_memorability[batch,n=1000]',
+        lambda: service.calculate_memorability_batch(names),
+        {'names': len(names)}
+    ))
+
+    from services.palette_service import SCHEMES, PaletteService
+    colors = [f'#{(i * 2654435761) % (1 << 24):06x}' for i in range(100)]
+    jobs = [(color, scheme) for color, scheme in zip(colors, itertools.cycle(SCHEMES))]
+    benches.append(Benchmark(
+        'palette.generate_many[uncached,jobs=100]',
+        lambda: PaletteService().generate_many(jobs),
+        {'jobs': len(jobs), 'palettes': len(jobs) * 5}
+    ))
+    palettes = PaletteService()
+    benches.append(Benchmark(
+        'palette.generate[cached]',
+        lambda: palettes.generate('#6366f1', 'triadic')
+    ))
+
+    from services.content_service import ContentService
+    content = ContentService()
+    benches.append(Benchmark(
+        'content.generate[description]',
+        lambda: content.generate('description', 'Nexora', 'Technology', 'Modern')
+    ))
+
+    from services.design_system_service import design_tokens, normalize_inputs, to_css
+    design_key = normalize_inputs('#6366f1', None, 'Modern')
+    benches.append(Benchmark(
+        'design_system.tokens+css[uncached]',
+        lambda: to_css(design_tokens(*design_key))
+    ))
+
+    benches.append(Benchmark(
+        'service.check_availability[cached]',
+        lambda: service.check_availability('BrandArc')
+    ))
+    unique = (f'brandarc{i}' for i in range(10 ** 9))
+    benches.append(Benchmark(
+        'service.check_availability[miss]',
+        lambda: service.check_availability(next(unique))
+    ))
+    return select(benches, only)
+
+
+def name_store_benchmarks(only=None):
+    """NameStore searches over a store filled with generated names"""
+    import atexit
+    import functools
+    import shutil
+    import tempfile
+    from services.brand_service import BrandService
+    from services.name_store_service import NameStore
+
+    searches = [
+        ('prefix', {'prefix': 'nex'}),
+        ('contains', {'contains': 'ova'}),
+        ('contains,sort=score', {'contains': 'lab', 'sort': 'score'}),
+        ('score_range', {'min_score': 90, 'max_score': 95, 'sort': 'score'}),
+        ('prefix,score_range,industry', {'prefix': 'n', 'min_score': 80, 'industry': 'Food'}),
+    ]
+    benches = [
+        Benchmark(f'name_store.search[{label}]', lambda store, query=query: store.search(**query), query)
+        for label, query in searches
+    ]
+    benches.append(Benchmark('name_store.popular', lambda store: store.popular()))
+    # Filling the store takes seconds; skip it when --only leaves nothing to run
+    benches = select(benches, only)
+    if not benches:
+        return []
+
+    directory = tempfile.mkdtemp(prefix='brandarc-bench-')
+    atexit.register(shutil.rmtree, directory, True)
+    store = NameStore(os.path.join(directory, 'names.db'), max_pending=10 ** 7)
+    service = BrandService()
+    for i in range(NAME_STORE_ROWS // Config.MAX_BRAND_COUNT):
+        store.add(service.generate_records(INDUSTRIES[i % len(INDUSTRIES)], '', TONES[i % len(TONES)],
+                                           Config.MAX_BRAND_COUNT))
+    # The writer must be idle before timing starts
+    store.flush()
+    rows = store.count()
+    for bench in benches:
+        bench.fn = functools.partial(bench.fn, store)
+        bench.params = dict({'rows': rows}, **bench.params)
+    return benches
+
+
+def serialization_benchmarks(only=None):
+    """Encode time and bytes on the wire for generate payloads: stdlib json vs the fast provider, raw vs compressed"""
+    import gzip
+    from flask import Flask
+    from flask.json.provider import DefaultJSONProvider
+    from services.brand_service import BrandService
+    from utils.compression import brotli
+    from utils.json_provider import FastJSONProvider, encoder_name
+
+    app = Flask(__name__)
+    providers = {'stdlib': DefaultJSONProvider(app), encoder_name(): FastJSONProvider(app)}
+    service = BrandService()
+    benches = []
+
+    for count in (10, Config.MAX_BRAND_COUNT):
+        payload = {
+            'success': True,
+            'data': {'names': service.generate_names('Technology', 'AI, Smart', 'Modern', count)}
+        }
+        for label, provider in providers.items():
+            body = provider.dumps(payload).encode('utf-8')
+            benches.append(Benchmark(
+                f'json.encode[{label},count={count}]',
+                lambda provider=provider, payload=payload: provider.dumps(payload),
+                {'count': count, 'encoder': label, 'bytes': len(body)}
+            ))
+
+        body = providers['stdlib'].dumps(payload).encode('utf-8')
+        gzipped = gzip.compress(body, compresslevel=Config.COMPRESSION_LEVEL)
+        benches.append(Benchmark(
+            f'compress[gzip,count={count}]',
+            lambda body=body: gzip.compress(body, compresslevel=Config.COMPRESSION_LEVEL),
+            {'count': count, 'rawBytes': len(body), 'bytes': len(gzipped)}
+        ))
+        if brotli is not None:
+            brotlied = brotli.compress(body, quality=Config.COMPRESSION_BROTLI_QUALITY)
+            benches.append(Benchmark(
+                f'compress[br,count={count}]',
+                lambda body=body: brotli.compress(body, quality=Config.COMPRESSION_BROTLI_QUALITY),
+                {'count': count, 'rawBytes': len(body), 'bytes': len(brotlied)}
+            ))
+    return select(benches, only)
+
+
+def rate_limit_benchmarks(only=None):
+    """One limit check against the in-process and the shared-file bucket stores"""
+    import tempfile
+    from utils.rate_limit import MemoryStore, RateLimiter, SharedFileStore
+
+    path = os.path.join(tempfile.mkdtemp(), 'ratelimit')
+    stores = {'memory': MemoryStore(), 'shared': SharedFileStore(path, Config.RATE_LIMIT_SLOTS)}
+    benches = []
+    for label, store in stores.items():
+        limiter = RateLimiter(store, '1000000/second')
+        clients = itertools.cycle([f'10.0.{i // 256}.{i % 256}' for i in range(1000)])
+        benches.append(Benchmark(
+            f'rate_limit.check[{label}]',
+            lambda limiter=limiter, clients=clients: limiter.check(next(clients), 'brand.generate_brand_names', 6),
+            {'store': label, 'clients': 1000}
+        ))
+    return select(benches, only)
+
+
+def route_benchmarks(only=None):
+    """Flask routes driven in-process through the test client"""
+    import functools
+
+    benches = []
+
+    def post(path, body):
+        return lambda client: client.post(path, json=body).get_data()
+
+    def get(url):
+        return lambda client: client.get(url).get_data()
+
+    for count in COUNT_SWEEP:
+        body = {'industry': 'Technology', 'keywords': 'AI, Smart', 'tone': 'Modern', 'count': count}
+        benches.append(Benchmark(f'route.POST /api/brand/generate[count={count}]',
+                                 post('/api/brand/generate', body), body))
+
+    for tone in TONES:
+        for industry in INDUSTRIES:
+            body = {'industry': industry, 'tone': tone, 'count': 10}
+            benches.append(Benchmark(f'route.POST /api/brand/generate[tone={tone},industry={industry}]',
+                                     post('/api/brand/generate', body), body))
+
+    jobs = {'jobs': [{'industry': 'Technology', 'tone': 'Modern', 'count': 10}] * 20}
+    benches.append(Benchmark('route.POST /api/brand/generate/batch[jobs=20]',
+                             post('/api/brand/generate/batch', jobs), {'jobs': 20, 'count': 10}))
+    benches.append(Benchmark('route.POST /api/brand/check-availability',
+                             post('/api/brand/check-availability', {'name': 'BrandArc'})))
+    batch_names = {'names': [f'Brand{i}' for i in range(50)]}
+    benches.append(Benchmark('route.POST /api/brand/check-availability/batch[names=50]',
+                             post('/api/brand/check-availability/batch', batch_names), {'names': 50}))
+    benches.append(Benchmark('route.GET /api/brand/suggestions',
+                             get('/api/brand/suggestions?industry=Technology&tone=Modern')))
+    benches.append(Benchmark('route.POST /api/palette/generate',
+                             post('/api/palette/generate', {'baseColor': '#6366f1', 'scheme': 'complementary'})))
+    palette_jobs = {'jobs': [{'brandName': f'Brand{i}'} for i in range(100)]}
+    benches.append(Benchmark('route.POST /api/palette/generate/batch[jobs=100]',
+                             post('/api/palette/generate/batch', palette_jobs), {'jobs': 100}))
+    benches.append(Benchmark('route.POST /api/content/generate',
+                             post('/api/content/generate', {'type': 'tagline', 'brandName': 'BrandArc'})))
+    content_jobs = {'types': ['tagline', 'description', 'social'],
+                    'jobs': [{'brandName': f'Brand{i}', 'industry': 'Technology'} for i in range(500)]}
+    benches.append(Benchmark('route.POST /api/content/generate/batch[jobs=500]',
+                             post('/api/content/generate/batch', content_jobs), {'jobs': 500}))
+    benches.append(Benchmark('route.POST /api/design-system/generate',
+                             post('/api/design-system/generate', {'brandName': 'BrandArc'})))
+    benches.append(Benchmark('route.GET /api/design-system/export/css',
+                             get('/api/design-system/export/css?tone=Modern')))
+    benches.append(Benchmark('route.GET /health', get('/health')))
+
+    body = {'industry': 'Technology', 'tone': 'Modern', 'count': Config.MAX_BRAND_COUNT}
+    for encoding in ('identity', 'gzip', 'br'):
+        benches.append(Benchmark(
+            f'route.POST /api/brand/generate[count={Config.MAX_BRAND_COUNT},accept-encoding={encoding}]',
+            lambda client, encoding=encoding: client.post('/api/brand/generate', json=body,
+                                                  headers={'Accept-Encoding': encoding}).get_data(),
+            dict(body, acceptEncoding=encoding)
+        ))
+
+    # The app builds its trademark index and suggestion pool on start; skip it
+    # when --only leaves nothing to run
+    benches = select(benches, only)
+    if not benches:
+        return []
+
+    from app import create_app
+    from api.brand import suggestion_pool
+
+    app = create_app()
+    # Fill the suggestion pool up front instead of on its thread: a background
+    # thread allocating while tracemalloc is stopped can crash CPython < 3.12
+    suggestion_pool.stop()
+    if app.config.get('SUGGESTION_POOL_ENABLED'):
+        suggestion_pool.refresh()
+    client = app.test_client()
+    for bench in benches:
+        bench.fn = functools.partial(bench.fn, client)
+    return benches
+
+
+def compare(results, baseline_path, threshold):
+    """Print benchmarks whose p50 or throughput regressed by more than `threshold` percent"""
+    with open(baseline_path) as f:
+        baseline = {r['name']: r for r in json.load(f)['results']}
+
+    regressions = []
+    for result in results:
+        old = baseline.get(result['name'])
+        if not old:
+            continue
+        if old['p50Ms'] and result['p50Ms'] > old['p50Ms'] * (1 + threshold / 100):
+            regressions.append((result['name'], 'p50Ms', old['p50Ms'], result['p50Ms']))
+        if old['throughput'] and result['throughput'] < old['throughput'] * (1 - threshold / 100):
+            regressions.append((result['name'], 'throughput', old['throughput'], result['throughput']))
+
+    for name, metric, before, after in regressions:
+        print(f'⚠️  REGRESSION {name}: {metric} {before} -> {after}')
+    if not regressions:
+        print(f'✅ No regressions over {threshold}% against {baseline_path}')
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='BrandArc benchmark suite')
+    parser.add_argument('--output', default='benchmark_results.json', help='JSON results file')
+    parser.add_argument('--iterations', type=int, default=200, help='timed calls per benchmark')
+    parser.add_argument('--warmup', type=int, default=10, help='untimed calls per benchmark')
+    parser.add_argument('--quick', action='store_true', help='20 iterations, for smoke runs')
+    parser.add_argument('--only', help='run benchmarks whose name contains this string')
+    parser.add_argument('--compare', help='previous results file to check for regressions')
+    parser.add_argument('--threshold', type=float, default=10.0, help='regression threshold in percent')
+    args = parser.parse_args(argv)
+
+    iterations = 20 if args.quick else args.iterations
+    # Each group drops the benchmarks --only excludes before building its fixtures
+    benches = (service_benchmarks(args.only) + name_store_benchmarks(args.only)
+               + serialization_benchmarks(args.only) + rate_limit_benchmarks(args.only)
+               + route_benchmarks(args.only))
+
+    results = []
+    for bench in benches:
+        result = run_benchmark(bench, bench.iterations or iterations, args.warmup)
+        results.append(result)
+        print(f"{result['name']:<80} {result['throughput']:>10} /s  "
+              f"p50 {result['p50Ms']:.3f}ms  p99 {result['p99Ms']:.3f}ms")
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpuCount': os.cpu_count(),
+            'iterations': iterations,
+            'warmup': args.warmup
+        },
+        'results': results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'\n📄 Results written to {args.output}')
+
+    if args.compare:
+        return 1 if compare(results, args.compare, args.threshold) else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
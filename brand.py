@@ -1,11 +1,157 @@
 """
 Brand Generation API Routes
 """
-from flask import Blueprint, request, jsonify
-from services.brand_service import BrandService
+import hashlib
+import random
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from config import get_config
+from startup import Lazy, is_ready
+from services.name_store_service import create_name_store
+from services.suggestion_pool import SuggestionPool
+from utils.metrics import REGISTRY, SpanTimer
+from utils.response_cache import ResponseCache, cached_json_response, conditional_response
+
+def _create_brand_service():
+    # Imported here so that with LAZY_INIT numpy and the data files are only loaded on first use
+    from services.availability_service import create_availability_fanout, create_availability_provider
+    from services.brand_service import BrandService
+    from services.lexicon_service import create_lexicon
+    from services.pronounceability_service import create_pronounceability_model
+    from services.trademark_service import create_trademark_index
+    
+    config = get_config()
+    # Registry of existing marks (None unless TRADEMARK_REGISTRY_PATH is set)
+    trademark_index = create_trademark_index(config)
+    return BrandService(
+        availability_provider=create_availability_provider(config, trademark_index),
+        availability_fanout=create_availability_fanout(config),
+        spans=SpanTimer(REGISTRY) if config.METRICS_SERVICE_SPANS else None,
+        lexicon=create_lexicon(config),
+        trademark_index=trademark_index,
+        pronounceability=create_pronounceability_model(config),
+        pronounceability_weight=config.PRONOUNCEABILITY_WEIGHT
+    )
 
 brand_bp = Blueprint('brand', __name__)
-brand_service = BrandService()
+# Built on first use with LAZY_INIT, otherwise right here
+brand_service = Lazy('brand_service', _create_brand_service, eager=not get_config().LAZY_INIT)
+# Serialized responses of seeded (reproducible) requests
+response_cache = ResponseCache(
+    max_entries=get_config().RESPONSE_CACHE_SIZE,
+    max_bytes=get_config().RESPONSE_CACHE_MAX_BYTES
+)
+# Every generated name, for /names/search and /names/popular (None unless NAME_STORE_PATH is set)
+name_store = create_name_store(get_config())
+# Ready-made /suggestions results, refreshed in the background
+suggestion_pool = SuggestionPool(
+    brand_service,
+    depth=get_config().SUGGESTION_POOL_DEPTH,
+    refresh_interval=get_config().SUGGESTION_REFRESH_INTERVAL
+)
+
+def _collect_cache_metrics():
+    """Scrape-time cache counters for /metrics"""
+    caches = [('response', response_cache.stats())]
+    # A scrape must not build the service
+    availability_cache = getattr(brand_service.availability, 'cache', None) if is_ready(brand_service) else None
+    if availability_cache is not None:
+        caches.append(('availability', availability_cache.stats()))
+    
+    for metric, key, kind, help_text in (
+        ('brandarc_cache_hits_total', 'hits', 'counter', 'Cache hits'),
+        ('brandarc_cache_misses_total', 'misses', 'counter', 'Cache misses'),
+    ):
+        yield metric, kind, help_text, [({'cache': name}, stats[key]) for name, stats in caches]
+    yield 'brandarc_cache_entries', 'gauge', 'Cached entries', [
+        ({'cache': name}, stats.get('size', stats.get('entries'))) for name, stats in caches
+    ]
+
+REGISTRY.add_collector(_collect_cache_metrics)
+
+def _collect_name_store_metrics():
+    """Scrape-time name store writer counters for /metrics (this process)"""
+    if name_store is None:
+        return
+    stats = name_store.stats()
+    yield 'brandarc_name_store_rows_total', 'counter', 'Generated names saved to the name store', [
+        ({'result': result}, stats[result]) for result in ('written', 'dropped', 'failed')
+    ]
+    yield 'brandarc_name_store_pending', 'gauge', 'Generated names waiting to be written', [({}, stats['pending'])]
+
+REGISTRY.add_collector(_collect_name_store_metrics)
+
+@brand_bp.record_once
+def _start_suggestion_pool(state):
+    if state.app.config.get('SUGGESTION_POOL_ENABLED'):
+        suggestion_pool.start()
+
+def _generation_params(data):
+    """Read generate_names keyword arguments from a generate request body"""
+    from services.brand_service import RANKED_OVERSAMPLE
+    
+    for field in ('industry', 'keywords', 'tone'):
+        if field in data and not isinstance(data[field], str):
+            raise ValueError(f'{field} must be a string')
+    return {
+        'industry': data.get('industry', 'Technology'),
+        'keywords': data.get('keywords', ''),
+        'tone': data.get('tone', 'Modern'),
+        'count': min(int(data.get('count', 10)), 50),  # Max 50
+        'ranked': bool(data.get('ranked', False)),
+        'oversample': int(data.get('oversample', RANKED_OVERSAMPLE)),
+        'screen_trademarks': bool(data.get('screenTrademarks', False))
+    }
+
+def _generate_records(params, seed):
+    """BrandNameRecords for one request; seeded requests get reproducible ids"""
+    stamp = None if seed is None else _seed_stamp(params, seed)
+    return brand_service.generate_records(**params, rng=_seeded_rng(seed), stamp=stamp)
+
+def _generate_names(params, seed):
+    """generate_names for one request, queueing the names for the name store"""
+    records = _generate_records(params, seed)
+    # Serialized first, so a request that fails here saves nothing
+    names = [record.to_dict() for record in records]
+    _store_names(records)
+    return names
+
+def _store_names(records):
+    if name_store is not None:
+        name_store.add(records)
+
+def _names_payload(params, names):
+    return {
+        'success': True,
+        'data': {
+            'names': names,
+            'count': len(names),
+            'industry': params['industry'],
+            'tone': params['tone']
+        }
+    }
+
+def _valid_seed(seed):
+    """Seeds may be omitted, an integer or a string"""
+    return seed is None or isinstance(seed, str) or (isinstance(seed, int) and not isinstance(seed, bool))
+
+def _seeded_rng(seed):
+    """Per-request random.Random for a seed, or None to use the global generator"""
+    if not _valid_seed(seed):
+        raise ValueError('seed must be an integer or a string')
+    return None if seed is None else random.Random(seed)
+
+def _seed_stamp(params, seed):
+    """Id stamp for a seeded request, so its ids are as reproducible as its names"""
+    digest = hashlib.blake2b(repr(_generation_cache_key(params, seed)).encode('utf-8'), digest_size=6).digest()
+    return int.from_bytes(digest, 'big')
+
+def _generation_cache_key(params, seed):
+    """Response cache key; keywords are case and whitespace insensitive"""
+    keywords = tuple(k.strip().lower() for k in params['keywords'].split(',') if k.strip())
+    return (
+        'generate', brand_service.lexicon.generation, params['industry'], keywords, params['tone'],
+        params['count'], params['ranked'], params['oversample'], params['screen_trademarks'], seed
+    )
 
 @brand_bp.route('/generate', methods=['POST'])
 def generate_brand_names():
@@ -17,9 +163,22 @@ def generate_brand_names():
         "industry": "Technology",
         "keywords": "AI, Smart, Future",
         "tone": "Modern",
-        "count": 10
+        "count": 10,
+        "ranked": false,
+        "oversample": 20,
+        "screenTrademarks": false,
+        "seed": 42
     }
     
+    With "ranked": true, count * oversample candidates are generated and
+    the best unique names are returned, each with a "rankScore".
+    
+    With "screenTrademarks": true, names similar to a mark in the
+    configured trademark registry are left out.
+    
+    With a "seed", output is reproducible: the response is cached, carries
+    an ETag and is answered with 304 when If-None-Match matches.
+    
     Response:
     {
         "success": true,
@@ -41,28 +200,34 @@ def generate_brand_names():
                 'error': 'No data provided'
             }), 400
         
-        industry = data.get('industry', 'Technology')
-        keywords = data.get('keywords', '')
-        tone = data.get('tone', 'Modern')
-        count = min(int(data.get('count', 10)), 50)  # Max 50
+        seed = data.get('seed')
         
-        # Generate names
-        names = brand_service.generate_names(
-            industry=industry,
-            keywords=keywords,
-            tone=tone,
-            count=count
-        )
+        if not _valid_seed(seed):
+            return jsonify({
+                'success': False,
+                'error': 'seed must be an integer or a string'
+            }), 400
         
-        return jsonify({
-            'success': True,
-            'data': {
-                'names': names,
-                'count': len(names),
-                'industry': industry,
-                'tone': tone
-            }
-        }), 200
+        try:
+            params = _generation_params(data)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        
+        if seed is None:
+            return jsonify(_names_payload(params, _generate_names(params, seed))), 200
+        
+        # The records are cached with the response, so repeats still count in the name store
+        key = _generation_cache_key(params, seed)
+        entry = response_cache.get(key)
+        if entry is None:
+            records = _generate_records(params, seed)
+            payload = _names_payload(params, [record.to_dict() for record in records])
+            entry = response_cache.put(key, current_app.json.dumps(payload).encode('utf-8'), data=records)
+        _store_names(entry.data)
+        return conditional_response(entry)
         
     except Exception as e:
         return jsonify({
@@ -70,6 +235,60 @@ def generate_brand_names():
             'error': str(e)
         }), 500
 
+@brand_bp.route('/generate/batch', methods=['POST'])
+def generate_brand_names_batch():
+    """
+    Generate brand names for many jobs in one request
+    
+    Request JSON:
+    {
+        "jobs": [
+            {"industry": "Technology", "keywords": "AI", "tone": "Modern", "count": 10},
+            {"industry": "Food", "tone": "Playful", "count": 5}
+        ]
+    }
+    
+    Response (application/x-ndjson), one line per job, written as each
+    job finishes so only one job's names are held in memory at a time:
+    {"index": 0, "success": true, "data": {"names": [...], "count": 10, ...}}
+    {"index": 1, "success": false, "error": "..."}
+    """
+    data = request.get_json(silent=True)
+    jobs = data.get('jobs') if isinstance(data, dict) else None
+    
+    if not isinstance(jobs, list) or not jobs:
+        return jsonify({
+            'success': False,
+            'error': 'A non-empty "jobs" list is required'
+        }), 400
+    
+    max_jobs = current_app.config.get('MAX_BATCH_JOBS', 500)
+    if len(jobs) > max_jobs:
+        return jsonify({
+            'success': False,
+            'error': f'Too many jobs (max {max_jobs})'
+        }), 400
+    
+    def generate():
+        dumps = current_app.json.dumps
+        for i, job in enumerate(jobs):
+            try:
+                if not isinstance(job, dict):
+                    raise ValueError('Job must be an object')
+                
+                params = _generation_params(job)
+                names = _generate_names(params, job.get('seed'))
+                line = {'index': i, **_names_payload(params, names)}
+            except Exception as e:
+                line = {
+                    'index': i,
+                    'success': False,
+                    'error': str(e)
+                }
+            yield dumps(line) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 @brand_bp.route('/check-availability', methods=['POST'])
 def check_availability():
     """
@@ -103,26 +322,182 @@ def check_availability():
             'error': str(e)
         }), 500
 
+@brand_bp.route('/check-availability/batch', methods=['POST'])
+def check_availability_batch():
+    """
+    Check availability for many brand names in one request
+    
+    Request JSON:
+    {
+        "names": ["BrandArc", "NexusAI", ...]
+    }
+    
+    Response (application/x-ndjson), one line per name in request order:
+    {"index": 0, "success": true, "data": {...same as /check-availability...}}
+    
+    Repeated names and overlapping alternative domains are looked up once.
+    """
+    data = request.get_json(silent=True)
+    names = data.get('names') if isinstance(data, dict) else None
+    
+    if not isinstance(names, list) or not names:
+        return jsonify({
+            'success': False,
+            'error': 'A non-empty "names" list is required'
+        }), 400
+    
+    if not all(isinstance(name, str) and name.strip() for name in names):
+        return jsonify({
+            'success': False,
+            'error': 'Every brand name must be a non-empty string'
+        }), 400
+    
+    max_names = current_app.config.get('MAX_AVAILABILITY_BATCH', 500)
+    if len(names) > max_names:
+        return jsonify({
+            'success': False,
+            'error': f'Too many names (max {max_names})'
+        }), 400
+    
+    def generate():
+        dumps = current_app.json.dumps
+        results = brand_service.check_availability_batch(names)
+        for i, availability in enumerate(results):
+            yield dumps({
+                'index': i,
+                'success': True,
+                'data': availability
+            }) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 @brand_bp.route('/suggestions', methods=['GET'])
 def get_suggestions():
     """
     Get quick brand name suggestions based on query parameters
+    
+    Unseeded requests for a known industry and tone are served from the
+    pre-generated suggestion pool. An optional "seed" query parameter makes
+    the result reproducible and cacheable (ETag / 304), as for /generate.
     """
     try:
         industry = request.args.get('industry', 'Technology')
         tone = request.args.get('tone', 'Modern')
+        seed = request.args.get('seed')
         
-        suggestions = brand_service.get_quick_suggestions(industry, tone)
-        
-        return jsonify({
-            'success': True,
-            'data': {
-                'suggestions': suggestions
+        def build_payload():
+            suggestions = brand_service.get_quick_suggestions(industry, tone, rng=_seeded_rng(seed))
+            return {
+                'success': True,
+                'data': {
+                    'suggestions': suggestions
+                }
             }
-        }), 200
+        
+        if seed is None:
+            pooled = suggestion_pool.get(industry, tone)
+            if pooled is not None:
+                return jsonify({
+                    'success': True,
+                    'data': {
+                        'suggestions': pooled
+                    }
+                }), 200
+            return jsonify(build_payload()), 200
+        
+        return cached_json_response(response_cache, ('suggestions', brand_service.lexicon.generation, industry, tone, seed), build_payload)
         
     except Exception as e:
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
+
+def _name_store_query(args):
+    """Keyword arguments shared by /names/search and /names/popular"""
+    return {
+        'industry': args.get('industry'),
+        'tone': args.get('tone'),
+        'limit': args.get('limit', 20, type=int)
+    }
+
+@brand_bp.route('/names/search', methods=['GET'])
+def search_names():
+    """
+    Search the names generated so far (needs NAME_STORE_PATH)
+    
+    Query parameters, all optional and combined:
+        prefix, contains      case-insensitive name prefix / substring
+        score                 memorability (default), domain, trademark or rank;
+                              the field minScore, maxScore and sort=score use
+        minScore, maxScore    inclusive score range
+        industry, tone        exact match
+        sort                  name (default), score, popular or recent
+        limit                 1-100, default 20
+    
+    Response:
+    {
+        "success": true,
+        "data": {
+            "names": [{"id": 1, "name": "Nexora", "industry": "Technology", "tone": "Modern",
+                       "domainScore": 81, "trademarkScore": 74, "memorabilityScore": 88,
+                       "count": 3, "firstSeen": "...", "lastSeen": "..."}],
+            "count": 1
+        }
+    }
+    
+    Names are saved in the background, so a name shows up shortly after
+    the response that generated it. "count" is how often it was generated
+    for that industry and tone.
+    """
+    if name_store is None:
+        return jsonify({
+            'success': False,
+            'error': 'Name store is not enabled'
+        }), 404
+    
+    args = request.args
+    try:
+        names = name_store.search(
+            prefix=args.get('prefix'),
+            contains=args.get('contains'),
+            score=args.get('score', 'memorability'),
+            min_score=args.get('minScore', type=float),
+            max_score=args.get('maxScore', type=float),
+            sort=args.get('sort', 'name'),
+            **_name_store_query(args)
+        )
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    return jsonify({
+        'success': True,
+        'data': {
+            'names': names,
+            'count': len(names)
+        }
+    }), 200
+
+@brand_bp.route('/names/popular', methods=['GET'])
+def popular_names():
+    """
+    The most often generated names, optionally for one "industry" and/or
+    "tone" (query parameters, with "limit"). Same entries as /names/search.
+    """
+    if name_store is None:
+        return jsonify({
+            'success': False,
+            'error': 'Name store is not enabled'
+        }), 404
+    
+    names = name_store.popular(**_name_store_query(request.args))
+    return jsonify({
+        'success': True,
+        'data': {
+            'names': names,
+            'count': len(names)
+        }
+    }), 200
@@ -2,46 +2,316 @@
 Brand Generation Service
 Contains business logic for brand name generation
 """
+import heapq
+import itertools
 import random
+import threading
+from array import array
+from collections import OrderedDict
 from datetime import datetime
+from itertools import permutations
+from operator import itemgetter
 
-class BrandService:
-    def __init__(self):
-        self.prefixes = {
-            'Modern': ['Apex', 'Nexus', 'Pulse', 'Vortex', 'Zenith', 'Prism', 'Vertex', 'Echo', 'Nova', 'Flux'],
-            'Playful': ['Zap', 'Buzz', 'Pop', 'Fizz', 'Spark', 'Bounce', 'Glow', 'Dash', 'Zoom', 'Snap'],
-            'Professional': ['Prime', 'Elite', 'Core', 'Sage', 'Crown', 'Atlas', 'Summit', 'Noble', 'Titan', 'Sterling'],
-            'Creative': ['Muse', 'Canvas', 'Sketch', 'Palette', 'Vision', 'Dream', 'Quest', 'Craft', 'Inspire', 'Imagine'],
-            'Tech': ['Byte', 'Pixel', 'Data', 'Code', 'Cloud', 'Cyber', 'Digi', 'Tech', 'Nano', 'Quantum']
+from config import Config
+from utils.metrics import NULL_SPAN
+from services.lexicon_service import StaticLexicon
+from services.availability_service import (
+    SOCIAL_NETWORKS,
+    CachedAvailabilityProvider,
+    MockAvailabilityProvider,
+    alternative_domains,
+    normalize_name,
+)
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional - batch scoring falls back to the scalar path
+    np = None
+
+# Letter pairs that make a name hard to say or spell
+_DIFFICULT_COMBOS = ('xz', 'qx', 'zq', 'pf', 'vw')
+_VOWELS = 'aeiou'
+
+# Ranked generation: max candidates drawn per returned name, and the
+# (memorability, domain, trademark) weights of the combined rank score
+RANKED_OVERSAMPLE = 20
+RANKING_WEIGHTS = (0.5, 0.3, 0.2)
+
+# Trademark screening: extra draws to replace conflicting names (unranked mode)
+SCREENING_ROUNDS = 3
+
+# Candidate tables above this many names are sampled by index instead of
+# being pre-built, and word lists above _MATERIALIZE_WORDS stay as lexicon views
+MAX_TABLE_NAMES = 20000
+_MATERIALIZE_WORDS = 4096
+# (tone, industry) candidate indexes kept per lexicon generation, least recently used evicted first
+_CANDIDATE_INDEX_LIMIT = 256
+
+# Description templates, formatted when a record is serialized
+_DESCRIPTION_TEMPLATES = (
+    "A {tone} {industry} brand that combines innovation with reliability.",
+    "{name} represents the future of {industry} with a {tone} approach.",
+    "Transforming {industry} through {tone} solutions and cutting-edge technology.",
+    "Experience {industry} reimagined with {name}'s {tone} vision.",
+)
+
+
+class BrandNameRecord:
+    """
+    One generated name, kept compact until it is serialized.
+    
+    Only the name, the scores and a description template index are stored;
+    the id, lowercase domains and description text are derived in to_dict().
+    Records from one generate call share a single batch stamp.
+    """
+    __slots__ = ('seq', 'stamp', 'name', 'industry', 'tone', 'domain_score',
+                 'trademark_score', 'memorability_score', 'template', 'rank_score')
+    
+    def __init__(self, seq, stamp, name, industry, tone, domain_score, trademark_score,
+                 memorability_score, template, rank_score=None):
+        self.seq = seq
+        self.stamp = stamp
+        self.name = name
+        self.industry = industry
+        self.tone = tone
+        self.domain_score = domain_score
+        self.trademark_score = trademark_score
+        self.memorability_score = memorability_score
+        self.template = template
+        self.rank_score = rank_score
+    
+    @property
+    def id(self):
+        return f'brand_{self.seq}_{self.stamp}'
+    
+    @property
+    def description(self):
+        return _DESCRIPTION_TEMPLATES[self.template].format(
+            name=self.name, industry=self.industry.lower(), tone=self.tone.lower()
+        )
+    
+    def to_dict(self):
+        """The API dict for this name"""
+        lower = self.name.lower()
+        result = {
+            'id': self.id,
+            'name': self.name,
+            'domain': f'{lower}.com',
+            'domainAvailable': self.domain_score > 70,
+            'domainScore': self.domain_score,
+            'trademarkAvailable': self.trademark_score > 60,
+            'trademarkScore': self.trademark_score,
+            'memorabilityScore': self.memorability_score,
+            'description': self.description,
+            'alternativeDomains': [f'{lower}.io', f'{lower}.ai', f'{lower}.co']
         }
+        if self.rank_score is not None:
+            result['rankScore'] = self.rank_score
+        return result
+
+
+class _CandidateTable:
+    """Array-backed table of pre-built names and their memorability scores"""
+    __slots__ = ('names', 'scores')
+    
+    def __init__(self, names, score_fn):
+        self.names = tuple(names)
+        self.scores = array('B', score_fn(self.names))
+    
+    def __len__(self):
+        return len(self.names)
+    
+    def sample(self, rng):
+        """Pick a random (name, memorability) pair"""
+        i = rng.randrange(len(self.names))
+        return self.names[i], self.scores[i]
+
+
+class _ProductTable:
+    """
+    Every `first` x `second` combination, sampled by index arithmetic.
+    
+    Used when the product is too large to pre-build; names are joined on
+    demand and scored later in the request's batch.
+    """
+    __slots__ = ('first', 'second', 'join')
+    
+    def __init__(self, first, second, join):
+        self.first = first
+        self.second = second
+        self.join = join
+    
+    def __len__(self):
+        return len(self.first) * len(self.second)
+    
+    def sample(self, rng):
+        """Pick a random (name, None) pair"""
+        i, j = divmod(rng.randrange(len(self)), len(self.second))
+        return self.join(self.first[i], self.second[j]), None
+
+
+def _candidate_table(first, second, join, score_fn):
+    """Pre-built table for small products, index-sampled table for large ones"""
+    if len(first) * len(second) > MAX_TABLE_NAMES:
+        return _ProductTable(first, second, join)
+    return _CandidateTable((join(a, b) for a in first for b in second), score_fn)
+
+
+def _join_prefix(prefix, word):
+    return prefix + word.capitalize()
+
+
+def _join_capitalized(a, b):
+    return a.capitalize() + b.capitalize()
+
+
+def _materialize(words):
+    """Copy small word lists into tuples; large lexicon lists stay shared views"""
+    return tuple(words) if len(words) <= _MATERIALIZE_WORDS else words
+
+
+class _CandidateIndex:
+    """
+    Keyword-independent candidate space for one (tone, industry) pair.
+    
+    Built once from the prefix, suffix and industry word lists so requests
+    only sample from tables; keyword strategies still build names per call.
+    """
+    __slots__ = ('prefixes', 'suffixes', 'industry_words',
+                 'prefix_suffix', 'prefix_industry', 'creative')
+    
+    def __init__(self, prefixes, suffixes, industry_words, score_fn):
+        self.prefixes = _materialize(prefixes)
+        self.suffixes = _materialize(suffixes)
+        self.industry_words = _materialize(industry_words)
         
-        self.suffixes = {
-            'Modern': ['ify', 'ly', 'wise', 'flow', 'hub', 'labs', 'ai', 'io', 'space', 'verse'],
-            'Playful': ['pop', 'box', 'ville', 'land', 'joy', 'fun', 'pal', 'buddy', 'zone', 'spot'],
-            'Professional': ['pro', 'corp', 'group', 'solutions', 'ventures', 'capital', 'partners', 'holdings', 'enterprises', 'global'],
-            'Creative': ['studio', 'works', 'collective', 'house', 'space', 'loft', 'gallery', 'atelier', 'forge', 'lab'],
-            'Tech': ['tech', 'soft', 'sys', 'net', 'link', 'zone', 'grid', 'base', 'ware', 'logic']
-        }
+        self.prefix_suffix = _candidate_table(self.prefixes, self.suffixes, _join_prefix, score_fn)
+        self.prefix_industry = _candidate_table(self.prefixes, self.industry_words, _join_prefix, score_fn)
+        # Creative strategy: every ordered pair of (prefix, industry, suffix)
+        parts = (self.prefixes, self.industry_words, self.suffixes)
+        self.creative = tuple(
+            _candidate_table(first, second, _join_capitalized, score_fn)
+            for first, second in permutations(parts, 2)
+        )
+
+
+class BrandService:
+    def __init__(self, availability_provider=None, availability_fanout=None, spans=None, lexicon=None,
+                 trademark_index=None, pronounceability=None, pronounceability_weight=None):
+        # Domain / trademark / social lookups; cached mock unless one is injected
+        self.availability = availability_provider or CachedAvailabilityProvider(MockAvailabilityProvider())
+        # Optional AvailabilityFanout - runs a name's lookups concurrently
+        self.availability_fanout = availability_fanout
+        # Optional utils.metrics.SpanTimer for per-stage timings
+        self.spans = spans
+        # Optional services.trademark_service.TrademarkIndex for conflict screening
+        self.trademark_index = trademark_index
+        # Optional services.pronounceability_service.PronounceabilityModel blended into memorability
+        self.pronounceability = pronounceability
+        # Share of memorabilityScore taken from that model (PRONOUNCEABILITY_WEIGHT by default)
+        self.pronounceability_weight = (
+            Config.PRONOUNCEABILITY_WEIGHT if pronounceability_weight is None else pronounceability_weight
+        )
         
-        self.industry_words = {
-            'Technology': ['tech', 'digital', 'smart', 'cloud', 'cyber', 'data', 'ai', 'quantum', 'neural', 'bit'],
-            'Healthcare': ['health', 'care', 'med', 'vita', 'life', 'wellness', 'cure', 'heal', 'bio', 'pulse'],
-            'Finance': ['fin', 'pay', 'wealth', 'trust', 'capital', 'invest', 'money', 'coin', 'ledger', 'vault'],
-            'Education': ['edu', 'learn', 'scholar', 'academy', 'brain', 'study', 'teach', 'knowledge', 'wise', 'mind'],
-            'Retail': ['shop', 'mart', 'store', 'market', 'buy', 'trade', 'commerce', 'bazaar', 'emporium', 'exchange'],
-            'Food': ['food', 'taste', 'flavor', 'dish', 'kitchen', 'cook', 'fresh', 'bite', 'feast', 'savory'],
-            'Fashion': ['style', 'chic', 'mode', 'vogue', 'wear', 'thread', 'fabric', 'couture', 'trend', 'glam'],
-            'Travel': ['go', 'voyage', 'journey', 'trip', 'explore', 'wander', 'roam', 'nomad', 'quest', 'venture']
-        }
+        # Word lists: a LexiconStore (hot-reloaded file) or the built-in lists
+        self.lexicon = lexicon or StaticLexicon()
+        
+        # (lexicon generation, tone, industry) -> _CandidateIndex, built on first use;
+        # the lock makes request threads and the suggestion pool build each one once
+        self._candidate_indexes = OrderedDict()
+        self._candidate_generation = None
+        self._candidate_lock = threading.Lock()
+    
+    @property
+    def prefixes(self):
+        """Tone -> prefix list"""
+        return self.lexicon.words('prefix')
+    
+    @property
+    def suffixes(self):
+        """Tone -> suffix list"""
+        return self.lexicon.words('suffix')
     
-    def generate_names(self, industry, keywords, tone, count):
-        """Generate brand names based on parameters"""
-        names = []
+    @property
+    def industry_words(self):
+        """Industry -> word list"""
+        return self.lexicon.words('industry')
+    
+    def generate_names(self, industry, keywords, tone, count, ranked=False, oversample=RANKED_OVERSAMPLE, rng=None,
+                       screen_trademarks=False, stamp=None):
+        """
+        Generate brand names based on parameters
+        
+        With ranked=True, count * oversample candidates are generated,
+        duplicates (case-insensitive) are dropped and the top `count` by
+        combined score are returned, best first.
+        
+        With screen_trademarks=True and a trademark index configured, names
+        that conflict with a registered mark are dropped before selection;
+        fewer than `count` names come back if too many candidates conflict.
+        
+        Pass a random.Random as `rng` for reproducible output; the global
+        random module is used otherwise. Ids are brand_<position>_<stamp>,
+        the stamp defaulting to the current time in milliseconds: pass a
+        fixed one as well for reproducible ids.
+        """
+        records = self.generate_records(industry, keywords, tone, count, ranked, oversample, rng, screen_trademarks,
+                                        stamp)
+        return [record.to_dict() for record in records]
+    
+    def generate_records(self, industry, keywords, tone, count, ranked=False, oversample=RANKED_OVERSAMPLE, rng=None,
+                         screen_trademarks=False, stamp=None):
+        """
+        Same as generate_names, but returns BrandNameRecord objects
+        
+        Callers that hold or stream many names can keep the compact records
+        and call to_dict() only when serializing.
+        """
+        rng = rng or random
         keywords_list = [k.strip() for k in keywords.split(',') if k.strip()]
+        # One stamp per batch; ids are brand_<position>_<stamp>
+        if stamp is None:
+            stamp = int(datetime.now().timestamp() * 1000)
+        seq = itertools.count(1)
+        template_count = len(_DESCRIPTION_TEMPLATES)
+        screen = self.trademark_index if screen_trademarks else None
         
-        prefixes = self.prefixes.get(tone, self.prefixes['Modern'])
-        suffixes = self.suffixes.get(tone, self.suffixes['Modern'])
-        industry_words = self.industry_words.get(industry, self.industry_words['Technology'])
+        if not ranked:
+            candidates = self._generate_candidates(tone, industry, keywords_list, count, rng)
+            if screen is not None:
+                candidates = self._screen_candidates(candidates, screen, count, tone, industry, keywords_list, rng)
+            with self._span('description'):
+                return [
+                    BrandNameRecord(
+                        next(seq), stamp, name, industry, tone,
+                        rng.randint(65, 98), rng.randint(55, 95), memorability_score,
+                        rng.randrange(template_count)
+                    )
+                    for name, memorability_score in candidates
+                ]
+        
+        pool_size = count * max(1, min(int(oversample), RANKED_OVERSAMPLE))
+        candidates = self._generate_candidates(tone, industry, keywords_list, pool_size, rng)
+        if screen is not None:
+            with self._span('screening'):
+                blocked = screen.conflicting({name for name, _ in candidates})
+            candidates = [candidate for candidate in candidates if candidate[0] not in blocked]
+        with self._span('ranking'):
+            top = heapq.nlargest(count, self._rank_candidates(candidates, rng), key=itemgetter(0))
+        
+        with self._span('description'):
+            return [
+                BrandNameRecord(
+                    next(seq), stamp, name, industry, tone,
+                    domain_score, trademark_score, memorability_score,
+                    rng.randrange(template_count), rank_score
+                )
+                for rank_score, name, memorability_score, domain_score, trademark_score in top
+            ]
+    
+    def _generate_candidates(self, tone, industry, keywords_list, count, rng):
+        """Draw `count` (name, memorability) pairs using random strategies"""
+        index = self._get_candidate_index(tone, industry)
         
         strategies = [
             self._strategy_prefix_suffix,
@@ -51,73 +321,150 @@ class BrandService:
             self._strategy_compound
         ]
         
-        for i in range(count):
-            strategy = random.choice(strategies)
-            name = strategy(prefixes, suffixes, industry_words, keywords_list)
-            
-            # Calculate scores
-            domain_score = random.randint(65, 98)
-            trademark_score = random.randint(55, 95)
-            memorability_score = self._calculate_memorability(name)
+        with self._span('strategy'):
+            candidates = [rng.choice(strategies)(index, keywords_list, rng) for _ in range(count)]
+        
+        # Keyword-built names are scored together in one batch
+        unscored = [i for i, (name, score) in enumerate(candidates) if score is None]
+        if unscored:
+            with self._span('scoring'):
+                scores = self.calculate_memorability_batch(candidates[i][0] for i in unscored)
+            for i, score in zip(unscored, scores):
+                candidates[i] = (candidates[i][0], score)
+        return candidates
+    
+    def _screen_candidates(self, candidates, screen, count, tone, industry, keywords_list, rng):
+        """Drop names that conflict with registered marks, drawing replacements a few times"""
+        kept = []
+        for _ in range(SCREENING_ROUNDS + 1):
+            with self._span('screening'):
+                blocked = screen.conflicting({name for name, _ in candidates})
+            kept.extend(candidate for candidate in candidates if candidate[0] not in blocked)
+            shortfall = count - len(kept)
+            if shortfall <= 0:
+                break
+            candidates = self._generate_candidates(tone, industry, keywords_list, shortfall * 2, rng)
+        return kept[:count]
+    
+    def _rank_candidates(self, candidates, rng):
+        """Yield (rank_score, name, memorability, domain, trademark) for unique names"""
+        w_memorability, w_domain, w_trademark = RANKING_WEIGHTS
+        seen = set()
+        for name, memorability_score in candidates:
+            key = name.lower()
+            if key in seen:
+                continue
+            seen.add(key)
             
-            names.append({
-                'id': f'brand_{i+1}_{int(datetime.now().timestamp() * 1000)}',
-                'name': name,
-                'domain': f"{name.lower()}.com",
-                'domainAvailable': domain_score > 70,
-                'domainScore': domain_score,
-                'trademarkAvailable': trademark_score > 60,
-                'trademarkScore': trademark_score,
-                'memorabilityScore': memorability_score,
-                'description': self._generate_description(name, industry, tone),
-                'alternativeDomains': [
-                    f"{name.lower()}.io",
-                    f"{name.lower()}.ai",
-                    f"{name.lower()}.co"
-                ]
-            })
+            domain_score = rng.randint(65, 98)
+            trademark_score = rng.randint(55, 95)
+            rank_score = round(
+                w_memorability * memorability_score
+                + w_domain * domain_score
+                + w_trademark * trademark_score,
+                2
+            )
+            yield rank_score, name, memorability_score, domain_score, trademark_score
+    
+    def _span(self, name):
+        """Timing span for a generation stage (no-op unless spans are enabled)"""
+        return self.spans.span('brand', name) if self.spans is not None else NULL_SPAN
+    
+    def warm(self):
+        """
+        Build the candidate index of every (tone, industry) pair now rather
+        than on first use. Returns the number of indexes built.
+        """
+        lexicon = self.lexicon.current()
+        suffixes = lexicon.words('suffix')
+        pairs = [
+            (tone, industry)
+            for tone in lexicon.words('prefix') if tone in suffixes
+            for industry in lexicon.words('industry')
+        ]
+        for tone, industry in pairs[:_CANDIDATE_INDEX_LIMIT]:
+            self._get_candidate_index(tone, industry)
+        return min(len(pairs), _CANDIDATE_INDEX_LIMIT)
+    
+    def _get_candidate_index(self, tone, industry):
+        """Return the precompiled candidate index for a (tone, industry) pair"""
+        lexicon = self.lexicon.current()
+        prefixes = lexicon.words('prefix')
+        suffixes = lexicon.words('suffix')
+        industry_words = lexicon.words('industry')
         
-        return names
+        if tone not in prefixes or tone not in suffixes:
+            tone = 'Modern' if 'Modern' in prefixes and 'Modern' in suffixes else next(
+                t for t in prefixes if t in suffixes)
+        if industry not in industry_words:
+            industry = 'Technology' if 'Technology' in industry_words else next(iter(industry_words))
+        
+        key = (lexicon.generation, tone, industry)
+        with self._candidate_lock:
+            if lexicon.generation != self._candidate_generation:
+                # Lexicon was reloaded - indexes built from the old lists are stale
+                self._candidate_indexes = OrderedDict()
+                self._candidate_generation = lexicon.generation
+            
+            index = self._candidate_indexes.get(key)
+            if index is not None:
+                # Least recently used first out
+                self._candidate_indexes.move_to_end(key)
+            else:
+                index = _CandidateIndex(
+                    prefixes[tone],
+                    suffixes[tone],
+                    industry_words[industry],
+                    self.calculate_memorability_batch
+                )
+                if len(self._candidate_indexes) >= _CANDIDATE_INDEX_LIMIT:
+                    self._candidate_indexes.popitem(last=False)
+                self._candidate_indexes[key] = index
+        return index
     
-    def _strategy_prefix_suffix(self, prefixes, suffixes, industry_words, keywords):
+    # Strategies return (name, memorability) - memorability is None when the
+    # name was built from request keywords and still has to be scored.
+    
+    def _strategy_prefix_suffix(self, index, keywords, rng):
         """Combine prefix and suffix"""
-        return random.choice(prefixes) + random.choice(suffixes).capitalize()
+        return index.prefix_suffix.sample(rng)
     
-    def _strategy_keyword_suffix(self, prefixes, suffixes, industry_words, keywords):
+    def _strategy_keyword_suffix(self, index, keywords, rng):
         """Use keyword with suffix"""
         if keywords:
-            keyword = random.choice(keywords).strip().capitalize()
-            return keyword + random.choice(suffixes).capitalize()
-        return self._strategy_prefix_suffix(prefixes, suffixes, industry_words, keywords)
+            keyword = rng.choice(keywords).strip().capitalize()
+            return keyword + rng.choice(index.suffixes).capitalize(), None
+        return self._strategy_prefix_suffix(index, keywords, rng)
     
-    def _strategy_blend(self, prefixes, suffixes, industry_words, keywords):
+    def _strategy_blend(self, index, keywords, rng):
         """Blend keyword with industry word"""
         if keywords:
-            kw = random.choice(keywords).strip()
-            return kw[:4].capitalize() + random.choice(industry_words)[:4].capitalize()
-        return random.choice(prefixes) + random.choice(industry_words).capitalize()
+            kw = rng.choice(keywords).strip()
+            return kw[:4].capitalize() + rng.choice(index.industry_words)[:4].capitalize(), None
+        return index.prefix_industry.sample(rng)
     
-    def _strategy_creative(self, prefixes, suffixes, industry_words, keywords):
+    def _strategy_creative(self, index, keywords, rng):
         """Creative combination"""
-        parts = [
-            random.choice(prefixes),
-            random.choice(industry_words),
-            random.choice(suffixes)
-        ]
-        # Use 2 random parts
-        selected = random.sample(parts, 2)
-        return ''.join([p.capitalize() for p in selected])
+        # Use 2 random parts - one table per ordered pair of parts
+        return rng.choice(index.creative).sample(rng)
     
-    def _strategy_compound(self, prefixes, suffixes, industry_words, keywords):
+    def _strategy_compound(self, index, keywords, rng):
         """Compound word strategy"""
         if keywords and len(keywords) >= 2:
-            kw1 = random.choice(keywords).strip()
-            kw2 = random.choice(keywords).strip()
-            return kw1[:4].capitalize() + kw2[:4].capitalize()
-        return random.choice(prefixes) + random.choice(industry_words).capitalize()
+            kw1 = rng.choice(keywords).strip()
+            kw2 = rng.choice(keywords).strip()
+            return kw1[:4].capitalize() + kw2[:4].capitalize(), None
+        return index.prefix_industry.sample(rng)
     
     def _calculate_memorability(self, name):
         """Calculate how memorable a name is"""
+        score = self._heuristic_memorability(name)
+        if self.pronounceability is None:
+            return score
+        return self._blend_pronounceability(score, self.pronounceability.score(name))
+    
+    def _heuristic_memorability(self, name):
+        """Length, letter-combination and vowel-ratio score"""
         score = 100
         
         # Penalize long names
@@ -129,58 +476,228 @@ class BrandService:
             score += 10
         
         # Check for difficult letter combinations
-        difficult_combos = ['xz', 'qx', 'zq', 'pf', 'vw']
-        for combo in difficult_combos:
+        for combo in _DIFFICULT_COMBOS:
             if combo in name.lower():
                 score -= 15
         
         # Bonus for vowel distribution
-        vowels = sum(1 for c in name.lower() if c in 'aeiou')
+        vowels = sum(1 for c in name.lower() if c in _VOWELS)
         if 0.3 <= vowels / len(name) <= 0.5:
             score += 10
         
         return max(0, min(100, score))
     
-    def _generate_description(self, name, industry, tone):
+    def calculate_memorability_batch(self, names):
+        """
+        Score many names at once.
+        
+        Returns a list of ints identical to calling _calculate_memorability
+        on each name. ASCII names are scored in one vectorized pass over a
+        fixed-width byte matrix when numpy is available; anything else goes
+        through the scalar function. The pronounceability model, if any,
+        scores the whole batch in a single pass of its own.
+        """
+        names = list(names)
+        scores = self._heuristic_memorability_batch(names)
+        if self.pronounceability is None or not names:
+            return scores
+        blend = self._blend_pronounceability
+        return [blend(score, p) for score, p in zip(scores, self.pronounceability.score_batch(names))]
+    
+    def _heuristic_memorability_batch(self, names):
+        if np is None or not names:
+            return [self._heuristic_memorability(name) for name in names]
+        
+        ascii_pos = [i for i, name in enumerate(names) if name.isascii()]
+        if len(ascii_pos) == len(names):
+            return _memorability_vectorized(names).tolist()
+        
+        scores = [None] * len(names)
+        if ascii_pos:
+            vectorized = _memorability_vectorized([names[i] for i in ascii_pos])
+            for i, score in zip(ascii_pos, vectorized.tolist()):
+                scores[i] = score
+        for i, name in enumerate(names):
+            if scores[i] is None:
+                scores[i] = self._heuristic_memorability(name)
+        return scores
+    
+    def _blend_pronounceability(self, score, pronounceability):
+        weight = self.pronounceability_weight
+        return round((1 - weight) * score + weight * pronounceability)
+    
+    def _generate_description(self, name, industry, tone, rng=random):
         """Generate description for the brand"""
-        templates = [
-            f"A {tone.lower()} {industry.lower()} brand that combines innovation with reliability.",
-            f"{name} represents the future of {industry.lower()} with a {tone.lower()} approach.",
-            f"Transforming {industry.lower()} through {tone.lower()} solutions and cutting-edge technology.",
-            f"Experience {industry.lower()} reimagined with {name}'s {tone.lower()} vision.",
-        ]
-        return random.choice(templates)
+        template = rng.choice(_DESCRIPTION_TEMPLATES)
+        return template.format(name=name, industry=industry.lower(), tone=tone.lower())
     
-    def check_availability(self, name):
-        """Check domain and trademark availability"""
-        # Mock implementation - in production, use real APIs
-        domain_available = random.choice([True, False])
-        trademark_available = random.choice([True, False])
+    def check_availability(self, name, timeout=None):
+        """
+        Check domain and trademark availability
+        
+        With an availability fanout configured, all lookups run concurrently
+        and anything not finished within `timeout` (default: the fanout's
+        deadline) is left as None and listed in 'timedOut'.
+        """
+        label = normalize_name(name)
+        lookups = self._availability_lookups(label)
+        
+        if self.availability_fanout is not None:
+            results, timed_out = self.availability_fanout.run(lookups, timeout)
+        else:
+            results = {key: fn(*args) for key, (kind, fn, args) in lookups.items()}
+            timed_out = []
+        
+        return self._availability_result(name, label, results, timed_out)
+    
+    def check_availability_batch(self, names, chunk_size=50, timeout=None):
+        """
+        Check availability for many names, yielding one result per name in order
+        
+        Names are processed in chunks, each chunk's lookups sent to the
+        provider's bulk methods once per lookup kind. Lookups shared between
+        names (repeated names, or e.g. the getapex.com alternative of "Apex"
+        and the .com of "GetApex") are made once per request, whichever
+        chunks the names are in; one that timed out or failed is reported
+        as timed out for every name needing it.
+        """
+        keys_by_label = {}
+        results = {}
+        attempted = set()
+        for start in range(0, len(names), chunk_size):
+            chunk = names[start:start + chunk_size]
+            for name in chunk:
+                label = normalize_name(name)
+                if label not in keys_by_label:
+                    keys_by_label[label] = self._availability_keys(label)
+            
+            new_keys = {key for name in chunk for key in keys_by_label[normalize_name(name)]} - attempted
+            if new_keys:
+                attempted |= new_keys
+                results.update(self._bulk_availability(new_keys, timeout))
+            
+            for name in chunk:
+                label = normalize_name(name)
+                timed_out = [key for key in keys_by_label[label] if key not in results]
+                yield self._availability_result(name, label, results, timed_out)
+    
+    def _availability_keys(self, label):
+        """Lookup keys for one name: ('domain', label, tld), ('trademark', label), ('social', label, network)"""
+        keys = [('domain', label, 'com')]
+        keys.extend(('domain', alt, tld) for alt, tld in alternative_domains(label))
+        keys.append(('trademark', label))
+        keys.extend(('social', label, network) for network in SOCIAL_NETWORKS)
+        return keys
+    
+    def _availability_lookups(self, label):
+        """All lookups for one name as {key: (kind, fn, args)}"""
+        provider = self.availability
+        fns = {
+            'domain': provider.lookup_domain,
+            'trademark': provider.lookup_trademark,
+            'social': provider.lookup_social
+        }
+        return {key: (key[0], fns[key[0]], key[1:]) for key in self._availability_keys(label)}
+    
+    def _bulk_availability(self, keys, timeout=None):
+        """Resolve a set of lookup keys with one bulk provider call per kind"""
+        provider = self.availability
+        domains = [key[1:] for key in keys if key[0] == 'domain']
+        trademarks = [key[1] for key in keys if key[0] == 'trademark']
+        socials = [key[1:] for key in keys if key[0] == 'social']
+        
+        lookups = {
+            'domain': ('domain', provider.lookup_domains, (domains,)),
+            'trademark': ('trademark', provider.lookup_trademarks, (trademarks,)),
+            'social': ('social', provider.lookup_socials, (socials,))
+        }
+        if self.availability_fanout is not None:
+            bulk, _ = self.availability_fanout.run(lookups, timeout)
+        else:
+            bulk = {}
+            for kind, (_, fn, args) in lookups.items():
+                try:
+                    bulk[kind] = fn(*args)
+                except Exception:  # its keys are reported as timed out, as with a fanout
+                    pass
+        
+        results = {}
+        for (label, tld), value in bulk.get('domain', {}).items():
+            results[('domain', label, tld)] = value
+        for name, value in bulk.get('trademark', {}).items():
+            results[('trademark', name)] = value
+        for (handle, network), value in bulk.get('social', {}).items():
+            results[('social', handle, network)] = value
+        return results
+    
+    def _availability_result(self, name, label, results, timed_out):
+        """Assemble the check_availability response from lookup results"""
+        domain = results.get(('domain', label, 'com')) or {'available': None, 'price': None}
+        trademark = results.get(('trademark', label)) or {'available': None, 'conflicts': []}
+        
+        alternatives = []
+        alternatives_available = {}
+        for alt, tld in alternative_domains(label):
+            alt_domain = results.get(('domain', alt, tld))
+            alternatives.append(f'{alt}.{tld}')
+            alternatives_available[f'{alt}.{tld}'] = alt_domain['available'] if alt_domain else None
         
         return {
             'name': name,
             'domain': {
-                'available': domain_available,
-                'price': random.randint(10, 50) if domain_available else None,
-                'alternatives': [
-                    f"{name.lower()}.io",
-                    f"{name.lower()}.ai",
-                    f"{name.lower()}.co",
-                    f"get{name.lower()}.com"
-                ]
+                'available': domain['available'],
+                'price': domain['price'],
+                'alternatives': alternatives,
+                'alternativesAvailable': alternatives_available
             },
             'trademark': {
-                'available': trademark_available,
-                'conflicts': [] if trademark_available else ['Similar trademark found in class 42']
+                'available': trademark['available'],
+                'conflicts': trademark['conflicts'],
+                'matches': trademark.get('matches', [])
             },
             'social': {
-                'twitter': random.choice([True, False]),
-                'instagram': random.choice([True, False]),
-                'facebook': random.choice([True, False])
-            }
+                network: results.get(('social', label, network))
+                for network in SOCIAL_NETWORKS
+            },
+            'partial': bool(timed_out),
+            'timedOut': [_lookup_label(key) for key in timed_out]
         }
     
-    def get_quick_suggestions(self, industry, tone):
+    def get_quick_suggestions(self, industry, tone, rng=None):
         """Get quick brand suggestions without keywords"""
-        keywords = ', '.join(random.sample(self.industry_words.get(industry, []), 3))
-        return self.generate_names(industry, keywords, tone, 5)
+        rng = rng or random
+        words = self.industry_words.get(industry, ())
+        keywords = ', '.join(rng.sample(words, min(3, len(words))))
+        return self.generate_names(industry, keywords, tone, 5, rng=rng)
+
+
+def _lookup_label(key):
+    """Readable label for an availability lookup key, e.g. 'domain:apex.io'"""
+    if key[0] == 'domain':
+        return f'domain:{key[1]}.{key[2]}'
+    if key[0] == 'social':
+        return f'social:{key[2]}'
+    return key[0]
+
+
+def _memorability_vectorized(names):
+    """Vectorized _heuristic_memorability for a list of non-empty ASCII names"""
+    buf = np.array(names, dtype=np.bytes_)
+    lengths = np.char.str_len(buf).astype(np.int64)
+    codes = buf.view(np.uint8).reshape(len(names), buf.dtype.itemsize)
+    # ASCII lowercase: set bit 0x20 on 'A'-'Z' only
+    codes = codes | (((codes >= 65) & (codes <= 90)) * np.uint8(32)).astype(np.uint8)
+    
+    scores = np.full(len(names), 100, dtype=np.int64)
+    scores -= np.maximum(lengths - 12, 0) * 5
+    scores += (lengths <= 8) * 10
+    
+    for a, b in _DIFFICULT_COMBOS:
+        pair = (codes[:, :-1] == ord(a)) & (codes[:, 1:] == ord(b))
+        scores -= pair.any(axis=1) * 15
+    
+    vowels = np.isin(codes, np.frombuffer(_VOWELS.encode(), dtype=np.uint8)).sum(axis=1)
+    ratio = vowels / lengths
+    scores += ((ratio >= 0.3) & (ratio <= 0.5)) * 10
+    
+    return np.clip(scores, 0, 100)
@@ -0,0 +1,66 @@
+"""
+Response Compression
+gzip / brotli encoding of large, non-streamed responses
+"""
+import gzip
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # brotli is optional - gzip is used instead
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'text/plain',
+    'text/css',
+    'text/html',
+    'application/javascript',
+}
+
+
+def compress_body(data, accept_encodings, level=6, brotli_quality=4):
+    """
+    Encode `data` with the best encoding the client accepts.
+
+    Returns (encoding, body), or (None, data) if neither brotli nor gzip
+    is acceptable.
+    """
+    if brotli is not None and accept_encodings['br']:
+        return 'br', brotli.compress(data, quality=brotli_quality)
+    if accept_encodings['gzip']:
+        return 'gzip', gzip.compress(data, compresslevel=level, mtime=0)
+    return None, data
+
+
+def init_compression(app):
+    """Compress responses of at least COMPRESSION_MIN_SIZE bytes after each request"""
+    min_size = app.config['COMPRESSION_MIN_SIZE']
+    level = app.config['COMPRESSION_LEVEL']
+    brotli_quality = app.config['COMPRESSION_BROTLI_QUALITY']
+
+    @app.after_request
+    def _compress_response(response):
+        if (response.direct_passthrough or response.is_streamed
+                or not 200 <= response.status_code < 300
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+
+        encoding, body = compress_body(data, request.accept_encodings, level, brotli_quality)
+        if encoding is None:
+            return response
+
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+        # The body changed, so a strong ETag would be wrong; keep it as a weak one
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
@@ -13,6 +13,18 @@ class Config:
     PORT = int(os.getenv('PORT', 5000))
     DEBUG = os.getenv('FLASK_ENV', 'development') == 'development'
     
+    # Production Server (serve.py)
+    SERVER_WORKERS = int(os.getenv('SERVER_WORKERS', 0))  # 0 = one per CPU core
+    SERVER_THREADS = int(os.getenv('SERVER_THREADS', 16))  # requests each worker serves at once
+    SERVER_BACKLOG = int(os.getenv('SERVER_BACKLOG', 2048))
+    SERVER_MAX_REQUESTS = int(os.getenv('SERVER_MAX_REQUESTS', 10000))  # recycle a worker after this many; 0 = never
+    SERVER_MAX_REQUESTS_JITTER = int(os.getenv('SERVER_MAX_REQUESTS_JITTER', 1000))  # so workers don't recycle together
+    SERVER_GRACEFUL_TIMEOUT = float(os.getenv('SERVER_GRACEFUL_TIMEOUT', 30))  # seconds to finish in-flight requests
+    
+    # Startup: with LAZY_INIT, services (and numpy, word lists, models) are built
+    # on first use instead of at import; serve.py builds them before forking either way
+    LAZY_INIT = os.getenv('LAZY_INIT', 'false').lower() == 'true'
+    
     # CORS Settings
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', 'http://localhost:3000,http://localhost:8080,http://127.0.0.1:5500').split(',')
     
@@ -23,15 +35,85 @@ class Config:
     API_VERSION = 'v1'
     API_PREFIX = '/api'
     
-    # Rate Limiting
-    RATE_LIMIT_ENABLED = True
-    RATE_LIMIT_DEFAULT = '100/hour'
+    # Rate Limiting (per client; see utils/rate_limit.py for per-endpoint token costs)
+    RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    RATE_LIMIT_DEFAULT = os.getenv('RATE_LIMIT_DEFAULT', '100/hour')
+    RATE_LIMIT_ROUTES = dict(  # endpoint=rate pairs with their own bucket, e.g. 'brand.generate_brand_names=300/hour'
+        item.split('=', 1) for item in os.getenv('RATE_LIMIT_ROUTES', '').split(',') if '=' in item
+    )
+    RATE_LIMIT_STORAGE = os.getenv('RATE_LIMIT_STORAGE')  # file shared by all workers, e.g. /dev/shm/brandarc-ratelimit
+    RATE_LIMIT_SLOTS = int(os.getenv('RATE_LIMIT_SLOTS', 65536))  # buckets in the shared file (16 bytes each)
+    RATE_LIMIT_TRUSTED_PROXIES = int(os.getenv('RATE_LIMIT_TRUSTED_PROXIES', 0))  # X-Forwarded-For hops to trust
+    
+    # Serialization
+    JSON_FAST_ENCODER = os.getenv('JSON_FAST_ENCODER', 'true').lower() == 'true'  # orjson if installed
+    COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'true').lower() == 'true'
+    COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))  # bytes
+    COMPRESSION_LEVEL = int(os.getenv('COMPRESSION_LEVEL', 6))  # gzip 1-9
+    COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 4))  # brotli 0-11, if installed
+    
+    # Metrics
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_SERVICE_SPANS = os.getenv('METRICS_SERVICE_SPANS', 'false').lower() == 'true'  # timing inside BrandService
+    
+    # Profiling (admin endpoints under /admin/profile, X-Profile request header)
+    PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'false').lower() == 'true'
+    PROFILING_ADMIN_TOKEN = os.getenv('PROFILING_ADMIN_TOKEN')  # required for any profiling
+    PROFILING_INTERVAL = float(os.getenv('PROFILING_INTERVAL', 0.005))  # seconds between samples
+    PROFILING_MAX_SECONDS = int(os.getenv('PROFILING_MAX_SECONDS', 60))  # longest on-demand capture
     
     # Generation Settings
     DEFAULT_BRAND_COUNT = 10
     MAX_BRAND_COUNT = 50
+    MAX_BATCH_JOBS = 500  # Jobs per /api/brand/generate/batch request
+    MAX_AVAILABILITY_BATCH = 500  # Names per /api/brand/check-availability/batch request
+    MAX_CONTENT_BATCH = 1000  # Jobs per /api/content/generate/batch request
+    PALETTE_CACHE_SIZE = int(os.getenv('PALETTE_CACHE_SIZE', 4096))  # (baseColor, scheme) pairs
+    DESIGN_SYSTEM_CACHE_SIZE = int(os.getenv('DESIGN_SYSTEM_CACHE_SIZE', 1024))  # rendered (format, inputs) entries
+    DESIGN_SYSTEM_CACHE_MAX_BYTES = int(os.getenv('DESIGN_SYSTEM_CACHE_MAX_BYTES', 16 * 1024 * 1024))
+    
+    # Lexicon (word lists; built-in lists unless a file from lexicon_service.py build is given)
+    LEXICON_PATH = os.getenv('LEXICON_PATH')
+    LEXICON_RELOAD_INTERVAL = float(os.getenv('LEXICON_RELOAD_INTERVAL', 5))  # seconds between file change checks
+    
+    # Trademark Registry (one mark per line, optional tab + class; .gz allowed)
+    TRADEMARK_REGISTRY_PATH = os.getenv('TRADEMARK_REGISTRY_PATH')  # mock trademark results when unset
+    
+    # Pronounceability Model (from pronounceability_service.py train; heuristic memorability only when unset)
+    PRONOUNCEABILITY_MODEL_PATH = os.getenv('PRONOUNCEABILITY_MODEL_PATH')
+    PRONOUNCEABILITY_WEIGHT = float(os.getenv('PRONOUNCEABILITY_WEIGHT', 0.4))  # share of memorabilityScore
+    
+    # Name Store (SQLite file of every generated name, searched under /api/brand/names; off when unset)
+    NAME_STORE_PATH = os.getenv('NAME_STORE_PATH')  # e.g. data/names.db
+    NAME_STORE_BATCH_SIZE = int(os.getenv('NAME_STORE_BATCH_SIZE', 5000))  # most rows per write transaction
+    NAME_STORE_MAX_PENDING = int(os.getenv('NAME_STORE_MAX_PENDING', 100000))  # queued rows; more are dropped
+    NAME_STORE_READERS = int(os.getenv('NAME_STORE_READERS', 8))  # idle read connections kept per worker
+    
+    # Response Cache (seeded generate / suggestions responses)
+    RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', 1024))  # entries
+    RESPONSE_CACHE_MAX_BYTES = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+    
+    # Suggestion Pool (pre-generated /api/brand/suggestions results)
+    SUGGESTION_POOL_ENABLED = os.getenv('SUGGESTION_POOL_ENABLED', 'true').lower() == 'true'
+    SUGGESTION_POOL_DEPTH = int(os.getenv('SUGGESTION_POOL_DEPTH', 8))  # sets per (industry, tone)
+    SUGGESTION_REFRESH_INTERVAL = int(os.getenv('SUGGESTION_REFRESH_INTERVAL', 300))  # seconds
     DEFAULT_LOGO_COUNT = 8
     DEFAULT_PALETTE_COUNT = 5
+    
+    # Availability Lookups (domain / trademark / social cache)
+    AVAILABILITY_CACHE_SIZE = int(os.getenv('AVAILABILITY_CACHE_SIZE', 10000))
+    AVAILABILITY_CACHE_TTL = int(os.getenv('AVAILABILITY_CACHE_TTL', 3600))  # seconds
+    AVAILABILITY_CACHE_AVAILABLE_TTL = int(os.getenv('AVAILABILITY_CACHE_AVAILABLE_TTL', 300))  # seconds, "available" results
+    AVAILABILITY_CONCURRENT = os.getenv('AVAILABILITY_CONCURRENT', 'true').lower() == 'true'
+    AVAILABILITY_TIMEOUT = float(os.getenv('AVAILABILITY_TIMEOUT', 2.0))  # seconds, per request
+    AVAILABILITY_MAX_WORKERS = int(os.getenv('AVAILABILITY_MAX_WORKERS', 32))
+    AVAILABILITY_CONCURRENCY_LIMITS = {'domain': 16, 'trademark': 4, 'social': 8}  # in-flight lookups per provider
+    # Async mode: lookups run on one event loop per worker, over pooled keep-alive
+    # connections to AVAILABILITY_BACKEND_URL (random results when it is unset)
+    AVAILABILITY_ASYNC = os.getenv('AVAILABILITY_ASYNC', 'false').lower() == 'true'
+    AVAILABILITY_BACKEND_URL = os.getenv('AVAILABILITY_BACKEND_URL')  # e.g. http://127.0.0.1:8090
+    AVAILABILITY_POOL_CONNECTIONS = int(os.getenv('AVAILABILITY_POOL_CONNECTIONS', 100))  # per backend host
+    AVAILABILITY_POOL_IDLE_TIMEOUT = float(os.getenv('AVAILABILITY_POOL_IDLE_TIMEOUT', 30))  # seconds
 
 class DevelopmentConfig(Config):
     """Development configuration"""
@@ -0,0 +1,94 @@
+"""
+Content Service
+Marketing copy rendered from templates that are compiled once into render plans
+"""
+import string
+from operator import itemgetter
+
+# Placeholders a template may use, in the order render() takes their values
+FIELDS = ('brand', 'industry')
+
+TEMPLATES = {
+    'tagline': (
+        '{brand} - Where Innovation Meets Excellence',
+        'Transform Your {industry} Experience with {brand}',
+        '{brand}: Empowering {industry} for Tomorrow',
+        'The Future of {industry} Starts Here',
+    ),
+    'description': (
+        '{brand} is a leading {industry} platform that helps businesses grow and succeed through innovative solutions.',
+        'Discover how {brand} is revolutionizing the {industry} industry with cutting-edge technology and expert insights.',
+        'Join thousands of satisfied customers who trust {brand} for their {industry} needs.',
+    ),
+    'social': (
+        '🚀 Excited to announce our latest update! #Innovation #{industry}',
+        '💡 Did you know? {brand} helps you achieve more in less time.',
+        "🌟 Join us on this incredible journey. Let's transform {industry} together!",
+    ),
+}
+DEFAULT_TYPE = 'tagline'
+
+
+class RenderPlan:
+    """
+    One template as a printf-style format and the FIELDS indexes that fill
+    it, so rendering is a single C-level `%` with no parsing.
+    """
+
+    __slots__ = ('template', 'format', 'fields', '_args')
+
+    def __init__(self, template):
+        parts = []
+        fields = []
+        for literal, field, spec, conversion in string.Formatter().parse(template):
+            parts.append(literal.replace('%', '%%'))
+            if field is None:
+                continue
+            if field not in FIELDS or spec or conversion:
+                raise ValueError(f'Unsupported placeholder {{{field}}} in template {template!r}')
+            parts.append('%s')
+            fields.append(FIELDS.index(field))
+        self.template = template
+        self.format = ''.join(parts)
+        self.fields = tuple(fields)
+        # values tuple -> the tuple of arguments `format` takes
+        self._args = itemgetter(*fields, len(FIELDS)) if fields else None
+
+    def render(self, values):
+        if self._args is None:
+            return self.format
+        # The sentinel index keeps itemgetter's result a tuple even for one field
+        return self.format % self._args(values)[:-1]
+
+
+class ContentService:
+    """Renders every template of a content type for a (brand, industry, tone)"""
+
+    def __init__(self, templates=None):
+        self.plans = {
+            content_type: tuple(RenderPlan(t) for t in texts)
+            for content_type, texts in (templates or TEMPLATES).items()
+        }
+        self.default_type = DEFAULT_TYPE if DEFAULT_TYPE in self.plans else next(iter(self.plans))
+
+    @property
+    def types(self):
+        return list(self.plans)
+
+    def resolve_type(self, content_type):
+        """Known content types as given; anything else falls back to the default"""
+        return content_type if isinstance(content_type, str) and content_type in self.plans else self.default_type
+
+    def generate(self, content_type, brand_name, industry, tone):
+        """
+        [{'text', 'type', 'tone', 'length'}] for every template of the type.
+        An unknown type renders the default type's templates but is reported
+        as given.
+        """
+        values = (str(brand_name), str(industry), None)
+        results = []
+        for plan in self.plans[self.resolve_type(content_type)]:
+            text = plan.render(values)
+            results.append({'text': text, 'type': content_type, 'tone': tone, 'length': len(text)})
+        return results
+
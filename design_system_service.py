@@ -0,0 +1,211 @@
+"""
+Design System Service
+Design tokens derived from a brand's primary color, palette and tone, with CSS and JSON exports
+"""
+import re
+
+from services.palette_service import from_oklch, normalize_color, text_color, to_oklch
+from utils.response_cache import ResponseCache
+
+DEFAULT_PRIMARY = '#6366f1'
+DEFAULT_TONE = 'Professional'
+# Only the palette colors that become primary, secondary and accent
+PALETTE_COLORS = 3
+
+# Fonts and corner rounding per brand tone (the tones of the name generator)
+TONES = {
+    'Professional': {'fontFamily': "'Inter', sans-serif", 'headingFont': "'Poppins', sans-serif", 'radius': 1.0},
+    'Modern': {'fontFamily': "'Inter', sans-serif", 'headingFont': "'Space Grotesk', sans-serif", 'radius': 1.5},
+    'Playful': {'fontFamily': "'Nunito', sans-serif", 'headingFont': "'Fredoka', sans-serif", 'radius': 2.0},
+    'Creative': {'fontFamily': "'DM Sans', sans-serif", 'headingFont': "'Playfair Display', serif", 'radius': 1.25},
+    'Tech': {'fontFamily': "'IBM Plex Sans', sans-serif", 'headingFont': "'JetBrains Mono', monospace", 'radius': 0.5},
+}
+_TONE_KEYS = {tone.lower(): tone for tone in TONES}
+
+# Status colors stay recognizable whatever the brand colors are
+STATUS_COLORS = {'success': '#10b981', 'warning': '#f59e0b', 'error': '#ef4444'}
+# Lightness of each step of the primary color's shade scale
+SHADES = {'50': 0.97, '100': 0.93, '200': 0.87, '300': 0.79, '400': 0.7,
+          '500': 0.61, '600': 0.53, '700': 0.45, '800': 0.37, '900': 0.29}
+
+FONT_SIZES = {'xs': '12px', 'sm': '14px', 'base': '16px', 'lg': '18px',
+              'xl': '20px', '2xl': '24px', '3xl': '30px', '4xl': '36px'}
+FONT_WEIGHTS = {'normal': 400, 'medium': 500, 'semibold': 600, 'bold': 700}
+SPACING = {'xs': '4px', 'sm': '8px', 'md': '16px', 'lg': '24px', 'xl': '32px', '2xl': '48px'}
+RADII = {'sm': 4, 'md': 8, 'lg': 12, 'xl': 16}
+# (offset x, offset y, blur, spread) in px and the opacity of the black shadow
+SHADOW_LAYERS = {
+    'sm': (0, 1, 2, 0, 0.05),
+    'md': (0, 4, 6, -1, 0.1),
+    'lg': (0, 10, 15, -3, 0.1),
+    'xl': (0, 20, 25, -5, 0.1),
+}
+
+def _css_length(px):
+    return f'{px}px' if px else '0'
+
+
+SHADOWS = {
+    size: f'{_css_length(x)} {_css_length(y)} {_css_length(blur)} {_css_length(spread)} rgba(0, 0, 0, {alpha})'
+    for size, (x, y, blur, spread, alpha) in SHADOW_LAYERS.items()
+}
+
+# Export format -> mimetype
+FORMATS = {'json': 'application/json', 'tokens': 'application/json', 'css': 'text/css'}
+
+# CSS custom property prefix of each token group
+_CSS_PREFIXES = {
+    'colors': 'color', 'shades': 'primary', 'fontSize': 'font-size', 'fontWeight': 'font-weight',
+    'spacing': 'space', 'borderRadius': 'radius', 'shadows': 'shadow',
+}
+# Design token ($type) of each token group
+_TOKEN_TYPES = {
+    'colors': 'color', 'shades': 'color', 'fontFamily': 'fontFamily', 'headingFont': 'fontFamily',
+    'fontSize': 'dimension', 'fontWeight': 'fontWeight', 'spacing': 'dimension',
+    'borderRadius': 'dimension',
+}
+_CAMEL = re.compile(r'(?<=[a-z0-9])([A-Z])')
+
+
+def normalize_tone(tone):
+    """Canonical tone name; unknown tones fall back to DEFAULT_TONE"""
+    return _TONE_KEYS.get(str(tone).strip().lower(), DEFAULT_TONE)
+
+
+def normalize_inputs(primary_color=None, palette=None, tone=None):
+    """
+    (primary color, palette colors, tone) with colors normalized - the
+    cache key of a design system. Palette colors past the first
+    PALETTE_COLORS are not used and are dropped. ValueError for an invalid
+    color.
+    """
+    if palette is not None:
+        if not isinstance(palette, (list, tuple)):
+            raise ValueError('"palette" must be a list of colors')
+        palette = tuple(normalize_color(color) for color in palette[:PALETTE_COLORS])
+    palette = palette or ()
+    primary = normalize_color(primary_color) if primary_color else (palette[0] if palette else DEFAULT_PRIMARY)
+    return primary, palette, normalize_tone(tone or DEFAULT_TONE)
+
+
+def design_tokens(primary, palette, tone):
+    """
+    Token tree for normalized inputs.
+
+    Secondary and accent colors come from the palette when it has them, and
+    are otherwise rotated from the primary hue in OKLCH. Neutrals are tinted
+    with the primary hue.
+    """
+    lightness, chroma, hue = to_oklch(primary)
+    secondary = palette[1] if len(palette) > 1 else from_oklch(lightness - 0.02, chroma * 0.95, hue + 30)
+    accent = palette[2] if len(palette) > 2 else from_oklch(max(lightness, 0.62), max(chroma, 0.12), hue + 75)
+    settings = TONES[tone]
+    return {
+        'colors': {
+            'primary': primary,
+            'secondary': secondary,
+            'accent': accent,
+            **STATUS_COLORS,
+            'background': '#ffffff',
+            'surface': from_oklch(0.985, 0.004, hue),
+            'text': from_oklch(0.28, 0.03, hue),
+            'textSecondary': from_oklch(0.55, 0.03, hue),
+            'onPrimary': text_color(primary),
+        },
+        'shades': {step: from_oklch(value, chroma * min(1.0, 0.3 + 1.4 * (1 - abs(value - 0.6))), hue)
+                   for step, value in SHADES.items()},
+        'typography': {
+            'fontFamily': settings['fontFamily'],
+            'headingFont': settings['headingFont'],
+            'fontSize': dict(FONT_SIZES),
+            'fontWeight': dict(FONT_WEIGHTS),
+        },
+        'spacing': dict(SPACING),
+        'borderRadius': {
+            **{size: f'{round(px * settings["radius"])}px' for size, px in RADII.items()},
+            'full': '9999px',
+        },
+        'shadows': dict(SHADOWS),
+        'tone': tone,
+    }
+
+
+def _kebab(name):
+    return _CAMEL.sub(r'-\1', name).lower()
+
+
+def to_css(tokens):
+    """The token tree as CSS custom properties on :root"""
+    lines = [':root {']
+    for group, values in tokens.items():
+        if group == 'typography':
+            lines.append(f'  --font-family: {values["fontFamily"]};')
+            lines.append(f'  --font-heading: {values["headingFont"]};')
+            for sub in ('fontSize', 'fontWeight'):
+                lines.extend(f'  --{_CSS_PREFIXES[sub]}-{key}: {value};' for key, value in values[sub].items())
+        elif group in _CSS_PREFIXES:
+            prefix = _CSS_PREFIXES[group]
+            lines.extend(f'  --{prefix}-{_kebab(key)}: {value};' for key, value in values.items())
+    lines.append('}')
+    return '\n'.join(lines) + '\n'
+
+
+def to_design_tokens(tokens):
+    """The token tree in the design tokens JSON format ({"$value", "$type"} leaves)"""
+    def leaves(values, token_type):
+        return {key: {'$value': value, '$type': token_type} for key, value in values.items()}
+
+    out = {}
+    for group, values in tokens.items():
+        if group == 'typography':
+            out[group] = {
+                'fontFamily': {'$value': values['fontFamily'], '$type': 'fontFamily'},
+                'headingFont': {'$value': values['headingFont'], '$type': 'fontFamily'},
+                'fontSize': leaves(values['fontSize'], 'dimension'),
+                'fontWeight': leaves(values['fontWeight'], 'fontWeight'),
+            }
+        elif group == 'shadows':
+            out[group] = {size: {'$value': _shadow_token(size), '$type': 'shadow'} for size in values}
+        elif group in _TOKEN_TYPES:
+            out[group] = leaves(values, _TOKEN_TYPES[group])
+    return out
+
+
+def _shadow_token(size):
+    x, y, blur, spread, alpha = SHADOW_LAYERS[size]
+    return {
+        'color': f'#000000{round(alpha * 255):02x}',
+        'offsetX': f'{x}px',
+        'offsetY': f'{y}px',
+        'blur': f'{blur}px',
+        'spread': f'{spread}px',
+    }
+
+
+class DesignSystemService:
+    """
+    Builds design systems and keeps every rendered format as serialized
+    bytes in a size-bounded cache, keyed by format and normalized inputs.
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=16 * 1024 * 1024):
+        self.cache = ResponseCache(max_entries=max_entries, max_bytes=max_bytes)
+
+    def render(self, fmt, key, dumps):
+        """Serialized body of one format; `dumps` is the app's JSON encoder"""
+        tokens = design_tokens(*key)
+        if fmt == 'css':
+            return to_css(tokens).encode('utf-8')
+        if fmt == 'tokens':
+            return dumps(to_design_tokens(tokens)).encode('utf-8')
+        return dumps({'success': True, 'data': {'designSystem': tokens}}).encode('utf-8')
+
+    def stats(self):
+        return self.cache.stats()
+
+
+def create_design_system_service(config):
+    return DesignSystemService(
+        max_entries=config.DESIGN_SYSTEM_CACHE_SIZE,
+        max_bytes=config.DESIGN_SYSTEM_CACHE_MAX_BYTES
+    )
@@ -0,0 +1,220 @@
+"""
+HTTP Pool
+Minimal asyncio HTTP/1.1 client that keeps connections to each backend host alive
+"""
+import asyncio
+import json
+import ssl
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+_MAX_LINE = 65536
+
+
+class HTTPError(Exception):
+    """Non-2xx response"""
+
+    def __init__(self, status, body):
+        super().__init__(f'HTTP {status}')
+        self.status = status
+        self.body = body
+
+
+class HTTPResponse:
+    __slots__ = ('status', 'headers', 'body')
+
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers  # lower-cased names
+        self.body = body
+
+    def json(self):
+        if not 200 <= self.status < 300:
+            raise HTTPError(self.status, self.body)
+        return json.loads(self.body)
+
+
+class HostPool:
+    """
+    Keep-alive connections to one (scheme, host, port).
+
+    At most `max_connections` requests are in flight; further requests
+    wait for a connection. Idle connections are reused most recently used
+    first and closed after `idle_timeout` seconds. A request that fails on
+    a reused connection (the server may have closed it meanwhile) is
+    retried once on a new one. Connecting and each exchange are bounded by
+    `timeout` seconds, so a backend that stops answering cannot hold on to
+    connections.
+
+    A pool belongs to the event loop that first uses it; if another loop
+    uses it (e.g. in a forked worker) it starts over with no connections.
+    """
+
+    def __init__(self, scheme, host, port, max_connections=100, idle_timeout=30.0, timeout=10.0):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self._host_header = host if port in (80, 443) else f'{host}:{port}'
+        self._loop = None
+        self._idle = deque()  # (reader, writer, idle since)
+        self._slots = None
+        self.opened = 0
+        self.requests = 0
+        self.reused = 0
+
+    async def request(self, method, path, body=None, headers=None):
+        self._bind()
+        async with self._slots:
+            for attempt in range(2):
+                conn = self._checkout() if attempt == 0 else None
+                reused = conn is not None
+                if conn is None:
+                    conn = await self._connect()
+                try:
+                    response, keep_alive = await asyncio.wait_for(
+                        self._roundtrip(conn, method, path, body, headers), self.timeout)
+                except (ConnectionError, asyncio.IncompleteReadError, EOFError):
+                    _close(conn)
+                    if reused and attempt == 0:
+                        continue
+                    raise
+                except BaseException:
+                    # Cancelled or failed mid-exchange: the connection's state is unknown
+                    _close(conn)
+                    raise
+                self.requests += 1
+                self.reused += reused
+                if keep_alive:
+                    self._idle.append((*conn, time.monotonic()))
+                else:
+                    _close(conn)
+                return response
+
+    async def close(self):
+        while self._idle:
+            _close(self._idle.pop()[:2])
+
+    def stats(self):
+        return {
+            'opened': self.opened,
+            'idle': len(self._idle),
+            'requests': self.requests,
+            'reused': self.reused
+        }
+
+    def _bind(self):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._idle = deque()
+            self._slots = asyncio.Semaphore(self.max_connections)
+
+    def _checkout(self):
+        now = time.monotonic()
+        while self._idle:
+            reader, writer, since = self._idle.pop()
+            if now - since < self.idle_timeout and not reader.at_eof():
+                return reader, writer
+            _close((reader, writer))
+        return None
+
+    async def _connect(self):
+        context = ssl.create_default_context() if self.scheme == 'https' else None
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port, ssl=context, limit=_MAX_LINE), self.timeout)
+        self.opened += 1
+        return reader, writer
+
+    async def _roundtrip(self, conn, method, path, body, headers):
+        reader, writer = conn
+        lines = [f'{method} {path} HTTP/1.1', f'Host: {self._host_header}', 'Connection: keep-alive']
+        lines.extend(f'{name}: {value}' for name, value in (headers or {}).items())
+        if body is not None:
+            lines.append(f'Content-Length: {len(body)}')
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + (body or b''))
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise EOFError('Connection closed before the response')
+        version, status = status_line.split(None, 2)[:2]
+        response_headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n'):
+                break
+            if not line:
+                raise EOFError('Connection closed in the headers')
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers[name.strip().lower()] = value.strip()
+
+        connection = response_headers.get('connection', '').lower()
+        keep_alive = connection != 'close' if version == b'HTTP/1.1' else connection == 'keep-alive'
+        if method == 'HEAD' or int(status) in (204, 304):
+            data = b''
+        elif response_headers.get('transfer-encoding', '').lower() == 'chunked':
+            data = await _read_chunked(reader)
+        elif 'content-length' in response_headers:
+            data = await reader.readexactly(int(response_headers['content-length']))
+        else:
+            data = await reader.read()
+            keep_alive = False
+        return HTTPResponse(int(status), response_headers, data), keep_alive
+
+
+class HTTPPool:
+    """HostPools by (scheme, host, port), created on first request to each"""
+
+    def __init__(self, max_connections=100, idle_timeout=30.0, timeout=10.0):
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self._hosts = {}
+
+    async def request(self, method, url, body=None, headers=None):
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        key = (parts.scheme, parts.hostname, port)
+        pool = self._hosts.get(key)
+        if pool is None:
+            pool = self._hosts[key] = HostPool(*key, self.max_connections, self.idle_timeout, self.timeout)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+        return await pool.request(method, path, body, headers)
+
+    async def get_json(self, url):
+        response = await self.request('GET', url, headers={'Accept': 'application/json'})
+        return response.json()
+
+    async def close(self):
+        for pool in self._hosts.values():
+            await pool.close()
+
+    def stats(self):
+        return {f'{scheme}://{host}:{port}': pool.stats() for (scheme, host, port), pool in self._hosts.items()}
+
+
+async def _read_chunked(reader):
+    chunks = []
+    while True:
+        size = int((await reader.readline()).split(b';', 1)[0].strip() or b'0', 16)
+        if size == 0:
+            # Trailers, up to the blank line
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass
+            return b''.join(chunks)
+        chunks.append(await reader.readexactly(size))
+        await reader.readexactly(2)
+
+
+def _close(conn):
+    writer = conn[1]
+    try:
+        writer.close()
+    except Exception:  # already closed / loop gone
+        pass
@@ -0,0 +1,385 @@
+"""
+Lexicon Service
+Prefix, suffix and industry word lists loaded from a memory-mapped binary file
+
+File layout (little-endian):
+    header      magic b'BLEX', version u16, reserved u16, list count u32,
+                word count u32, then u64 offsets of the directory, the word
+                offsets and the UTF-8 blob
+    directory   one (kind u32, key word u32, first word u32, count u32) per list
+    offsets     word count + 1 u32 byte offsets into the blob
+    blob        every word (and list key) as UTF-8, back to back
+
+Build one with:
+    python lexicon_service.py build brandarc.lex words/      # words/<kind>/<key>.txt
+    python lexicon_service.py build brandarc.lex words.json  # {"prefix": {"Modern": [...]}, ...}
+    python lexicon_service.py export words/                  # write the built-in lists as text files
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+from collections.abc import Sequence
+
+MAGIC = b'BLEX'
+VERSION = 1
+KINDS = ('prefix', 'suffix', 'industry')
+
+_HEADER = struct.Struct('<4sHHIIQQQ')
+_ENTRY = struct.Struct('<IIII')
+
+# Built-in lists, used when no lexicon file is configured
+DEFAULT_PREFIXES = {
+    'Modern': ['Apex', 'Nexus', 'Pulse', 'Vortex', 'Zenith', 'Prism', 'Vertex', 'Echo', 'Nova', 'Flux'],
+    'Playful': ['Zap', 'Buzz', 'Pop', 'Fizz', 'Spark', 'Bounce', 'Glow', 'Dash', 'Zoom', 'Snap'],
+    'Professional': ['Prime', 'Elite', 'Core', 'Sage', 'Crown', 'Atlas', 'Summit', 'Noble', 'Titan', 'Sterling'],
+    'Creative': ['Muse', 'Canvas', 'Sketch', 'Palette', 'Vision', 'Dream', 'Quest', 'Craft', 'Inspire', 'Imagine'],
+    'Tech': ['Byte', 'Pixel', 'Data', 'Code', 'Cloud', 'Cyber', 'Digi', 'Tech', 'Nano', 'Quantum']
+}
+
+DEFAULT_SUFFIXES = {
+    'Modern': ['ify', 'ly', 'wise', 'flow', 'hub', 'labs', 'ai', 'io', 'space', 'verse'],
+    'Playful': ['pop', 'box', 'ville', 'land', 'joy', 'fun', 'pal', 'buddy', 'zone', 'spot'],
+    'Professional': ['pro', 'corp', 'group', 'solutions', 'ventures', 'capital', 'partners', 'holdings', 'enterprises', 'global'],
+    'Creative': ['studio', 'works', 'collective', 'house', 'space', 'loft', 'gallery', 'atelier', 'forge', 'lab'],
+    'Tech': ['tech', 'soft', 'sys', 'net', 'link', 'zone', 'grid', 'base', 'ware', 'logic']
+}
+
+DEFAULT_INDUSTRY_WORDS = {
+    'Technology': ['tech', 'digital', 'smart', 'cloud', 'cyber', 'data', 'ai', 'quantum', 'neural', 'bit'],
+    'Healthcare': ['health', 'care', 'med', 'vita', 'life', 'wellness', 'cure', 'heal', 'bio', 'pulse'],
+    'Finance': ['fin', 'pay', 'wealth', 'trust', 'capital', 'invest', 'money', 'coin', 'ledger', 'vault'],
+    'Education': ['edu', 'learn', 'scholar', 'academy', 'brain', 'study', 'teach', 'knowledge', 'wise', 'mind'],
+    'Retail': ['shop', 'mart', 'store', 'market', 'buy', 'trade', 'commerce', 'bazaar', 'emporium', 'exchange'],
+    'Food': ['food', 'taste', 'flavor', 'dish', 'kitchen', 'cook', 'fresh', 'bite', 'feast', 'savory'],
+    'Fashion': ['style', 'chic', 'mode', 'vogue', 'wear', 'thread', 'fabric', 'couture', 'trend', 'glam'],
+    'Travel': ['go', 'voyage', 'journey', 'trip', 'explore', 'wander', 'roam', 'nomad', 'quest', 'venture']
+}
+
+
+class LexiconError(ValueError):
+    """Raised for a missing, truncated or malformed lexicon file"""
+
+
+class WordList(Sequence):
+    """
+    Read-only view of one list in a mapped lexicon.
+
+    Words are decoded from the shared mapping on access, so a list of any
+    size costs a few object headers per process, not a copy of its words.
+    """
+    __slots__ = ('_blob', '_offsets', '_first', '_count')
+
+    def __init__(self, blob, offsets, first, count):
+        self._blob = blob
+        self._offsets = offsets
+        self._first = first
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._count))]
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError('word index out of range')
+        j = self._first + i
+        return str(self._blob[self._offsets[j]:self._offsets[j + 1]], 'utf-8')
+
+    def __repr__(self):
+        return f'<WordList of {self._count} words>'
+
+
+class Lexicon:
+    """
+    Word lists by kind ('prefix', 'suffix', 'industry') and key (a tone or
+    an industry), from a lexicon file mapped read-only.
+
+    The mapping is MAP_SHARED, so every worker process that opens the same
+    file shares its pages through the OS page cache.
+    """
+
+    def __init__(self, path, generation=0):
+        self.path = path
+        self.generation = generation
+        with open(path, 'rb') as f:
+            try:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:  # empty file
+                raise LexiconError(f'{path}: {e}') from None
+
+        if len(self._map) < _HEADER.size:
+            raise LexiconError(f'{path}: truncated header')
+        magic, version, _, list_count, word_count, dir_at, offsets_at, blob_at = _HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise LexiconError(f'{path}: not a lexicon file')
+        if version != VERSION:
+            raise LexiconError(f'{path}: unsupported lexicon version {version}')
+        offsets_end = offsets_at + (word_count + 1) * 4
+        if dir_at + list_count * _ENTRY.size > len(self._map) or offsets_end > blob_at or blob_at > len(self._map):
+            raise LexiconError(f'{path}: truncated file')
+
+        view = memoryview(self._map)
+        if sys.byteorder == 'little':
+            offsets = view[offsets_at:offsets_end].cast('I')
+        else:
+            offsets = array('I', view[offsets_at:offsets_end])
+            offsets.byteswap()
+        blob = view[blob_at:]
+        if offsets[word_count] > len(blob):
+            raise LexiconError(f'{path}: truncated word blob')
+
+        self.word_count = word_count
+        self.size = len(self._map)
+        self._lists = {kind: {} for kind in KINDS}
+        for n in range(list_count):
+            kind, key_word, first, count = _ENTRY.unpack_from(self._map, dir_at + n * _ENTRY.size)
+            if kind >= len(KINDS) or key_word >= word_count or first + count > word_count:
+                raise LexiconError(f'{path}: bad directory entry {n}')
+            key = str(blob[offsets[key_word]:offsets[key_word + 1]], 'utf-8')
+            self._lists[KINDS[kind]][key] = WordList(blob, offsets, first, count)
+        check_lists(self._lists, path)
+
+    def current(self):
+        return self
+
+    def words(self, kind):
+        """Mapping of key -> WordList for one kind"""
+        return self._lists[kind]
+
+    def stats(self):
+        return {
+            'path': self.path,
+            'generation': self.generation,
+            'bytes': self.size,
+            'words': self.word_count,
+            'lists': {kind: len(lists) for kind, lists in self._lists.items()}
+        }
+
+
+class StaticLexicon:
+    """The same interface as Lexicon over in-memory lists (the built-in ones by default)"""
+
+    def __init__(self, prefixes=None, suffixes=None, industry_words=None, generation=0):
+        self.path = None
+        self.generation = generation
+        self._lists = {
+            'prefix': prefixes if prefixes is not None else DEFAULT_PREFIXES,
+            'suffix': suffixes if suffixes is not None else DEFAULT_SUFFIXES,
+            'industry': industry_words if industry_words is not None else DEFAULT_INDUSTRY_WORDS
+        }
+        check_lists(self._lists, 'word lists')
+
+    def current(self):
+        return self
+
+    def words(self, kind):
+        return self._lists[kind]
+
+    def stats(self):
+        return {
+            'path': None,
+            'generation': self.generation,
+            'bytes': 0,
+            'words': sum(len(words) for lists in self._lists.values() for words in lists.values()),
+            'lists': {kind: len(lists) for kind, lists in self._lists.items()}
+        }
+
+
+class LexiconStore:
+    """
+    Holds the current Lexicon for a file and reloads it when the file changes.
+
+    current() stats the file at most once per `check_interval` seconds. Build
+    tools replace the file atomically (write + rename), so a reload maps the
+    new inode while requests still holding the old Lexicon keep reading the
+    old mapping until they drop it. A file that fails to load is logged and
+    the previous lexicon stays in service.
+    """
+
+    def __init__(self, path, check_interval=5.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._signature = self._stat()
+        self._lexicon = Lexicon(path, generation=1)
+        self._checked_at = time.monotonic()
+
+    @property
+    def generation(self):
+        return self._lexicon.generation
+
+    def current(self):
+        """The live Lexicon, reloading first if the file has changed"""
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            self.reload_if_changed()
+        return self._lexicon
+
+    def reload_if_changed(self):
+        """Reload if the file's inode, size or mtime changed; returns True on reload"""
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                signature = self._stat()
+            except OSError as e:
+                print(f'⚠️  Lexicon {self.path} unavailable, keeping generation {self.generation}: {e}')
+                return False
+            if signature == self._signature:
+                return False
+            try:
+                lexicon = Lexicon(self.path, generation=self._lexicon.generation + 1)
+            except (OSError, LexiconError) as e:
+                print(f'⚠️  Lexicon reload failed, keeping generation {self.generation}: {e}')
+                return False
+            self._signature = signature
+            self._lexicon = lexicon
+            return True
+
+    def words(self, kind):
+        return self.current().words(kind)
+
+    def stats(self):
+        return self.current().stats()
+
+    def _stat(self):
+        st = os.stat(self.path)
+        return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def build_lexicon(lists, path):
+    """
+    Write a lexicon file from {kind: {key: [words]}} and return its stats.
+
+    Words are stripped and de-duplicated per list (first occurrence wins).
+    The file is written next to `path` and renamed over it, so running
+    workers pick it up atomically on their next reload check.
+    """
+    kept = {kind: {} for kind in KINDS}
+    for kind in KINDS:
+        for key, values in sorted(lists.get(kind, {}).items()):
+            unique = list(dict.fromkeys(w.strip() for w in values if w and w.strip()))
+            if unique:
+                kept[kind][key] = unique
+    # Checked before writing, so a bad source never replaces a working file
+    check_lists(kept, path)
+
+    entries = []
+    words = []
+    for kind_code, kind in enumerate(KINDS):
+        for key, unique in kept[kind].items():
+            words.append(key)
+            entries.append((kind_code, len(words) - 1, len(words), len(unique)))
+            words.extend(unique)
+
+    offsets = array('I', [0])
+    blob = bytearray()
+    for word in words:
+        blob += word.encode('utf-8')
+        offsets.append(len(blob))
+    if sys.byteorder != 'little':
+        offsets.byteswap()
+
+    dir_at = _HEADER.size
+    offsets_at = _align(dir_at + len(entries) * _ENTRY.size)
+    blob_at = offsets_at + len(offsets) * 4
+
+    tmp_path = f'{path}.tmp{os.getpid()}'
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, 0, len(entries), len(words), dir_at, offsets_at, blob_at))
+        for entry in entries:
+            f.write(_ENTRY.pack(*entry))
+        f.write(b'\0' * (offsets_at - f.tell()))
+        f.write(offsets.tobytes())
+        f.write(blob)
+    os.replace(tmp_path, path)
+    return Lexicon(path).stats()
+
+
+def check_lists(lists, source):
+    """
+    LexiconError unless {kind: {key: words}} can generate names: some tone
+    needs both a prefix and a suffix list, and there must be an industry list
+    """
+    prefixes, suffixes = lists.get('prefix', {}), lists.get('suffix', {})
+    if not any(tone in suffixes for tone in prefixes):
+        raise LexiconError(
+            f'{source}: no tone has both a prefix and a suffix list '
+            f'(prefix lists: {", ".join(prefixes) or "none"}; suffix lists: {", ".join(suffixes) or "none"})'
+        )
+    if not lists.get('industry'):
+        raise LexiconError(f'{source}: no industry word lists')
+
+
+def read_word_source(source):
+    """
+    Load {kind: {key: [words]}} from a JSON file or from a directory laid
+    out as <kind>/<key>.txt with one word per line ('#' starts a comment)
+    """
+    if os.path.isfile(source):
+        with open(source, encoding='utf-8') as f:
+            return json.load(f)
+
+    lists = {}
+    for kind in KINDS:
+        kind_dir = os.path.join(source, kind)
+        if not os.path.isdir(kind_dir):
+            continue
+        for filename in sorted(os.listdir(kind_dir)):
+            if not filename.endswith('.txt'):
+                continue
+            with open(os.path.join(kind_dir, filename), encoding='utf-8') as f:
+                lists.setdefault(kind, {})[filename[:-4]] = [
+                    line.split('#', 1)[0].strip() for line in f
+                ]
+    return lists
+
+
+def create_lexicon(config):
+    """The configured LexiconStore, or the built-in lists when LEXICON_PATH is unset"""
+    if not config.LEXICON_PATH:
+        return StaticLexicon()
+    return LexiconStore(config.LEXICON_PATH, check_interval=config.LEXICON_RELOAD_INTERVAL)
+
+
+def _align(n, to=8):
+    return (n + to - 1) // to * to
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='BrandArc lexicon tool')
+    sub = parser.add_subparsers(dest='command', required=True)
+    build = sub.add_parser('build', help='compile word lists into a lexicon file')
+    build.add_argument('output', help='lexicon file to write')
+    build.add_argument('source', help='JSON file or <kind>/<key>.txt directory')
+    info = sub.add_parser('info', help='print a lexicon file summary')
+    info.add_argument('path')
+    export = sub.add_parser('export', help='write the built-in lists as a <kind>/<key>.txt directory')
+    export.add_argument('directory')
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        stats = build_lexicon(read_word_source(args.source), args.output)
+        print(f"✅ Wrote {stats['words']} words ({stats['bytes']} bytes) to {args.output}")
+    elif args.command == 'info':
+        print(json.dumps(Lexicon(args.path).stats(), indent=2))
+    else:
+        builtin = StaticLexicon()
+        for kind in KINDS:
+            os.makedirs(os.path.join(args.directory, kind), exist_ok=True)
+            for key, words in builtin.words(kind).items():
+                with open(os.path.join(args.directory, kind, f'{key}.txt'), 'w', encoding='utf-8') as f:
+                    f.write('\n'.join(words) + '\n')
+        print(f'✅ Exported built-in lists to {args.directory}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
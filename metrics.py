@@ -0,0 +1,222 @@
+"""
+Metrics
+In-process counters, gauges and latency histograms in Prometheus text format
+"""
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+
+# Latency buckets in seconds (upper bounds; +Inf is implicit)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# Payload size buckets in bytes
+SIZE_BUCKETS = (128, 512, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Recording is lock-free: under the GIL an increment can very rarely be lost
+# when two threads race on the same series, which is acceptable for
+# monitoring and keeps a sample well under a microsecond.
+
+
+class Counter:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+
+class Gauge:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def dec(self, amount=1):
+        self.value -= amount
+
+    def set(self, value):
+        self.value = value
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricFamily:
+    """A named metric with one series per label-value tuple"""
+
+    def __init__(self, name, kind, help_text, label_names, factory):
+        self.name = name
+        self.kind = kind
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self._factory = factory
+        self._series = {}
+
+    def labels(self, *values):
+        series = self._series.get(values)
+        if series is None:
+            series = self._series.setdefault(values, self._factory())
+        return series
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.kind}']
+        for values, series in sorted(self._series.items()):
+            labels = dict(zip(self.label_names, values))
+            if self.kind == 'histogram':
+                cumulative = 0
+                for bound, count in zip(series.buckets + (float('inf'),), series.counts):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{self.name}_bucket{_labels(labels, le=le)} {cumulative}')
+                lines.append(f'{self.name}_sum{_labels(labels)} {series.sum}')
+                lines.append(f'{self.name}_count{_labels(labels)} {series.count}')
+            else:
+                lines.append(f'{self.name}{_labels(labels)} {series.value}')
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metric families and scrape-time collectors"""
+
+    def __init__(self):
+        self._families = {}
+        self._collectors = []
+
+    def counter(self, name, help_text, labels=()):
+        return self._family(name, 'counter', help_text, labels, Counter)
+
+    def gauge(self, name, help_text, labels=()):
+        return self._family(name, 'gauge', help_text, labels, Gauge)
+
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._family(name, 'histogram', help_text, labels, lambda: Histogram(buckets))
+
+    def add_collector(self, collect):
+        """
+        Register a callable run at scrape time. It returns an iterable of
+        (name, kind, help, [(labels_dict, value), ...]) tuples, for values
+        that are already tracked elsewhere (e.g. cache hit counters).
+        """
+        self._collectors.append(collect)
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        for family in self._families.values():
+            lines.extend(family.render())
+        for collect in self._collectors:
+            for name, kind, help_text, samples in collect():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {kind}')
+                for labels, value in samples:
+                    lines.append(f'{name}{_labels(labels)} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def _family(self, name, kind, help_text, labels, factory):
+        family = self._families.get(name)
+        if family is None:
+            family = MetricFamily(name, kind, help_text, labels, factory)
+            self._families[name] = family
+        return family
+
+
+class SpanTimer:
+    """Optional timing spans for service internals, recorded into one histogram"""
+
+    def __init__(self, registry, name='brandarc_service_span_seconds'):
+        self._histogram = registry.histogram(name, 'Time spent in service stages', ('service', 'span'))
+
+    @contextmanager
+    def span(self, service, name):
+        series = self._histogram.labels(service, name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            series.observe(time.perf_counter() - start)
+
+
+NULL_SPAN = nullcontext()
+
+
+def _labels(labels, **extra):
+    items = list(labels.items()) + list(extra.items())
+    if not items:
+        return ''
+    body = ','.join(f'{k}="{_escape(str(v))}"' for k, v in items)
+    return '{' + body + '}'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+# Process-wide registry used by the app and services
+REGISTRY = MetricsRegistry()
+
+
+def instrument_app(app, registry=REGISTRY):
+    """
+    Record latency, request/error counts, in-flight requests and payload
+    sizes for every endpoint of a Flask app, labelled by endpoint name
+    (e.g. 'brand.generate_brand_names', 'generate_palette').
+    """
+    from flask import g, request
+
+    latency = registry.histogram(
+        'brandarc_request_duration_seconds', 'Request latency', ('endpoint', 'method'))
+    requests_total = registry.counter(
+        'brandarc_requests_total', 'Requests handled', ('endpoint', 'method', 'status'))
+    errors_total = registry.counter(
+        'brandarc_request_errors_total', 'Requests answered with a 5xx status', ('endpoint', 'method'))
+    in_flight = registry.gauge(
+        'brandarc_requests_in_flight', 'Requests currently being handled', ('endpoint',))
+    request_size = registry.histogram(
+        'brandarc_request_size_bytes', 'Request body size', ('endpoint',), SIZE_BUCKETS)
+    response_size = registry.histogram(
+        'brandarc_response_size_bytes', 'Response body size (non-streamed)', ('endpoint',), SIZE_BUCKETS)
+
+    @app.before_request
+    def _metrics_start():
+        endpoint = request.endpoint or 'unmatched'
+        g._metrics = (endpoint, time.perf_counter())
+        in_flight.labels(endpoint).inc()
+        if request.content_length:
+            request_size.labels(endpoint).observe(request.content_length)
+
+    @app.after_request
+    def _metrics_record(response):
+        started = g.get('_metrics')
+        if started is None:
+            return response
+        endpoint, start = started
+        method = request.method
+        latency.labels(endpoint, method).observe(time.perf_counter() - start)
+        requests_total.labels(endpoint, method, str(response.status_code)).inc()
+        if response.status_code >= 500:
+            errors_total.labels(endpoint, method).inc()
+        if response.content_length is not None:
+            response_size.labels(endpoint).observe(response.content_length)
+        return response
+
+    @app.teardown_request
+    def _metrics_finish(exc):
+        started = g.pop('_metrics', None)
+        if started is not None:
+            in_flight.labels(started[0]).dec()
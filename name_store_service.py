@@ -0,0 +1,396 @@
+"""
+Name Store Service
+File-backed corpus of generated names with prefix, substring and score search
+"""
+import atexit
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# Score filters and sorts by API name -> column
+SCORE_FIELDS = {
+    'memorability': 'memorability_score',
+    'domain': 'domain_score',
+    'trademark': 'trademark_score',
+    'rank': 'rank_score',
+}
+SORTS = ('name', 'score', 'popular', 'recent')
+MAX_RESULTS = 100
+# Substrings shorter than a trigram cannot use the full-text index and are scanned
+_MIN_INDEXED_SUBSTRING = 3
+# Rows taken in sort order and filtered one by one before a search falls back to the filters' indexes
+_WINDOW = 2000
+_STOP = object()
+_MAX_CHAR = chr(0x10FFFF)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS names (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    lower TEXT NOT NULL,
+    industry TEXT NOT NULL,
+    tone TEXT NOT NULL,
+    domain_score INTEGER NOT NULL,
+    trademark_score INTEGER NOT NULL,
+    memorability_score INTEGER NOT NULL,
+    rank_score REAL,
+    hits INTEGER NOT NULL DEFAULT 1,
+    first_seen INTEGER NOT NULL,
+    last_seen INTEGER NOT NULL,
+    UNIQUE (lower, industry, tone)
+);
+CREATE INDEX IF NOT EXISTS names_hits ON names (hits);
+CREATE INDEX IF NOT EXISTS names_memorability ON names (memorability_score);
+CREATE INDEX IF NOT EXISTS names_domain ON names (domain_score);
+CREATE INDEX IF NOT EXISTS names_trademark ON names (trademark_score);
+CREATE INDEX IF NOT EXISTS names_rank ON names (rank_score);
+CREATE INDEX IF NOT EXISTS names_last_seen ON names (last_seen);
+"""
+
+# Trigram index over the lowercase names for substring search (SQLite 3.34+)
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS names_fts USING fts5(
+    lower, content='names', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS names_fts_insert AFTER INSERT ON names BEGIN
+    INSERT INTO names_fts (rowid, lower) VALUES (new.id, new.lower);
+END;
+"""
+
+# A name seen again for the same industry and tone counts as a hit and keeps its latest scores
+_UPSERT = """
+INSERT INTO names (name, lower, industry, tone, domain_score, trademark_score,
+                   memorability_score, rank_score, first_seen, last_seen)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (lower, industry, tone) DO UPDATE SET
+    hits = hits + 1,
+    domain_score = excluded.domain_score,
+    trademark_score = excluded.trademark_score,
+    memorability_score = excluded.memorability_score,
+    rank_score = coalesce(excluded.rank_score, rank_score),
+    last_seen = excluded.last_seen
+"""
+
+_COLUMNS = ('id, name, industry, tone, domain_score, trademark_score, memorability_score, '
+            'rank_score, hits, first_seen, last_seen')
+
+
+class NameStore:
+    """
+    SQLite database of every generated name, one row per (name, industry,
+    tone) with its scores and how often it was generated.
+
+    add() only queues the records; a writer thread commits whatever has
+    queued up in one transaction per `batch_size` rows, so writes never run
+    on the request path and batch up under load. When more than
+    `max_pending` rows are waiting, further records are dropped (counted in
+    stats()) rather than slowing generation down.
+
+    Lookups use the (lower, industry, tone) key for prefixes, a trigram
+    full-text index for substrings and an index per score for score ranges.
+    The database is in WAL mode, so readers never wait for the writer and
+    forked workers can share one file; each process runs its own writer.
+    Searches borrow one of at most `max_readers` idle read connections
+    kept per process, so request threads do not each open their own.
+    """
+
+    def __init__(self, path, batch_size=5000, max_pending=100000, max_readers=8):
+        self.path = path
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.max_readers = max_readers
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._readers = None  # idle read connections of this process
+        self._readers_pid = None
+        self._pid = None
+        self._queue = None
+        self._thread = None
+
+        conn = self._connect()
+        try:
+            conn.executescript(_SCHEMA)
+            try:
+                conn.executescript(_FTS_SCHEMA)
+                self.substring_index = True
+            except sqlite3.OperationalError:  # SQLite without FTS5 or the trigram tokenizer
+                self.substring_index = False
+        finally:
+            conn.close()
+
+    # --- Writes ---------------------------------------------------------------
+
+    def add(self, records):
+        """Queue BrandNameRecords for the writer, seen now; returns at once"""
+        count = len(records)
+        if not count:
+            return
+        q = self._writer_queue()
+        with self._lock:
+            if self._pending + count > self.max_pending:
+                self.dropped += count
+                return
+            self._pending += count
+        # The store's own clock: record stamps of seeded requests are not times
+        q.put((int(time.time() * 1000), records))
+
+    def flush(self, timeout=None):
+        """Wait until everything added so far is committed"""
+        if self._pid != os.getpid():
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout=10.0):
+        """Commit what is queued, stop the writer and close idle read connections"""
+        with self._lock:
+            thread, q = (self._thread, self._queue) if self._pid == os.getpid() else (None, None)
+            self._pid = self._thread = self._queue = None
+            readers = self._readers if self._readers_pid == os.getpid() else None
+        if thread is not None:
+            q.put(_STOP)
+            thread.join(timeout)
+        while readers is not None and not readers.empty():
+            readers.get_nowait().close()
+
+    def _writer_queue(self):
+        # The writer thread does not survive fork(); each process starts its own
+        if self._pid == os.getpid():
+            return self._queue
+        with self._lock:
+            if self._pid != os.getpid():
+                self._queue = queue.SimpleQueue()
+                self._pending = 0
+                self._thread = threading.Thread(target=self._run, args=(self._queue,),
+                                                name='name-store-writer', daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+                atexit.register(self.close)
+        return self._queue
+
+    def _run(self, q):
+        conn = self._connect()
+        stop = False
+        while not stop:
+            # Block for the first item, then take whatever else is already waiting
+            items, count = [], 0
+            item = q.get()
+            while True:
+                items.append(item)
+                if item is _STOP:
+                    stop = True
+                    break
+                if isinstance(item, tuple):
+                    count += len(item[1])
+                    if count >= self.batch_size:
+                        break
+                try:
+                    item = q.get_nowait()
+                except queue.Empty:
+                    break
+
+            records = [item for item in items if isinstance(item, tuple)]
+            if records:
+                self._write(conn, records, count)
+            for item in items:
+                if isinstance(item, threading.Event):
+                    item.set()
+        conn.close()
+
+    def _write(self, conn, batches, count):
+        rows = [
+            (r.name, r.name.lower(), r.industry, r.tone, r.domain_score, r.trademark_score,
+             r.memorability_score, r.rank_score, seen, seen)
+            for seen, records in batches for r in records
+        ]
+        try:
+            with conn:
+                conn.executemany(_UPSERT, rows)
+            written, failed = count, 0
+        except sqlite3.Error as e:
+            print(f'⚠️  Name store write failed: {e}', file=sys.stderr)
+            written, failed = 0, count
+        with self._lock:
+            self._pending -= count
+            self.written += written
+            self.failed += failed
+            self.batches += 1
+
+    # --- Reads ----------------------------------------------------------------
+
+    def search(self, prefix=None, contains=None, score='memorability', min_score=None, max_score=None,
+               industry=None, tone=None, sort='name', limit=20):
+        """
+        Stored names matching every given filter (case-insensitive prefix and
+        substring, inclusive score range on the `score` field), as API dicts.
+
+        sort is 'name', 'score' (best first), 'popular' (most generated
+        first) or 'recent' (most recently generated first).
+        """
+        column = SCORE_FIELDS.get(score)
+        if column is None:
+            raise ValueError(f'score must be one of: {", ".join(SCORE_FIELDS)}')
+        if sort not in SORTS:
+            raise ValueError(f'sort must be one of: {", ".join(SORTS)}')
+
+        filters = []  # (sql, params)
+        substring = match = None
+        if prefix:
+            # A range on the unique key's leading column, so the index finds it
+            prefix = prefix.lower()
+            upper = _prefix_end(prefix)
+            if upper is None:
+                filters.append(('lower >= ?', (prefix,)))
+            else:
+                filters.append(('lower >= ? AND lower < ?', (prefix, upper)))
+        if contains:
+            contains = contains.lower()
+            substring = ('instr(lower, ?) > 0', (contains,))
+            filters.append(substring)
+            if self.substring_index and len(contains) >= _MIN_INDEXED_SUBSTRING:
+                match = ('id IN (SELECT rowid FROM names_fts WHERE names_fts MATCH ?)',
+                         ('"' + contains.replace('"', '""') + '"',))
+        if min_score is not None:
+            filters.append((f'{column} >= ?', (min_score,)))
+        if max_score is not None:
+            filters.append((f'{column} <= ?', (max_score,)))
+        if industry:
+            filters.append(('industry = ?', (industry,)))
+        if tone:
+            filters.append(('tone = ?', (tone,)))
+        # The same filters, with the full-text index finding the substring
+        indexed = [match if item is substring and match else item for item in filters]
+
+        # Each order is the order of an index, so a LIMIT stops early
+        order = {
+            'name': 'lower, industry, tone',
+            'score': f'{column} DESC, id DESC',
+            'popular': 'hits DESC, id DESC',
+            'recent': 'last_seen DESC, id DESC',
+        }[sort]
+        limit = max(1, min(int(limit), MAX_RESULTS))
+
+        # A prefix alone is served by the name order's own index
+        if filters and not (sort == 'name' and len(filters) == 1 and prefix):
+            # Broad filters: the first rows in sort order usually hold a full page
+            found = self._query(filters, order, limit, window=_WINDOW)
+            if len(found) == limit:
+                return found
+        # Narrow filters: their indexes find few rows, cheap to sort
+        return self._query(indexed, order, limit)
+
+    def popular(self, industry=None, tone=None, limit=20):
+        """Most often generated names, optionally for one industry and/or tone"""
+        return self.search(industry=industry, tone=tone, sort='popular', limit=limit)
+
+    def count(self):
+        """Stored names (an upper bound: ids are never reused)"""
+        with self._reader() as conn:
+            row = conn.execute('SELECT max(id) FROM names').fetchone()
+        return row[0] or 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'written': self.written,
+                'pending': self._pending,
+                'dropped': self.dropped,
+                'failed': self.failed,
+                'batches': self.batches
+            }
+
+    def _query(self, filters, order, limit, window=None):
+        source = 'names'
+        if window is not None:
+            source = f'(SELECT {_COLUMNS}, lower FROM names ORDER BY {order} LIMIT {int(window)})'
+        sql = f'SELECT {_COLUMNS} FROM {source}'
+        params = []
+        if filters:
+            sql += ' WHERE ' + ' AND '.join(clause for clause, _ in filters)
+            for _, values in filters:
+                params.extend(values)
+        sql += f' ORDER BY {order} LIMIT ?'
+        with self._reader() as conn:
+            rows = conn.execute(sql, (*params, limit)).fetchall()
+        return [_entry(row) for row in rows]
+
+    @contextmanager
+    def _reader(self):
+        # sqlite3 connections are not shared between threads at once, nor across fork()
+        if self._readers_pid != os.getpid():
+            with self._lock:
+                if self._readers_pid != os.getpid():
+                    self._readers = queue.LifoQueue(maxsize=self.max_readers)
+                    self._readers_pid = os.getpid()
+        readers = self._readers
+        try:
+            conn = readers.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+            conn.execute('PRAGMA query_only = ON')
+        try:
+            yield conn
+        finally:
+            try:
+                readers.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode = WAL')
+        conn.execute('PRAGMA synchronous = NORMAL')  # durable at checkpoints; losing the last batch on power loss is fine
+        return conn
+
+
+def _prefix_end(prefix):
+    """Smallest string above every string starting with prefix, or None if there is none"""
+    stem = prefix.rstrip(_MAX_CHAR)
+    if not stem:
+        return None
+    code = ord(stem[-1]) + 1
+    if 0xD800 <= code <= 0xDFFF:  # surrogates cannot be stored as UTF-8
+        code = 0xE000
+    return stem[:-1] + chr(code)
+
+
+def _entry(row):
+    (id_, name, industry, tone, domain_score, trademark_score, memorability_score,
+     rank_score, hits, first_seen, last_seen) = row
+    entry = {
+        'id': id_,
+        'name': name,
+        'industry': industry,
+        'tone': tone,
+        'domainScore': domain_score,
+        'trademarkScore': trademark_score,
+        'memorabilityScore': memorability_score,
+        'count': hits,
+        'firstSeen': datetime.fromtimestamp(first_seen / 1000).isoformat(timespec='seconds'),
+        'lastSeen': datetime.fromtimestamp(last_seen / 1000).isoformat(timespec='seconds')
+    }
+    if rank_score is not None:
+        entry['rankScore'] = rank_score
+    return entry
+
+
+def create_name_store(config):
+    """Open the store at NAME_STORE_PATH, or None if unset"""
+    if not config.NAME_STORE_PATH:
+        return None
+    return NameStore(
+        config.NAME_STORE_PATH,
+        batch_size=config.NAME_STORE_BATCH_SIZE,
+        max_pending=config.NAME_STORE_MAX_PENDING,
+        max_readers=config.NAME_STORE_READERS
+    )
@@ -0,0 +1,389 @@
+"""
+Palette Service
+Color schemes built in the OKLCH perceptual space, with WCAG contrast checks
+"""
+import hashlib
+import math
+import re
+import threading
+from collections import OrderedDict
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional - palettes are computed color by color instead
+    np = None
+
+# Five colors per palette: (hue offset in degrees, lightness offset, chroma
+# factor) relative to the base color. The first entry is the base itself.
+SCHEMES = {
+    'complementary': ((0, 0, 1), (180, 0, 1), (0, 0.18, 0.45), (180, -0.18, 0.8), (0, -0.28, 0.6)),
+    'analogous': ((0, 0, 1), (-30, 0.04, 0.95), (30, -0.04, 0.95), (-60, 0.12, 0.8), (60, -0.1, 0.85)),
+    'triadic': ((0, 0, 1), (120, 0, 1), (240, 0, 1), (120, 0.2, 0.5), (240, -0.2, 0.7)),
+    'tetradic': ((0, 0, 1), (90, 0, 0.9), (180, 0, 1), (270, 0, 0.9), (0, 0.25, 0.3)),
+    'monochrome': ((0, 0, 1), (0, 0.3, 0.35), (0, 0.15, 0.7), (0, -0.15, 0.9), (0, -0.3, 0.7)),
+}
+SCHEME_ALIASES = {'monochromatic': 'monochrome', 'complement': 'complementary'}
+
+# The palettes of one (baseColor, scheme): lightness shift and chroma factor
+# applied to every color but the base
+VARIANTS = ((0.0, 1.0), (0.06, 0.85), (-0.06, 1.1), (0.12, 0.6), (-0.12, 0.9))
+
+WCAG_AA = 4.5
+_WHITE, _BLACK = '#ffffff', '#000000'
+_HEX_COLOR = re.compile(r'^#?([0-9a-fA-F]{3}|[0-9a-fA-F]{6})$')
+# Bisection steps when pulling an out-of-gamut color's chroma back into sRGB
+_GAMUT_STEPS = 14
+
+# OKLab <-> linear sRGB (Ottosson)
+_RGB_TO_LMS = ((0.4122214708, 0.5363325363, 0.0514459929),
+               (0.2119034982, 0.6806995451, 0.1073969566),
+               (0.0883024619, 0.2817188376, 0.6299787005))
+_LMS_TO_LAB = ((0.2104542553, 0.7936177850, -0.0040720468),
+               (1.9779984951, -2.4285922050, 0.4505937099),
+               (0.0259040371, 0.7827717662, -0.8086757660))
+_LAB_TO_LMS = ((1.0, 0.3963377774, 0.2158037573),
+               (1.0, -0.1055613458, -0.0638541728),
+               (1.0, -0.0894841775, -1.2914855480))
+_LMS_TO_RGB = ((4.0767416621, -3.3077115913, 0.2309699292),
+               (-1.2684380046, 2.6097574011, -0.3413193965),
+               (-0.0041960863, -0.7034186147, 1.7076147010))
+_LUMINANCE = (0.2126, 0.7152, 0.0722)
+_HEX_DIGITS = b''.join(b'%02x' % i for i in range(256))
+
+# The 10 color pairs of a palette, and the pair list for every bitmask of
+# pairs that pass WCAG AA (shared, read-only)
+_PAIRS = [(a, b) for a in range(5) for b in range(a + 1, 5)]
+_PAIR_SETS = [[list(p) for k, p in enumerate(_PAIRS) if mask >> k & 1] for mask in range(1 << len(_PAIRS))]
+
+
+def normalize_color(color):
+    """'#6366F1' / '6366f1' / '#63f' -> '#6366f1'; ValueError for anything else"""
+    match = _HEX_COLOR.match(color.strip()) if isinstance(color, str) else None
+    if not match:
+        raise ValueError(f'Invalid color {color!r}, expected #rrggbb')
+    digits = match.group(1).lower()
+    if len(digits) == 3:
+        digits = ''.join(c * 2 for c in digits)
+    return '#' + digits
+
+
+def normalize_scheme(scheme):
+    """Canonical scheme name; ValueError for an unknown scheme"""
+    key = str(scheme).strip().lower()
+    key = SCHEME_ALIASES.get(key, key)
+    if key not in SCHEMES:
+        raise ValueError(f'Unknown scheme {scheme!r}, expected one of: {", ".join(SCHEMES)}')
+    return key
+
+
+def to_oklch(color):
+    """(lightness 0-1, chroma, hue in degrees) of a hex color"""
+    return _oklch_of(_hex_to_rgb(normalize_color(color)))
+
+
+def from_oklch(lightness, chroma, hue):
+    """Hex color of an OKLCH color, with chroma reduced to fit sRGB if needed"""
+    return '#%02x%02x%02x' % _rgb_of(min(1.0, max(0.0, lightness)), max(0.0, chroma), hue)
+
+
+def text_color(color):
+    """Black or white, whichever has the higher contrast on a hex color"""
+    return _text_color(_luminance(_hex_to_rgb(normalize_color(color))))
+
+
+def _hex_to_rgb(color):
+    return int(color[1:3], 16), int(color[3:5], 16), int(color[5:7], 16)
+
+
+def _name_hue(name):
+    """Stable hue in degrees for a brand name"""
+    digest = hashlib.blake2b(name.strip().lower().encode('utf-8'), digest_size=2).digest()
+    return int.from_bytes(digest, 'little') * 360 / 65536
+
+
+# --- Scalar color math (numpy-free fallback) ---------------------------------
+
+def _to_linear(v):
+    return v / 12.92 if v <= 0.04045 else ((v + 0.055) / 1.055) ** 2.4
+
+
+def _to_gamma(v):
+    return 12.92 * v if v <= 0.0031308 else 1.055 * v ** (1 / 2.4) - 0.055
+
+
+def _mul(matrix, vector):
+    return [row[0] * vector[0] + row[1] * vector[1] + row[2] * vector[2] for row in matrix]
+
+
+def _oklch_of(rgb):
+    linear = [_to_linear(c / 255) for c in rgb]
+    lms = [math.copysign(abs(v) ** (1 / 3), v) for v in _mul(_RGB_TO_LMS, linear)]
+    lightness, a, b = _mul(_LMS_TO_LAB, lms)
+    return lightness, math.hypot(a, b), math.degrees(math.atan2(b, a))
+
+
+def _linear_of(lightness, chroma, hue):
+    h = math.radians(hue)
+    lms = _mul(_LAB_TO_LMS, (lightness, chroma * math.cos(h), chroma * math.sin(h)))
+    return _mul(_LMS_TO_RGB, [v * v * v for v in lms])
+
+
+def _in_gamut(linear, eps=1e-6):
+    return all(-eps <= v <= 1 + eps for v in linear)
+
+
+def _rgb_of(lightness, chroma, hue):
+    """8-bit sRGB of an OKLCH color, reducing chroma until it fits the gamut"""
+    linear = _linear_of(lightness, chroma, hue)
+    if not _in_gamut(linear):
+        low, high = 0.0, chroma
+        for _ in range(_GAMUT_STEPS):
+            mid = (low + high) / 2
+            if _in_gamut(_linear_of(lightness, mid, hue)):
+                low = mid
+            else:
+                high = mid
+        linear = _linear_of(lightness, low, hue)
+    return tuple(round(_to_gamma(min(1.0, max(0.0, v))) * 255) for v in linear)
+
+
+def _luminance(rgb):
+    return sum(w * _to_linear(c / 255) for w, c in zip(_LUMINANCE, rgb))
+
+
+def _palettes_scalar(bases, schemes):
+    """Per job: (5 variants x 5 rgb triples, 5 variants x 5 luminances)"""
+    results = []
+    for base, scheme in zip(bases, schemes):
+        base_l, base_c, base_h = _oklch_of(base)
+        variants = []
+        for shift, chroma_factor in VARIANTS:
+            colors = [tuple(base)]
+            for hue_offset, lightness_offset, factor in SCHEMES[scheme][1:]:
+                lightness = min(1.0, max(0.0, base_l + lightness_offset + shift))
+                colors.append(_rgb_of(lightness, base_c * factor * chroma_factor, base_h + hue_offset))
+            variants.append(colors)
+        results.append((variants, [[_luminance(c) for c in colors] for colors in variants]))
+    return results
+
+
+# --- Vectorized color math ----------------------------------------------------
+
+def _np_to_linear(v):
+    return np.where(v <= 0.04045, v / 12.92, ((v + 0.055) / 1.055) ** 2.4)
+
+
+def _np_to_gamma(v):
+    return np.where(v <= 0.0031308, 12.92 * v, 1.055 * np.power(v, 1 / 2.4) - 0.055)
+
+
+def _np_linear_of(lightness, chroma, cos_h, sin_h):
+    """(..., 3) linear sRGB of OKLCH arrays, same operation order as _linear_of"""
+    a, b = chroma * cos_h, chroma * sin_h
+    lms = [row[0] * lightness + row[1] * a + row[2] * b for row in _LAB_TO_LMS]
+    lms = [v * v * v for v in lms]
+    return np.stack([row[0] * lms[0] + row[1] * lms[1] + row[2] * lms[2] for row in _LMS_TO_RGB], axis=-1)
+
+
+def _np_in_gamut(linear, eps=1e-6):
+    return ((linear >= -eps) & (linear <= 1 + eps)).all(axis=-1)
+
+
+def _np_rgb_of(lightness, chroma, hue):
+    """Vectorized _rgb_of: (..., 3) 8-bit sRGB of OKLCH arrays (hue in degrees)"""
+    hue = np.radians(hue)
+    cos_h, sin_h = np.cos(hue), np.sin(hue)
+    linear = _np_linear_of(lightness, chroma, cos_h, sin_h)
+    outside = ~_np_in_gamut(linear)
+    if outside.any():
+        l_out, cos_out, sin_out = lightness[outside], cos_h[outside], sin_h[outside]
+        low, high = np.zeros(len(l_out)), chroma[outside]
+        for _ in range(_GAMUT_STEPS):
+            mid = (low + high) / 2
+            fits = _np_in_gamut(_np_linear_of(l_out, mid, cos_out, sin_out))
+            low = np.where(fits, mid, low)
+            high = np.where(fits, high, mid)
+        linear[outside] = _np_linear_of(l_out, low, cos_out, sin_out)
+    return np.rint(_np_to_gamma(np.clip(linear, 0.0, 1.0)) * 255).astype(np.int64)
+
+
+def _palettes_vectorized(bases, schemes):
+    """
+    All palettes of all jobs in one pass: (rgb, luminance) arrays shaped
+    (jobs, variants, 5, 3) and (jobs, variants, 5).
+    """
+    base = np.asarray(bases, dtype=np.float64)
+    lms = np.cbrt(_np_to_linear(base / 255) @ np.array(_RGB_TO_LMS).T)
+    lab = lms @ np.array(_LMS_TO_LAB).T
+    base_l = lab[:, 0]
+    base_c = np.hypot(lab[:, 1], lab[:, 2])
+    base_h = np.degrees(np.arctan2(lab[:, 2], lab[:, 1]))
+
+    table = np.array([SCHEMES[s] for s in schemes], dtype=np.float64)  # (jobs, 5, 3)
+    variants = np.array(VARIANTS, dtype=np.float64)                  # (variants, 2)
+    not_base = np.arange(5) > 0
+    shift = variants[None, :, 0, None] * not_base                      # (1, variants, 5)
+    factor = np.where(not_base, variants[None, :, 1, None], 1.0)
+
+    lightness = np.clip(base_l[:, None, None] + table[:, None, :, 1] + shift, 0.0, 1.0)
+    chroma = base_c[:, None, None] * table[:, None, :, 2] * factor
+    hue = base_h[:, None, None] + table[:, None, :, 0]
+    lightness, chroma, hue = np.broadcast_arrays(lightness, chroma, hue)
+
+    rgb = _np_rgb_of(lightness, chroma, hue)
+    rgb[:, :, 0] = base[:, None].astype(np.int64)
+    luminance = _np_to_linear(rgb / 255) @ np.array(_LUMINANCE)
+    return rgb, luminance
+
+
+def _hex_strings(rgb):
+    """(..., 3) ints -> flat list of '#rrggbb' strings, formatted as one byte matrix"""
+    flat = rgb.reshape(-1, 3)
+    digits = np.frombuffer(_HEX_DIGITS, dtype=np.uint8).reshape(256, 2)
+    out = np.empty((len(flat), 7), dtype=np.uint8)
+    out[:, 0] = ord('#')
+    out[:, 1:3] = digits[flat[:, 0]]
+    out[:, 3:5] = digits[flat[:, 1]]
+    out[:, 5:7] = digits[flat[:, 2]]
+    text = out.tobytes().decode('ascii')
+    return [text[i:i + 7] for i in range(0, len(text), 7)]
+
+
+# --- Service --------------------------------------------------------------------
+
+class PaletteService:
+    """
+    Generates the palettes of (baseColor, scheme) pairs.
+
+    Results are cached per pair in a thread-safe LRU; the palette lists
+    returned are shared with the cache and must not be modified.
+    """
+
+    def __init__(self, cache_size=4096):
+        self.cache_size = cache_size
+        self._cache = OrderedDict()  # (color, scheme) -> list of palette dicts
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def generate(self, base_color, scheme='complementary'):
+        """Five palettes for one base color"""
+        return self.generate_many([(base_color, scheme)])[0]
+
+    def generate_many(self, jobs):
+        """
+        Palettes for many (base_color, scheme) jobs; cache misses are
+        computed together in one vectorized pass. Raises ValueError for
+        an invalid color or scheme.
+        """
+        keys = [(normalize_color(color), normalize_scheme(scheme)) for color, scheme in jobs]
+        results = [None] * len(keys)
+        missing = {}
+        with self._lock:
+            for i, key in enumerate(keys):
+                palettes = self._cache.get(key)
+                if palettes is None:
+                    missing.setdefault(key, []).append(i)
+                else:
+                    self._cache.move_to_end(key)
+                    results[i] = palettes
+            self.hits += len(keys) - sum(len(p) for p in missing.values())
+            self.misses += len(missing)
+
+        if missing:
+            built = self._build(list(missing))
+            with self._lock:
+                for key, palettes in zip(missing, built):
+                    for i in missing[key]:
+                        results[i] = palettes
+                    self._cache[key] = palettes
+                    self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return results
+
+    def color_for_name(self, name):
+        """A stable, saturated base color for a brand name"""
+        return self.colors_for_names([name])[0]
+
+    def colors_for_names(self, names):
+        hues = [_name_hue(name) for name in names]
+        if np is None or not hues:
+            return ['#%02x%02x%02x' % _rgb_of(0.62, 0.16, hue) for hue in hues]
+        hue = np.asarray(hues, dtype=np.float64)
+        return _hex_strings(_np_rgb_of(np.full_like(hue, 0.62), np.full_like(hue, 0.16), hue))
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._cache), 'hits': self.hits, 'misses': self.misses}
+
+    def _build(self, keys):
+        bases = [_hex_to_rgb(color) for color, _ in keys]
+        schemes = [scheme for _, scheme in keys]
+        if np is None:
+            built = []
+            for scheme, (rgb, luminance) in zip(schemes, _palettes_scalar(bases, schemes)):
+                built.append(_palettes(
+                    scheme,
+                    [['#%02x%02x%02x' % c for c in colors] for colors in rgb],
+                    [[[_contrast(a, b) for b in lum] for a in lum] for lum in luminance],
+                    [[_text_color(y) for y in lum] for lum in luminance],
+                    [sum(1 << k for k, (a, b) in enumerate(_PAIRS) if _contrast(lum[a], lum[b]) >= WCAG_AA)
+                     for lum in luminance]
+                ))
+            return built
+
+        rgb, luminance = _palettes_vectorized(bases, schemes)
+        lighter = np.maximum(luminance[..., :, None], luminance[..., None, :])
+        darker = np.minimum(luminance[..., :, None], luminance[..., None, :])
+        contrast = np.round((lighter + 0.05) / (darker + 0.05), 2)
+        first, second = zip(*_PAIRS)
+        pair_masks = (contrast[..., first, second] >= WCAG_AA) @ (1 << np.arange(len(_PAIRS)))
+        contrast = contrast.tolist()
+        on_black = ((luminance + 0.05) / 0.05 >= 1.05 / (luminance + 0.05)).tolist()
+        hexes = _hex_strings(rgb)
+        per_job = len(VARIANTS) * 5
+        return [
+            _palettes(
+                scheme,
+                [hexes[j * per_job + v * 5:j * per_job + v * 5 + 5] for v in range(len(VARIANTS))],
+                contrast[j],
+                [[_BLACK if black else _WHITE for black in row] for row in on_black[j]],
+                pair_masks[j].tolist()
+            )
+            for j, scheme in enumerate(schemes)
+        ]
+
+
+def _palettes(scheme, colors, contrast, text_colors, pair_masks):
+    """
+    Palette dicts of one job from per-variant hex colors, contrast matrices,
+    text colors and bitmasks of the _PAIRS that pass WCAG AA
+    """
+    return [
+        {
+            'id': f'palette_{i + 1}',
+            'name': f'{scheme.capitalize()} Palette {i + 1}',
+            'colors': hexes,
+            'scheme': scheme,
+            'textColors': text,  # black or white, whichever reads better on each color
+            'contrast': matrix,  # WCAG contrast ratio of every pair of colors
+            'accessiblePairs': _PAIR_SETS[mask]  # pairs readable as normal text (AA, 4.5:1)
+        }
+        for i, (hexes, matrix, text, mask) in enumerate(zip(colors, contrast, text_colors, pair_masks))
+    ]
+
+
+def _contrast(a, b):
+    """WCAG contrast ratio of two relative luminances, 1-21"""
+    if a < b:
+        a, b = b, a
+    return round((a + 0.05) / (b + 0.05), 2)
+
+
+def _text_color(luminance):
+    return _BLACK if (luminance + 0.05) / 0.05 >= 1.05 / (luminance + 0.05) else _WHITE
+
+
+def create_palette_service(config):
+    return PaletteService(cache_size=config.PALETTE_CACHE_SIZE)
@@ -0,0 +1,337 @@
+"""
+Sampling Profiler
+Opt-in wall-clock / CPU sampling of live traffic with collapsed-stack and
+speedscope output, plus per-request profiling triggered by a header
+"""
+import hmac
+import json
+import math
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+
+from flask import Blueprint, Response, current_app, g, jsonify, request
+
+# Leaf frames that mean a thread is blocked rather than burning CPU
+_IDLE_LEAVES = {
+    ('threading.py', 'wait'),
+    ('threading.py', '_wait_for_tstate_lock'),
+    ('selectors.py', 'select'),
+    ('socket.py', 'accept'),
+    ('socket.py', 'readinto'),
+    ('socketserver.py', 'serve_forever'),
+    ('queue.py', 'get'),
+}
+
+
+def _label(code):
+    filename = code.co_filename.rsplit('/', 1)[-1]
+    return f'{code.co_name} ({filename}:{code.co_firstlineno})'
+
+
+def _frame_stack(frame):
+    """Root-first list of 'function (file:line)' strings for a frame"""
+    stack = []
+    while frame is not None:
+        stack.append(_label(frame.f_code))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def _is_idle(frame):
+    code = frame.f_code
+    return (code.co_filename.rsplit('/', 1)[-1], code.co_name) in _IDLE_LEAVES
+
+
+class _StackProfile:
+    """Stack -> seconds weights with collapsed-stack and speedscope output"""
+
+    def stack_seconds(self):
+        raise NotImplementedError
+
+    def collapsed(self):
+        """Collapsed-stack text (flamegraph.pl / speedscope input), weights in microseconds"""
+        lines = []
+        for stack, seconds in sorted(self.stack_seconds().items(), key=lambda item: -item[1]):
+            micros = int(round(seconds * 1e6))
+            if micros:
+                lines.append(f"{';'.join(stack)} {micros}\n")
+        return ''.join(lines)
+
+    def speedscope(self, name='BrandArc profile'):
+        """speedscope 'sampled' profile JSON"""
+        frames = []
+        frame_index = {}
+        samples = []
+        weights = []
+        for stack, seconds in self.stack_seconds().items():
+            indexes = []
+            for entry in stack:
+                if entry not in frame_index:
+                    frame_index[entry] = len(frames)
+                    frames.append({'name': entry})
+                indexes.append(frame_index[entry])
+            samples.append(indexes)
+            weights.append(seconds)
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'shared': {'frames': frames},
+            'profiles': [{
+                'type': 'sampled',
+                'name': name,
+                'unit': 'seconds',
+                'startValue': 0,
+                'endValue': self.duration,
+                'samples': samples,
+                'weights': weights
+            }],
+            'name': name,
+            'exporter': 'brandarc-profiler'
+        }
+
+
+class StackSampler(_StackProfile):
+    """
+    Samples Python stacks of other threads every `interval` seconds.
+
+    mode='wall' keeps every sample; mode='cpu' drops samples whose leaf
+    frame is a known blocking call (lock waits, select, accept), which
+    approximates on-CPU time without needing signals.
+    """
+
+    def __init__(self, interval=0.005, mode='wall', exclude_ids=()):
+        if mode not in ('wall', 'cpu'):
+            raise ValueError("mode must be 'wall' or 'cpu'")
+        self.interval = interval
+        self.mode = mode
+        self.exclude_ids = set(exclude_ids)
+        self.samples = Counter()  # tuple(stack) -> sample count
+        self.started_at = None
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.time() - self.started_at
+        return self
+
+    def stack_seconds(self):
+        return {stack: count * self.interval for stack, count in self.samples.items()}
+
+    def _run(self):
+        self.exclude_ids.add(threading.get_ident())
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id in self.exclude_ids:
+                    continue
+                if self.mode == 'cpu' and _is_idle(frame):
+                    continue
+                self.samples[tuple(_frame_stack(frame))] += 1
+
+
+class StackTracer(_StackProfile):
+    """
+    Deterministic profiler for the current thread, used for single requests
+    where a sampler would catch too few samples. Records the exact self time
+    of every call stack (Python and C calls) between start() and stop();
+    mode='cpu' measures thread CPU time instead of wall time.
+    """
+
+    def __init__(self, mode='wall'):
+        if mode not in ('wall', 'cpu'):
+            raise ValueError("mode must be 'wall' or 'cpu'")
+        self.mode = mode
+        self.clock = time.thread_time if mode == 'cpu' else time.perf_counter
+        self.times = Counter()  # tuple(stack) -> self seconds
+        self.started_at = None
+        self.duration = 0.0
+        self._stack = []
+        self._last = 0.0
+
+    def start(self):
+        self.started_at = time.time()
+        self._last = self.clock()
+        sys.setprofile(self._trace)
+        return self
+
+    def stop(self):
+        sys.setprofile(None)
+        self.duration = time.time() - self.started_at
+        return self
+
+    def stack_seconds(self):
+        return dict(self.times)
+
+    def _trace(self, frame, event, arg):
+        now = self.clock()
+        stack = self._stack
+        if stack:
+            self.times[tuple(stack)] += now - self._last
+        if event == 'call':
+            stack.append(_label(frame.f_code))
+        elif event == 'c_call':
+            stack.append(f'{getattr(arg, "__qualname__", arg)} (builtin)')
+        elif stack:
+            # return / c_return / c_exception - frames entered before start() are ignored
+            stack.pop()
+        self._last = self.clock()
+
+
+def render_profile(profile, fmt, name='BrandArc profile'):
+    """Flask response for a finished profile in 'collapsed' or 'speedscope' format"""
+    if fmt == 'speedscope':
+        return Response(json.dumps(profile.speedscope(name)), mimetype='application/json')
+    return Response(profile.collapsed(), mimetype='text/plain')
+
+
+class Profiler:
+    """
+    Holds the on-demand capture state and the most recent per-request
+    profiles for one app. Only one timed capture runs at a time.
+    """
+
+    def __init__(self, interval=0.005, max_duration=60, keep_requests=50):
+        self.interval = interval
+        self.max_duration = max_duration
+        self.request_profiles = OrderedDict()  # profile id -> StackTracer
+        self.keep_requests = keep_requests
+        self._capture_lock = threading.Lock()
+        self._lock = threading.Lock()
+
+    def capture(self, seconds, mode):
+        """Sample all threads for `seconds`; returns None if a capture is already running"""
+        if not self._capture_lock.acquire(blocking=False):
+            return None
+        try:
+            # The requesting thread only sleeps here, so leave it out
+            sampler = StackSampler(self.interval, mode, exclude_ids={threading.get_ident()}).start()
+            try:
+                time.sleep(min(seconds, self.max_duration))
+            finally:
+                # Whatever happens, the sampling thread must not outlive the capture
+                sampler.stop()
+            return sampler
+        finally:
+            self._capture_lock.release()
+
+    def start_request(self, mode):
+        return StackTracer(mode).start()
+
+    def finish_request(self, tracer):
+        """Store a finished per-request profile and return its id"""
+        tracer.stop()
+        profile_id = uuid.uuid4().hex[:16]
+        with self._lock:
+            self.request_profiles[profile_id] = tracer
+            while len(self.request_profiles) > self.keep_requests:
+                self.request_profiles.popitem(last=False)
+        return profile_id
+
+
+profiler_bp = Blueprint('profiler', __name__)
+
+
+def _profiler():
+    return current_app.extensions['profiler']
+
+
+def _valid_admin_token(token):
+    """Whether the request's X-Admin-Token matches `token` (compared in constant time)"""
+    sent = request.headers.get('X-Admin-Token')
+    return bool(token) and sent is not None and hmac.compare_digest(sent.encode('utf-8'), token.encode('utf-8'))
+
+
+@profiler_bp.before_request
+def _require_admin_token():
+    if not _valid_admin_token(current_app.config.get('PROFILING_ADMIN_TOKEN')):
+        return jsonify({
+            'success': False,
+            'error': 'Unauthorized'
+        }), 401
+
+
+@profiler_bp.route('/capture', methods=['POST'])
+def capture_profile():
+    """
+    Sample live traffic on every route for N seconds
+
+    Query: ?seconds=10&mode=wall|cpu&format=collapsed|speedscope
+    """
+    try:
+        seconds = float(request.args.get('seconds', 10))
+        if not math.isfinite(seconds) or seconds <= 0:
+            raise ValueError('seconds must be a positive number')
+        mode = request.args.get('mode', 'wall')
+        fmt = request.args.get('format', 'collapsed')
+        sampler = _profiler().capture(seconds, mode)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+    if sampler is None:
+        return jsonify({
+            'success': False,
+            'error': 'A capture is already running'
+        }), 409
+    return render_profile(sampler, fmt, f'{mode} capture ({sampler.duration:.1f}s)')
+
+
+@profiler_bp.route('/requests/<profile_id>', methods=['GET'])
+def get_request_profile(profile_id):
+    """Fetch a per-request profile by the id from its X-Profile-Id header"""
+    tracer = _profiler().request_profiles.get(profile_id)
+    if tracer is None:
+        return jsonify({
+            'success': False,
+            'error': 'Profile not found'
+        }), 404
+    return render_profile(tracer, request.args.get('format', 'collapsed'), f'request {profile_id}')
+
+
+def init_profiling(app):
+    """
+    Register the admin endpoints under /admin/profile and the per-request
+    hook: a request sent with `X-Profile: wall` (or `cpu`) and a valid
+    X-Admin-Token is traced call by call, and the response carries an
+    X-Profile-Id header to fetch the result from /admin/profile/requests/<id>.
+    """
+    profiler = Profiler(
+        interval=app.config['PROFILING_INTERVAL'],
+        max_duration=app.config['PROFILING_MAX_SECONDS']
+    )
+    app.extensions['profiler'] = profiler
+    app.register_blueprint(profiler_bp, url_prefix='/admin/profile')
+
+    @app.before_request
+    def _start_request_profile():
+        mode = request.headers.get('X-Profile')
+        if mode in ('wall', 'cpu') and _valid_admin_token(app.config.get('PROFILING_ADMIN_TOKEN')):
+            g._profile_tracer = profiler.start_request(mode)
+
+    @app.after_request
+    def _finish_request_profile(response):
+        tracer = g.pop('_profile_tracer', None)
+        if tracer is not None:
+            response.headers['X-Profile-Id'] = profiler.finish_request(tracer)
+        return response
+
+    @app.teardown_request
+    def _abandon_request_profile(exc):
+        # Never leave the tracer installed on a worker thread
+        tracer = g.pop('_profile_tracer', None)
+        if tracer is not None:
+            tracer.stop()
@@ -0,0 +1,228 @@
+"""
+Pronounceability Service
+Character n-gram model that scores how pronounceable a brand name is
+
+Train a model from a word list (one word per line) and point
+PRONOUNCEABILITY_MODEL_PATH at it:
+    python pronounceability_service.py train words.txt pronounceability.bin
+    python pronounceability_service.py score pronounceability.bin Nexora Xqzvbt
+"""
+import argparse
+import math
+import random
+import string
+import struct
+import sys
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional - names are scored one at a time instead
+    np = None
+
+MAGIC = b'BPRN'
+VERSION = 1
+# Symbols: 0 marks the start/end of a name, 1-26 are a-z, 27 is anything else
+ALPHABET = 28
+_OTHER = 27
+# Log-probabilities are stored as integers in units of 1/SCALE nats, so the
+# scalar and vectorized paths sum exactly the same numbers
+SCALE = 256
+
+_HEADER = struct.Struct('<4sHHdd')
+
+_SYMBOLS = bytes(
+    0 if b == 0 else (b - 96 if 97 <= b <= 122 else (b - 64 if 65 <= b <= 90 else _OTHER))
+    for b in range(256)
+)
+
+
+def _symbols(name):
+    """Symbol sequence of a name (without boundaries)"""
+    return [ord(c) - 96 if 'a' <= c <= 'z' else _OTHER for c in name.lower()]
+
+
+class PronounceabilityModel:
+    """
+    Order-n character model: log P(c | previous n-1 characters) for every
+    context, as one flat int16 table indexed by the n symbols in base
+    ALPHABET.
+
+    A name's raw score is its mean log-probability per character
+    (including the end of the name); `low` and `high` map that onto 0-100.
+    They are set at training time to the median raw score of random letter
+    strings and of the training words, so 0 reads as "random letters" and
+    100 as "a typical word".
+    """
+
+    def __init__(self, table, order, low, high):
+        self.table = table  # array('h'), ALPHABET ** order entries
+        self.order = order
+        self.low = low
+        self.high = high
+        self._np_table = np.frombuffer(table, dtype=np.int16).astype(np.int64) if np is not None else None
+        self._np_symbols = np.frombuffer(_SYMBOLS, dtype=np.uint8) if np is not None else None
+
+    @classmethod
+    def train(cls, words, order=3, smoothing=0.1):
+        """Fit a model on an iterable of words with add-`smoothing` estimates"""
+        if not 2 <= order <= 4:
+            raise ValueError('order must be between 2 and 4')
+        size = ALPHABET ** order
+        counts = [0] * size
+        words = [w.strip() for w in words if w.strip() and w.strip().isalpha()]
+        if not words:
+            raise ValueError('No usable training words')
+
+        for word in words:
+            for index in _ngram_indexes(_symbols(word), order):
+                counts[index] += 1
+
+        table = array('h', bytes(2 * size))
+        for context in range(0, size, ALPHABET):
+            row = counts[context:context + ALPHABET]
+            total = sum(row) + smoothing * ALPHABET
+            for c in range(ALPHABET):
+                logp = math.log((row[c] + smoothing) / total)
+                table[context + c] = max(-32768, round(logp * SCALE))
+
+        model = cls(table, order, 0.0, 1.0)
+        rng = random.Random(0)
+        sample = words if len(words) <= 5000 else rng.sample(words, 5000)
+        noise = [''.join(rng.choices(string.ascii_lowercase, k=len(w))) for w in sample]
+        model.high = _median(model.raw_score(w) for w in sample)
+        model.low = min(_median(model.raw_score(w) for w in noise), model.high - 1.0)
+        return model
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        if len(data) < _HEADER.size:
+            raise ValueError(f'{path}: truncated header')
+        magic, version, order, low, high = _HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{path}: not a pronounceability model (version {VERSION})')
+        table = array('h')
+        table.frombytes(data[_HEADER.size:])
+        if len(table) != ALPHABET ** order:
+            raise ValueError(f'{path}: table size does not match order {order}')
+        if sys.byteorder != 'little':
+            table.byteswap()
+        return cls(table, order, low, high)
+
+    def save(self, path):
+        table = array('h', self.table)
+        if sys.byteorder != 'little':
+            table.byteswap()
+        with open(path, 'wb') as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, self.order, self.low, self.high))
+            f.write(table.tobytes())
+
+    def raw_score(self, name):
+        """Mean log-probability per character, in table units"""
+        symbols = _symbols(name)
+        total = sum(self.table[i] for i in _ngram_indexes(symbols, self.order))
+        return total / (len(symbols) + 1)
+
+    def score(self, name):
+        """Pronounceability of one name, 0-100"""
+        scaled = round((self.raw_score(name) - self.low) * 100 / (self.high - self.low))
+        return max(0, min(100, scaled))
+
+    def score_batch(self, names):
+        """
+        score() for many names.
+
+        ASCII names are scored in one vectorized pass over a fixed-width
+        symbol matrix when numpy is available; results are identical to
+        score().
+        """
+        names = list(names)
+        if np is None or not names:
+            return [self.score(name) for name in names]
+
+        ascii_pos = [i for i, name in enumerate(names) if name.isascii()]
+        scores = [None] * len(names)
+        if ascii_pos:
+            vectorized = self._score_vectorized([names[i] for i in ascii_pos])
+            for i, score in zip(ascii_pos, vectorized.tolist()):
+                scores[i] = score
+        for i, name in enumerate(names):
+            if scores[i] is None:
+                scores[i] = self.score(name)
+        return scores
+
+    def _score_vectorized(self, names):
+        buf = np.array(names, dtype=np.bytes_)
+        width = buf.dtype.itemsize
+        lengths = np.char.str_len(buf).astype(np.int64)
+        codes = buf.view(np.uint8).reshape(len(names), width)
+        symbols = self._np_symbols[codes].astype(np.int64)
+
+        # order-1 start boundaries, the name, then its end boundary (NUL padding maps to 0)
+        n = self.order
+        padded = np.zeros((len(names), width + n), dtype=np.int64)
+        padded[:, n - 1:n - 1 + width] = symbols
+        index = np.zeros((len(names), width + 1), dtype=np.int64)
+        for j in range(n):
+            index = index * ALPHABET + padded[:, j:j + width + 1]
+
+        logp = self._np_table[index]
+        mask = np.arange(width + 1) <= lengths[:, None]
+        raw = (logp * mask).sum(axis=1) / (lengths + 1)
+        scaled = np.rint((raw - self.low) * 100 / (self.high - self.low))
+        return np.clip(scaled, 0, 100).astype(np.int64)
+
+
+def _median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def _ngram_indexes(symbols, order):
+    """Table index of every n-gram of a boundary-padded symbol sequence"""
+    padded = [0] * (order - 1) + symbols + [0]
+    indexes = []
+    for i in range(len(padded) - order + 1):
+        index = 0
+        for s in padded[i:i + order]:
+            index = index * ALPHABET + s
+        indexes.append(index)
+    return indexes
+
+
+def create_pronounceability_model(config):
+    """Load the model named by PRONOUNCEABILITY_MODEL_PATH, or None if unset"""
+    if not config.PRONOUNCEABILITY_MODEL_PATH:
+        return None
+    return PronounceabilityModel.load(config.PRONOUNCEABILITY_MODEL_PATH)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='BrandArc pronounceability model')
+    sub = parser.add_subparsers(dest='command', required=True)
+    train = sub.add_parser('train', help='fit a model on a word list (one word per line)')
+    train.add_argument('words')
+    train.add_argument('output')
+    train.add_argument('--order', type=int, default=3, help='n-gram order, 2-4')
+    train.add_argument('--smoothing', type=float, default=0.1, help='add-k smoothing')
+    score = sub.add_parser('score', help='score names with a trained model')
+    score.add_argument('model')
+    score.add_argument('names', nargs='+')
+    args = parser.parse_args(argv)
+
+    if args.command == 'train':
+        with open(args.words, encoding='utf-8') as f:
+            model = PronounceabilityModel.train(f, order=args.order, smoothing=args.smoothing)
+        model.save(args.output)
+        print(f'✅ Wrote order-{model.order} model ({len(model.table) * 2} bytes) to {args.output}')
+    else:
+        model = PronounceabilityModel.load(args.model)
+        for name, value in zip(args.names, model.score_batch(args.names)):
+            print(f'{value:>4}  {name}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
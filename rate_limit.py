@@ -0,0 +1,304 @@
+"""
+Rate Limiting
+Per-client token buckets, kept in process memory or in a file shared by all workers
+"""
+import hashlib
+import math
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+
+from flask import g, jsonify, request
+
+try:
+    import fcntl
+except ImportError:  # not on Windows - only the in-process store is available there
+    fcntl = None
+
+_PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+_RATE = re.compile(r'^\s*(\d+)\s*(?:/|per)\s*(second|minute|hour|day)s?\s*$')
+
+
+def parse_rate(text):
+    """'100/hour' -> (100, 3600.0)"""
+    match = _RATE.match(text.lower())
+    if not match or int(match.group(1)) <= 0:
+        raise ValueError(f'Invalid rate limit: {text!r}')
+    return int(match.group(1)), float(_PERIODS[match.group(2)])
+
+
+class Limit:
+    """A rate as a bucket of `capacity` tokens, one token refilled every `interval` seconds"""
+
+    __slots__ = ('text', 'capacity', 'interval')
+
+    def __init__(self, text):
+        count, period = parse_rate(text)
+        self.text = text
+        self.capacity = count
+        self.interval = period / count
+
+
+def _gcra(tat, now, limit, cost):
+    """
+    Token bucket as GCRA: the whole bucket state is one float, the time at
+    which it will be full again (`tat`).
+
+    Returns (new tat, or None if denied; tokens left; seconds until
+    `cost` tokens are available; seconds until the bucket is full).
+    """
+    burst = limit.capacity * limit.interval
+    if tat < now or tat > now + burst:  # full (or the clock jumped)
+        tat = now
+    new_tat = tat + cost * limit.interval
+    if new_tat - now > burst:
+        return None, int((burst - (tat - now)) / limit.interval), new_tat - burst - now, tat - now
+    return new_tat, int((burst - (new_tat - now)) / limit.interval), 0.0, new_tat - now
+
+
+class MemoryStore:
+    """
+    Buckets of this process only.
+
+    A check is one dict read and one dict write with no lock; two requests
+    of the same client racing on different threads can both pass, which
+    costs at most one extra token.
+    """
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._tats = {}
+
+    def hit(self, key, limit, cost, now):
+        tats = self._tats
+        new_tat, remaining, retry_after, reset = _gcra(tats.get(key, 0.0), now, limit, cost)
+        if new_tat is not None:
+            if len(tats) >= self.max_keys and key not in tats:
+                self._prune(now)
+            tats[key] = new_tat
+        return new_tat is not None, remaining, retry_after, reset
+
+    def _prune(self, now):
+        # Full buckets carry no state; if every bucket is active, drop the oldest half
+        stale = [key for key, tat in list(self._tats.items()) if tat <= now]
+        if len(stale) < self.max_keys // 10:
+            stale = list(self._tats)[:self.max_keys // 2]
+        for key in stale:
+            self._tats.pop(key, None)
+
+
+class SharedFileStore:
+    """
+    Buckets in a memory-mapped file shared by every process that opens it
+    (put it on /dev/shm to keep it in memory).
+
+    The file is an open-addressing table of (key hash, tat) slots. A key
+    lives in a window of PROBE consecutive slots, which is locked with a
+    byte-range fcntl lock for the duration of a check. Slots of full
+    buckets are reused; when a window has none, the slot that refills
+    first is taken over.
+    """
+
+    SLOT = struct.Struct('<Qd')
+    PROBE = 8
+
+    def __init__(self, path, slots=65536):
+        if fcntl is None:
+            raise RuntimeError('A shared rate limit store needs fcntl (POSIX)')
+        slots = max(slots, self.PROBE)
+        size = slots * self.SLOT.size
+        self.path = path
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size != size:
+            os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size)
+        self._windows = slots - self.PROBE + 1
+        # fcntl locks are per process; threads of one process also need this
+        self._lock = threading.Lock()
+
+    def hit(self, key, limit, cost, now):
+        digest = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'little') or 1
+        offset = digest % self._windows * self.SLOT.size
+        length = self.PROBE * self.SLOT.size
+        with self._lock:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, length, offset, os.SEEK_SET)
+            try:
+                slot, tat = self._find(digest, offset, now)
+                new_tat, remaining, retry_after, reset = _gcra(tat, now, limit, cost)
+                if new_tat is not None:
+                    self.SLOT.pack_into(self._map, slot, digest, new_tat)
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, length, offset, os.SEEK_SET)
+        return new_tat is not None, remaining, retry_after, reset
+
+    def _find(self, digest, offset, now):
+        """(slot offset, tat) of the key's slot, or of the slot it should take over"""
+        free = None
+        oldest, oldest_tat = offset, math.inf
+        for slot in range(offset, offset + self.PROBE * self.SLOT.size, self.SLOT.size):
+            stored, tat = self.SLOT.unpack_from(self._map, slot)
+            if stored == digest:
+                return slot, tat
+            if free is None and (stored == 0 or tat <= now):
+                free = slot
+            elif tat < oldest_tat:
+                oldest, oldest_tat = slot, tat
+        return (oldest if free is None else free), 0.0
+
+
+class RateLimitResult:
+    __slots__ = ('limit', 'allowed', 'remaining', 'retry_after', 'reset')
+
+    def __init__(self, limit, allowed, remaining, retry_after, reset):
+        self.limit = limit
+        self.allowed = allowed
+        self.remaining = remaining
+        self.retry_after = retry_after
+        self.reset = reset
+
+
+def _count(value, default, maximum):
+    try:
+        return max(1, min(int(value), maximum))
+    except (TypeError, ValueError):
+        return default
+
+
+def _per_ten(count):
+    # 1 token per started 10
+    return -(-count // 10)
+
+
+def _generate_cost(data):
+    """1 token per started 10 names, doubled for ranked generation"""
+    cost = _per_ten(_count(data.get('count'), 10, 50))
+    return cost * 2 if data.get('ranked') else cost
+
+
+def _generate_batch_cost(data):
+    jobs = data.get('jobs')
+    if not isinstance(jobs, list):
+        return 1
+    return max(1, sum(_generate_cost(job) for job in jobs if isinstance(job, dict)))
+
+
+def _availability_batch_cost(data):
+    names = data.get('names')
+    return max(1, _per_ten(len(names))) if isinstance(names, list) else 1
+
+
+def _jobs_cost(data):
+    jobs = data.get('jobs')
+    return max(1, _per_ten(len(jobs))) if isinstance(jobs, list) else 1
+
+
+# Tokens per request by endpoint (default 1), computed from the JSON body.
+# 0 exempts an endpoint - load balancer and metrics scrapes are never limited.
+DEFAULT_COSTS = {
+    'brand.generate_brand_names': _generate_cost,
+    'brand.generate_brand_names_batch': _generate_batch_cost,
+    'brand.check_availability_batch': _availability_batch_cost,
+    'generate_palette_batch': _jobs_cost,
+    'generate_content_batch': _jobs_cost,
+    'health': 0,
+    'metrics': 0,
+}
+
+
+class RateLimiter:
+    """
+    Per-client limits: every client has one bucket for the default limit,
+    plus one per endpoint that has a limit of its own.
+    """
+
+    def __init__(self, store, default, routes=None, costs=None):
+        self.store = store
+        self.default = Limit(default)
+        self.routes = {endpoint: Limit(rate) for endpoint, rate in (routes or {}).items()}
+        self.costs = DEFAULT_COSTS if costs is None else costs
+
+    def cost(self, endpoint, data):
+        cost = self.costs.get(endpoint, 1)
+        return cost(data) if callable(cost) else cost
+
+    def check(self, client, endpoint, cost, now=None):
+        """
+        Take `cost` tokens from the client's bucket for `endpoint` if it has
+        them. A cost above the bucket's capacity is always denied; a denied
+        check takes nothing.
+        """
+        limit = self.routes.get(endpoint)
+        scope = endpoint if limit is not None else '*'
+        limit = limit or self.default
+        result = self.store.hit(f'{scope}|{client}', limit, cost, time.time() if now is None else now)
+        return RateLimitResult(limit, *result)
+
+
+def client_address(trusted_proxies=0):
+    """Client IP, taken from X-Forwarded-For when behind `trusted_proxies` proxies"""
+    if trusted_proxies:
+        hops = [hop.strip() for hop in request.headers.get('X-Forwarded-For', '').split(',') if hop.strip()]
+        if len(hops) >= trusted_proxies:
+            return hops[-trusted_proxies]
+    return request.remote_addr or 'unknown'
+
+
+def init_rate_limiting(app):
+    """
+    Check every request against the client's bucket before it is handled.
+
+    Limited responses are 429 with Retry-After, and requests costing more
+    than a full bucket are 413 (no wait makes them fit); every checked response
+    carries X-RateLimit-Limit, X-RateLimit-Remaining and X-RateLimit-Reset
+    (seconds until the bucket is full again).
+    """
+    storage = app.config.get('RATE_LIMIT_STORAGE')
+    store = SharedFileStore(storage, app.config['RATE_LIMIT_SLOTS']) if storage else MemoryStore()
+    limiter = RateLimiter(store, app.config['RATE_LIMIT_DEFAULT'], app.config.get('RATE_LIMIT_ROUTES'))
+    trusted_proxies = app.config.get('RATE_LIMIT_TRUSTED_PROXIES', 0)
+    app.extensions['rate_limiter'] = limiter
+
+    @app.before_request
+    def _check_rate_limit():
+        if request.method == 'OPTIONS':
+            return None
+        data = request.get_json(silent=True) if request.is_json else None
+        cost = limiter.cost(request.endpoint, data if isinstance(data, dict) else {})
+        if not cost:
+            return None
+
+        result = limiter.check(client_address(trusted_proxies), request.endpoint, cost)
+        g._rate_limit = result
+        if result.allowed:
+            return None
+        if cost > result.limit.capacity:
+            response = jsonify({
+                'success': False,
+                'error': 'Request too large for the rate limit',
+                'message': f'Limit is {result.limit.text}; this request costs {cost} tokens. '
+                           f'Split it into requests of at most {result.limit.capacity} tokens'
+            })
+            response.status_code = 413
+            return response
+        retry_after = max(1, math.ceil(result.retry_after))
+        response = jsonify({
+            'success': False,
+            'error': 'Rate limit exceeded',
+            'message': f'Limit is {result.limit.text}; this request costs {cost} tokens. '
+                       f'Try again in {retry_after} seconds'
+        })
+        response.status_code = 429
+        response.headers['Retry-After'] = str(retry_after)
+        return response
+
+    @app.after_request
+    def _rate_limit_headers(response):
+        result = g.pop('_rate_limit', None)
+        if result is not None:
+            response.headers['X-RateLimit-Limit'] = str(result.limit.capacity)
+            response.headers['X-RateLimit-Remaining'] = str(result.remaining)
+            response.headers['X-RateLimit-Reset'] = str(math.ceil(result.reset))
+        return response
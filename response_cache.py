@@ -0,0 +1,116 @@
+"""
+Response Cache
+Size-bounded LRU of serialized JSON responses with strong ETags
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+from flask import current_app, request
+
+
+class CachedResponse:
+    """A serialized response body, its ETag and any data kept with it"""
+    __slots__ = ('body', 'etag', 'data')
+
+    def __init__(self, body, etag, data=None):
+        self.body = body
+        self.etag = etag
+        self.data = data
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU of response bodies.
+
+    Bounded both by entry count and by total body bytes; the least recently
+    used entries are evicted first when either limit is exceeded.
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> CachedResponse
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return the CachedResponse for a key, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, body, data=None):
+        """
+        Store a serialized body (bytes) and return its CachedResponse. `data`
+        is kept with the body for the caller (not counted in max_bytes).
+        """
+        entry = CachedResponse(body, hashlib.sha1(body).hexdigest(), data)
+        if len(body) > self.max_bytes:
+            return entry
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old.body)
+            self._entries[key] = entry
+            self._bytes += len(body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.body)
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+def cached_json_response(cache, key, build_payload, status=200):
+    """
+    Serve a JSON response through the cache.
+
+    build_payload() is only called on a miss. The response carries a strong
+    ETag and becomes a 304 when it matches the request's If-None-Match.
+    """
+    return cached_response(
+        cache, key, lambda: current_app.json.dumps(build_payload()).encode('utf-8'),
+        status=status, mimetype='application/json'
+    )
+
+
+def cached_response(cache, key, build_body, status=200, mimetype='application/json'):
+    """cached_json_response() for a body build_body() returns already serialized (bytes)"""
+    entry = cache.get(key)
+    if entry is None:
+        entry = cache.put(key, build_body())
+    return conditional_response(entry, status, mimetype)
+
+
+def conditional_response(entry, status=200, mimetype='application/json'):
+    """The response for a CachedResponse: a 304 when If-None-Match matches its ETag"""
+    # Checked by hand: werkzeug's make_conditional only applies to GET/HEAD,
+    # and generation requests are POSTs. If-None-Match uses weak comparison,
+    # so the weak form set after compression still matches.
+    if request.if_none_match.contains_weak(entry.etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = current_app.response_class(entry.body, status=status, mimetype=mimetype)
+    response.set_etag(entry.etag)
+    return response
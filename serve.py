@@ -0,0 +1,376 @@
+"""
+BrandArc Production Server
+Pre-forking WSGI server: the app and its tables are built once, then shared with the workers
+
+Usage:
+    python serve.py                          # one worker per CPU core on HOST:PORT
+    python serve.py --workers 4 --port 8000
+    python serve.py --threads 32             # concurrent requests per worker
+
+Signals (to the master process):
+    SIGHUP           graceful reload - a fresh master image preloads the app
+                     and starts new workers, then the old workers finish
+                     the requests in flight and exit
+    SIGTERM, SIGINT  graceful shutdown
+"""
+import argparse
+import gc
+import os
+import random
+import select
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import traceback
+
+from werkzeug.serving import ThreadedWSGIServer, WSGIRequestHandler
+
+from config import get_config
+
+# Passed across the re-exec on SIGHUP
+LISTEN_FD_ENV = 'BRANDARC_LISTEN_FD'
+RETIRING_ENV = 'BRANDARC_RETIRING_WORKERS'
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+# Seconds between housekeeping passes (and the longest a stopping worker waits for a request)
+_TICK = 1.0
+# Workers that exit sooner than this after starting are respawned with a delay
+_MIN_WORKER_LIFETIME = 1.0
+
+
+def default_workers():
+    """CPU cores available to this process"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS
+        return os.cpu_count() or 1
+
+
+def preload():
+    """Create the app and build everything workers would otherwise build per process"""
+    from app import create_app, warm_up
+    from api.brand import suggestion_pool
+
+    started = time.perf_counter()
+    app = create_app()
+    indexes = warm_up(app)
+    # The pool's thread would not survive fork(); fill it here and restart it in each worker
+    suggestion_pool.stop()
+    if app.config.get('SUGGESTION_POOL_ENABLED'):
+        suggestion_pool.refresh()
+
+    # Move everything built so far out of the collector's reach: collections
+    # in the workers would otherwise write to (and so copy) the shared pages
+    gc.collect()
+    gc.freeze()
+    print(f'✅ Preloaded app in {time.perf_counter() - started:.2f}s ({indexes} candidate indexes)', flush=True)
+    return app
+
+
+def listen(host, port, backlog):
+    """The shared listening socket - inherited from the previous master on reload"""
+    fd = os.environ.pop(LISTEN_FD_ENV, None)
+    if fd is not None:
+        sock = socket.socket(fileno=int(fd))
+    else:
+        family = socket.AF_INET6 if ':' in host else socket.AF_INET
+        sock = socket.create_server((host, port), family=family, backlog=backlog)
+    # Every worker polls the socket; the ones that lose the accept() race must not block in it
+    sock.setblocking(False)
+    return sock
+
+
+class _RequestHandler(WSGIRequestHandler):
+    # One request per connection: an idle keep-alive client would hold a request thread
+    protocol_version = 'HTTP/1.0'
+
+
+class WorkerServer(ThreadedWSGIServer):
+    """
+    Serves each request on its own thread, at most `threads` at a time, so
+    a slow request (an availability deadline, a long NDJSON stream, a
+    profile capture) does not hold up the others. A worker with every
+    thread busy stops accepting and leaves new connections to the others.
+    """
+    daemon_threads = False  # server_close() waits for the requests in flight
+
+    def __init__(self, host, port, app, fd, threads):
+        super().__init__(host, port, app, _RequestHandler, fd=fd)
+        self.threads = threads
+        self.active = 0
+        self._slots = threading.Condition()
+
+    def wait_for_slot(self, timeout):
+        """Wait up to `timeout` seconds for fewer than `threads` requests to be running"""
+        with self._slots:
+            return self._slots.wait_for(lambda: self.active < self.threads, timeout)
+
+    def process_request(self, request, client_address):
+        with self._slots:
+            self.active += 1
+        super().process_request(request, client_address)
+
+    def process_request_thread(self, request, client_address):
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            with self._slots:
+                self.active -= 1
+                self._slots.notify()
+
+
+def run_worker(app, sock, host, port, max_requests, forked_at=None, threads=16):
+    """Serve requests until told to stop or `max_requests` is reached (0 = no limit)"""
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    # Ctrl-C reaches the whole process group - the master coordinates shutdown
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+
+    if app.config.get('SUGGESTION_POOL_ENABLED'):
+        from api.brand import suggestion_pool
+        suggestion_pool.start()
+
+    handled = 0
+    handled_lock = threading.Lock()
+
+    def counted(environ, start_response):
+        nonlocal handled
+        with handled_lock:
+            handled += 1
+        return app(environ, start_response)
+
+    server = WorkerServer(host, port, counted, sock.fileno(), threads)
+    server.timeout = _TICK
+    if forked_at is not None:
+        print(f'👷 Worker {os.getpid()} ready in {(time.perf_counter() - forked_at) * 1000:.1f} ms', flush=True)
+    try:
+        while not stopping and not (max_requests and handled >= max_requests):
+            if server.wait_for_slot(_TICK):
+                server.handle_request()
+    finally:
+        # Stops accepting, then waits for the requests still running
+        server.server_close()
+        # Workers leave through os._exit(), which skips atexit: save the queued names now
+        from api.brand import name_store
+        if name_store is not None:
+            name_store.close()
+    return 0
+
+
+class Master:
+    """Keeps `worker_count` forked workers running on one listening socket"""
+
+    def __init__(self, app, sock, host, port, worker_count, max_requests=0, max_requests_jitter=0,
+                 graceful_timeout=30.0, threads=16):
+        self.app = app
+        self.sock = sock
+        self.host = host
+        self.port = port
+        self.worker_count = worker_count
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        self.threads = threads
+        self.workers = {}   # pid -> start time
+        self.retiring = {}  # pid -> time to SIGKILL it if it is still running
+        self._signals = []
+        self._respawn_after = 0.0
+        self._wakeup = None
+        self._preflight = None  # app start-up check running ahead of a reload
+
+    def run(self):
+        wake_r, wake_w = os.pipe()
+        os.set_blocking(wake_r, False)
+        os.set_blocking(wake_w, False)
+        self._wakeup = (wake_r, wake_w)
+        signal.set_wakeup_fd(wake_w)
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+            signal.signal(signum, self._on_signal)
+        # Only installed so exiting workers wake the loop through the wakeup fd
+        signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+
+        self._spawn_missing()
+        # Workers of the master image we replaced, if this is a reload
+        self._retire(int(pid) for pid in os.environ.pop(RETIRING_ENV, '').split(',') if pid)
+
+        while True:
+            select.select([wake_r], [], [], _TICK)
+            try:
+                while os.read(wake_r, 512):
+                    pass
+            except BlockingIOError:
+                pass
+
+            self._reap()
+            while self._signals:
+                signum = self._signals.pop(0)
+                if signum == signal.SIGHUP:
+                    self.reload()
+                else:
+                    self.stop()
+                    return
+            if self._preflight is not None and self._preflight.poll() is not None:
+                self._finish_reload()
+            self._kill_overdue()
+            self._spawn_missing()
+
+    def reload(self):
+        """Check that the (possibly changed) app starts, then re-exec the master"""
+        if self._preflight is not None:
+            return
+        print('🔄 Reloading: checking that the app starts...', flush=True)
+        # Runs alongside the loop so workers keep being respawned meanwhile
+        self._preflight = subprocess.Popen([sys.executable, '-c', 'import app; app.create_app()'], cwd=BACKEND_DIR)
+
+    def _finish_reload(self):
+        """Re-exec the master, handing over the socket and the workers to retire"""
+        check, self._preflight = self._preflight, None
+        if check.returncode != 0:
+            print('⚠️  Reload aborted: the app failed to start, keeping the current workers',
+                  file=sys.stderr, flush=True)
+            return
+
+        self.sock.set_inheritable(True)
+        env = dict(os.environ)
+        env[LISTEN_FD_ENV] = str(self.sock.fileno())
+        env[RETIRING_ENV] = ','.join(str(pid) for pid in [*self.workers, *self.retiring])
+        signal.set_wakeup_fd(-1)
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.execve(sys.executable, [sys.executable, *sys.argv], env)
+
+    def stop(self):
+        """Let every worker finish its requests in flight, then exit"""
+        print('🛑 Shutting down...', flush=True)
+        self._retire(list(self.workers))
+        deadline = time.monotonic() + self.graceful_timeout
+        while self.retiring and time.monotonic() < deadline:
+            time.sleep(0.1)
+            self._reap()
+        self._kill_overdue(force=True)
+        while self.retiring:
+            time.sleep(0.1)
+            self._reap()
+        self.sock.close()
+
+    def _on_signal(self, signum, frame):
+        self._signals.append(signum)
+
+    def _spawn_missing(self):
+        if time.monotonic() < self._respawn_after:
+            return
+        while len(self.workers) < self.worker_count:
+            self._spawn()
+
+    def _spawn(self):
+        limit = self.max_requests
+        if limit:
+            limit += random.randint(0, self.max_requests_jitter)
+        # Objects the master allocated since the last fork are shared too
+        gc.freeze()
+
+        forked_at = time.perf_counter()
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                signal.set_wakeup_fd(-1)
+                os.close(self._wakeup[0])
+                os.close(self._wakeup[1])
+                code = run_worker(self.app, self.sock, self.host, self.port, limit, forked_at, self.threads)
+            except BaseException:
+                traceback.print_exc()
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(code)
+
+        self.workers[pid] = time.monotonic()
+        print(f'👷 Worker {pid} started' + (f' (recycles after {limit} requests)' if limit else ''), flush=True)
+
+    def _retire(self, pids):
+        deadline = time.monotonic() + self.graceful_timeout
+        for pid in pids:
+            self.workers.pop(pid, None)
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                continue
+            self.retiring[pid] = deadline
+
+    def _kill_overdue(self, force=False):
+        now = time.monotonic()
+        for pid, deadline in list(self.retiring.items()):
+            if force or now >= deadline:
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    self.retiring.pop(pid)
+
+    def _reap(self):
+        # Only our workers - waitpid(-1) would also collect the reload check's process
+        for pid in [*self.workers, *self.retiring]:
+            try:
+                done, status = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                done, status = pid, None
+            if done == 0:
+                continue
+
+            self.retiring.pop(pid, None)
+            started = self.workers.pop(pid, None)
+            if started is None:
+                continue
+            code = os.waitstatus_to_exitcode(status) if status is not None else None
+            if code == 0:
+                print(f'♻️  Worker {pid} recycled', flush=True)
+            else:
+                print(f'⚠️  Worker {pid} exited with status {code}', file=sys.stderr, flush=True)
+            if time.monotonic() - started < _MIN_WORKER_LIFETIME:
+                self._respawn_after = time.monotonic() + _MIN_WORKER_LIFETIME
+
+def main(argv=None):
+    config = get_config()
+    parser = argparse.ArgumentParser(description='BrandArc production server')
+    parser.add_argument('--host', default=config.HOST)
+    parser.add_argument('--port', type=int, default=config.PORT)
+    parser.add_argument('--workers', type=int, default=config.SERVER_WORKERS or default_workers())
+    parser.add_argument('--threads', type=int, default=config.SERVER_THREADS,
+                        help='requests each worker serves at once')
+    parser.add_argument('--max-requests', type=int, default=config.SERVER_MAX_REQUESTS,
+                        help='recycle a worker after this many requests (0 = never)')
+    parser.add_argument('--max-requests-jitter', type=int, default=config.SERVER_MAX_REQUESTS_JITTER)
+    parser.add_argument('--graceful-timeout', type=float, default=config.SERVER_GRACEFUL_TIMEOUT,
+                        help='seconds workers get to finish in-flight requests')
+    args = parser.parse_args(argv)
+
+    if not hasattr(os, 'fork'):
+        print('serve.py needs fork(); use app.py on this platform', file=sys.stderr)
+        return 1
+
+    app = preload()
+    sock = listen(args.host, args.port, config.SERVER_BACKLOG)
+    print(f'🚀 BrandArc serving on http://{args.host}:{args.port} '
+          f'with {args.workers} workers x {args.threads} threads (master pid {os.getpid()})', flush=True)
+    Master(
+        app, sock, args.host, args.port, args.workers,
+        max_requests=args.max_requests,
+        max_requests_jitter=args.max_requests_jitter,
+        graceful_timeout=args.graceful_timeout,
+        threads=args.threads
+    ).run()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
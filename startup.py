@@ -0,0 +1,185 @@
+"""
+Startup
+Lazily built services, initializer timings and a startup-time report
+
+Report what importing and creating the app costs:
+    python startup.py            # imports and initializers of create_app()
+    python startup.py --warm     # ... and of warm_up(), as serve.py runs it
+    python startup.py --lazy     # with LAZY_INIT=true
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+# Packages of this project, reported module by module rather than as a whole
+_PROJECT_PACKAGES = ('app', 'api', 'services', 'utils', 'config', 'startup')
+
+
+class StartupReport:
+    """Wall time of each initializer, in the order they ran"""
+
+    def __init__(self):
+        self.steps = []  # (name, seconds)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def step(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.steps.append((name, time.perf_counter() - started))
+
+    def total(self):
+        with self._lock:
+            return sum(seconds for _, seconds in self.steps)
+
+
+REPORT = StartupReport()
+
+
+class Lazy:
+    """
+    Stand-in for a service that is built by `factory` on first attribute
+    access (or by resolve()). Building is timed into REPORT and happens
+    once even when several threads get there together.
+
+    With eager=True the service is built right away; the proxy is kept so
+    code using it does not care which mode is on.
+    """
+
+    __slots__ = ('_name', '_factory', '_instance', '_lock')
+
+    def __init__(self, name, factory, eager=False):
+        object.__setattr__(self, '_name', name)
+        object.__setattr__(self, '_factory', factory)
+        object.__setattr__(self, '_instance', None)
+        object.__setattr__(self, '_lock', threading.Lock())
+        if eager:
+            resolve(self)
+
+    def __getattr__(self, attr):
+        instance = self._instance
+        if instance is None:
+            instance = resolve(self)
+        return getattr(instance, attr)
+
+    def __setattr__(self, attr, value):
+        setattr(resolve(self), attr, value)
+
+    def __repr__(self):
+        state = 'built' if self._instance is not None else 'not built'
+        return f'<Lazy {self._name} ({state})>'
+
+
+def resolve(service):
+    """The object behind a Lazy (building it if needed); anything else as is"""
+    if not isinstance(service, Lazy):
+        return service
+    instance = service._instance
+    if instance is None:
+        with service._lock:
+            instance = service._instance
+            if instance is None:
+                with REPORT.step(f'init {service._name}'):
+                    instance = service._factory()
+                object.__setattr__(service, '_instance', instance)
+    return instance
+
+
+def is_ready(service):
+    """False for a Lazy that has not been built yet"""
+    return not isinstance(service, Lazy) or service._instance is not None
+
+
+# --- Report ---------------------------------------------------------------------
+
+_CHILD = '''
+import json, sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+flask_app = app.create_app()
+created = time.perf_counter()
+if {warm!r}:
+    app.warm_up(flask_app)
+warmed = time.perf_counter()
+from startup import REPORT
+sys.stdout.write(json.dumps({{
+    'import': imported - started,
+    'create_app': created - imported,
+    'warm_up': warmed - created,
+    'steps': REPORT.steps,
+}}))
+'''
+
+
+def parse_importtime(text):
+    """
+    Self time per reported module from `python -X importtime` output: project
+    modules on their own, everything else summed by top-level package.
+    """
+    costs = {}
+    for line in text.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        self_us = parts[0].strip()
+        if len(parts) != 3 or not self_us.isdigit():  # the header line
+            continue
+        name = parts[2].strip()
+        top = name.split('.')[0]
+        key = name if top in _PROJECT_PACKAGES else top
+        costs[key] = costs.get(key, 0) + int(self_us) / 1e6
+    return costs
+
+
+def measure(warm=False, lazy=None):
+    """Boot the app in a fresh interpreter; (timings dict, import costs)"""
+    env = dict(os.environ)
+    if lazy is not None:
+        env['LAZY_INIT'] = 'true' if lazy else 'false'
+    env.setdefault('SUGGESTION_POOL_ENABLED', 'false')  # its thread would build services mid-report
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _CHILD.format(warm=warm)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=False
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f'App failed to start:\n{result.stderr[-2000:]}')
+    return json.loads(result.stdout.strip().splitlines()[-1]), parse_importtime(result.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='BrandArc startup-time report')
+    parser.add_argument('--warm', action='store_true', help='include warm_up() (as serve.py runs it)')
+    parser.add_argument('--lazy', action='store_true', help='run with LAZY_INIT=true')
+    parser.add_argument('--top', type=int, default=15, help='imports to list')
+    args = parser.parse_args(argv)
+
+    timings, imports = measure(warm=args.warm, lazy=True if args.lazy else None)
+    total = timings['import'] + timings['create_app'] + timings['warm_up']
+    print(f"\n⏱️  Startup: {total * 1000:.1f} ms "
+          f"(import {timings['import'] * 1000:.1f} ms, create_app {timings['create_app'] * 1000:.1f} ms"
+          + (f", warm_up {timings['warm_up'] * 1000:.1f} ms)" if args.warm else ')'))
+
+    print(f'\n   Imports (self time, top {args.top}):')
+    for name, seconds in sorted(imports.items(), key=lambda item: -item[1])[:args.top]:
+        print(f'   {seconds * 1000:>8.1f} ms  {name}')
+    print(f'   {sum(imports.values()) * 1000:>8.1f} ms  total')
+
+    print('\n   Initializers:')
+    for name, seconds in timings['steps'] or [('(none ran)', 0.0)]:
+        print(f'   {seconds * 1000:>8.1f} ms  {name}')
+    print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""
+Suggestion Pool
+Pre-generated quick suggestions per (industry, tone), refreshed in the background
+"""
+import itertools
+import threading
+
+
+class SuggestionPool:
+    """
+    Keeps `depth` ready-made suggestion sets for every known (industry, tone)
+    pair so /api/brand/suggestions never generates names on the request path.
+
+    Requests rotate through a pair's sets in O(1). A daemon thread rebuilds
+    every pool each `refresh_interval` seconds and swaps it in whole, so
+    readers never see a half-built pool.
+    """
+
+    def __init__(self, brand_service, depth=8, refresh_interval=300):
+        self.brand_service = brand_service
+        self.depth = depth
+        self.refresh_interval = refresh_interval
+        self._pools = {}    # (industry, tone) -> tuple of suggestion lists
+        self._cursors = {}  # (industry, tone) -> itertools.count
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def keys(self):
+        """Every (industry, tone) pair the brand service knows about"""
+        return [
+            (industry, tone)
+            for industry in self.brand_service.industry_words
+            for tone in self.brand_service.prefixes
+        ]
+
+    def get(self, industry, tone):
+        """Next suggestion set for a pair, or None if it is not pooled (yet)"""
+        key = (industry, tone)
+        pool = self._pools.get(key)
+        if not pool:
+            return None
+        return pool[next(self._cursors[key]) % len(pool)]
+
+    def refresh(self):
+        """Rebuild all pools"""
+        for key in self.keys():
+            industry, tone = key
+            pool = tuple(
+                self.brand_service.get_quick_suggestions(industry, tone)
+                for _ in range(self.depth)
+            )
+            if key not in self._cursors:
+                self._cursors[key] = itertools.count()
+            self._pools[key] = pool
+
+    def start(self):
+        """Start the background refresher (idempotent)"""
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='suggestion-pool', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        with self._start_lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+
+    def _run(self):
+        # Pools built before start() (e.g. preloaded by serve.py) are still fresh
+        if self._pools and self._stop.wait(self.refresh_interval):
+            return
+        while True:
+            self.refresh()
+            if self._stop.wait(self.refresh_interval):
+                return
@@ -0,0 +1,120 @@
+"""
+Availability Service Tests
+Concurrent lookup fanout
+"""
+import asyncio
+import time
+
+import pytest
+
+from availability_stub import StubAvailabilityServer, _coin
+from services.availability_service import AsyncAvailabilityFanout, AvailabilityFanout, HTTPAvailabilityProvider
+from utils.http_pool import HTTPPool
+
+
+def _latency(seconds, value=None):
+    """Lookup stub answering after `seconds`"""
+    def lookup():
+        time.sleep(seconds)
+        return value
+    return lookup
+
+
+def test_fanout_slow_kind_does_not_starve_others():
+    # Far more slow trademark lookups than its limit, submitted first
+    fanout = AvailabilityFanout(max_workers=32, timeout=0.5, limits={'domain': 16, 'trademark': 4, 'social': 8})
+    lookups = {('trademark', i): ('trademark', _latency(2.0), ()) for i in range(40)}
+    lookups.update({('domain', i): ('domain', _latency(0.05, i), ()) for i in range(20)})
+    lookups.update({('social', i): ('social', _latency(0.05, i), ()) for i in range(10)})
+    try:
+        started = time.perf_counter()
+        results, timed_out = fanout.run(lookups)
+        assert time.perf_counter() - started < 1.0
+    finally:
+        fanout.shutdown()
+
+    assert {key: results[key] for key in lookups if key[0] != 'trademark'} == {
+        key: key[1] for key in lookups if key[0] != 'trademark'
+    }
+    assert sorted(timed_out) == sorted(key for key in lookups if key[0] == 'trademark')
+
+
+def test_fanout_reports_failures_as_timed_out():
+    def failing():
+        raise ConnectionError('backend down')
+
+    fanout = AvailabilityFanout(timeout=1.0)
+    try:
+        results, timed_out = fanout.run({'ok': ('domain', _latency(0, True), ()), 'bad': ('social', failing, ())})
+    finally:
+        fanout.shutdown()
+    assert results == {'ok': True}
+    assert timed_out == ['bad']
+
+
+@pytest.fixture
+def stub():
+    server = StubAvailabilityServer()
+    server.start()
+    yield server
+    server.stop()
+
+
+def test_http_provider_reuses_connections(stub):
+    provider = HTTPAvailabilityProvider(stub.url, HTTPPool(timeout=5.0))
+
+    async def lookups():
+        return [await provider.lookup_trademark(f'Brand{i}') for i in range(10)]
+
+    results = asyncio.run(lookups())
+
+    assert len(results) == 10
+    assert stub.stats()['connections'] == 1
+    assert provider.pool.stats()[stub.url] == {'opened': 1, 'idle': 1, 'requests': 10, 'reused': 9}
+
+
+def test_http_provider_escapes_path_segments(stub):
+    provider = HTTPAvailabilityProvider(stub.url, HTTPPool(timeout=5.0))
+
+    result = asyncio.run(provider.lookup_trademark('AC/DC'))
+
+    # One path segment: the stub looked up the whole name, not /trademarks/AC/DC
+    assert result['available'] is _coin('tm:AC/DC')
+
+
+def test_http_provider_retries_stale_connection(stub):
+    provider = HTTPAvailabilityProvider(stub.url, HTTPPool(timeout=5.0))
+
+    async def lookups():
+        await provider.lookup_trademark('Apex')
+        # The backend restarts while the pooled connection sits idle; the loop
+        # does not run in between, so the pool cannot notice before reusing it
+        stub.stop()
+        stub.start()
+        return await provider.lookup_trademark('Nexora')
+
+    result = asyncio.run(lookups())
+
+    assert result['available'] is _coin('tm:Nexora')
+    assert provider.pool.stats()[stub.url]['opened'] == 2
+
+
+def test_async_fanout_deadline_reports_timed_out(stub):
+    stub.latency = 0.5
+    provider = HTTPAvailabilityProvider(stub.url, HTTPPool(timeout=5.0))
+    fanout = AsyncAvailabilityFanout(timeout=0.1)
+    try:
+        results, timed_out = fanout.run({
+            ('trademark', 'Apex'): ('trademark', provider.lookup_trademark, ('Apex',)),
+            ('social', 'apex'): ('social', provider.lookup_social, ('apex', 'twitter')),
+        })
+        assert results == {}
+        assert sorted(timed_out) == [('social', 'apex'), ('trademark', 'Apex')]
+
+        # Lookups past the deadline are left to finish
+        deadline = time.monotonic() + 2.0
+        while fanout.stats()['inFlight'] and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert fanout.stats()['inFlight'] == 0
+    finally:
+        fanout.shutdown()
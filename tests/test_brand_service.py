@@ -0,0 +1,59 @@
+"""
+Brand Service Tests
+Batch availability checks
+"""
+from services.availability_service import MockAvailabilityProvider
+from services.brand_service import BrandService
+
+
+class _CountingProvider(MockAvailabilityProvider):
+    """Mock results; counts bulk domain lookups and fails social ones"""
+
+    def __init__(self):
+        super().__init__()
+        self.domains = []
+
+    def lookup_domains(self, pairs):
+        self.domains.extend(pairs)
+        return super().lookup_domains(pairs)
+
+    def lookup_socials(self, pairs):
+        raise ConnectionError('social backend down')
+
+
+def test_batch_availability_dedupes_across_chunks():
+    provider = _CountingProvider()
+    service = BrandService(availability_provider=provider)
+    names = ['Apex'] + [f'Brand{i}' for i in range(60)] + ['Apex']
+
+    results = list(service.check_availability_batch(names, chunk_size=50))
+
+    assert len(results) == len(names)
+    assert len(provider.domains) == len(set(provider.domains))
+    assert provider.domains.count(('apex', 'com')) == 1
+    assert results[-1]['domain'] == results[0]['domain']
+
+
+def test_batch_availability_failed_bulk_call_is_partial():
+    service = BrandService(availability_provider=_CountingProvider())
+
+    results = list(service.check_availability_batch(['Apex', 'Nexora']))
+
+    assert [result['name'] for result in results] == ['Apex', 'Nexora']
+    for result in results:
+        assert result['partial'] is True
+        assert result['timedOut'] == ['social:twitter', 'social:instagram', 'social:facebook']
+        assert result['domain']['available'] is not None
+
+
+def test_candidate_indexes_evict_least_recently_used(monkeypatch):
+    monkeypatch.setattr('services.brand_service._CANDIDATE_INDEX_LIMIT', 2)
+    service = BrandService(availability_provider=MockAvailabilityProvider())
+    hot = service._get_candidate_index('Modern', 'Technology')
+    service._get_candidate_index('Modern', 'Food')
+    # A hit keeps the pair from being the next one evicted
+    assert service._get_candidate_index('Modern', 'Technology') is hot
+    service._get_candidate_index('Modern', 'Travel')
+
+    assert service._get_candidate_index('Modern', 'Technology') is hot
+    assert [key[1:] for key in service._candidate_indexes] == [('Modern', 'Travel'), ('Modern', 'Technology')]
@@ -0,0 +1,25 @@
+"""
+Lexicon Service Tests
+Word list validation
+"""
+import pytest
+
+from services.lexicon_service import DEFAULT_INDUSTRY_WORDS, Lexicon, LexiconError, StaticLexicon, build_lexicon
+
+
+def test_lists_without_a_complete_tone_are_rejected():
+    with pytest.raises(LexiconError, match='no tone has both a prefix and a suffix list'):
+        StaticLexicon(prefixes={'Modern': ['Apex']}, suffixes={'Playful': ['pop']})
+    with pytest.raises(LexiconError, match='no industry word lists'):
+        StaticLexicon(industry_words={})
+
+
+def test_bad_source_does_not_replace_a_lexicon_file(tmp_path):
+    path = str(tmp_path / 'words.lex')
+    build_lexicon({'prefix': {'Modern': ['Apex']}, 'suffix': {'Modern': ['ify']},
+                   'industry': DEFAULT_INDUSTRY_WORDS}, path)
+
+    with pytest.raises(LexiconError):
+        build_lexicon({'prefix': {'Modern': ['Apex']}, 'suffix': {'Modern': ['  ']},
+                       'industry': DEFAULT_INDUSTRY_WORDS}, path)
+    assert list(Lexicon(path).words('suffix')['Modern']) == ['ify']
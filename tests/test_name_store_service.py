@@ -0,0 +1,57 @@
+"""
+Name Store Service Tests
+Search bounds, ordering and read connections
+"""
+import threading
+import time
+
+from services.brand_service import BrandNameRecord
+from services.name_store_service import NameStore
+
+
+def _record(name, stamp=0):
+    return BrandNameRecord(0, stamp, name, 'Technology', 'Modern', 80, 90, 70, 0)
+
+
+def test_prefix_ending_in_last_code_point(tmp_path):
+    store = NameStore(str(tmp_path / 'names.db'))
+    store.add([_record('Nexora'), _record('Nexora\U0010ffffX')])
+    store.flush(5)
+
+    assert [entry['name'] for entry in store.search(prefix='nexora\U0010ffff')] == ['Nexora\U0010ffffX']
+    assert store.search(prefix='\U0010ffff') == []
+    store.close()
+
+
+def test_recent_orders_by_last_seen(tmp_path):
+    store = NameStore(str(tmp_path / 'names.db'))
+    # Seeded records carry a hash as their stamp, not a time
+    store.add([_record('Apex', stamp=2 ** 47), _record('Nexora', stamp=1)])
+    store.flush(5)
+    time.sleep(0.01)
+    store.add([_record('Apex', stamp=2 ** 47)])
+    store.flush(5)
+
+    names = store.search(sort='recent')
+    assert [entry['name'] for entry in names] == ['Apex', 'Nexora']
+    assert names[0]['count'] == 2
+    assert names[0]['lastSeen'] >= names[1]['lastSeen']
+    store.close()
+
+
+def test_searches_on_new_threads_reuse_read_connections(tmp_path, monkeypatch):
+    store = NameStore(str(tmp_path / 'names.db'), max_readers=2)
+    store.add([_record('Apex')])
+    store.flush(5)
+    opened = []
+    connect = store._connect
+    monkeypatch.setattr(store, '_connect', lambda: opened.append(1) or connect())
+
+    # As under a threaded server: every request runs on a thread of its own
+    for _ in range(20):
+        thread = threading.Thread(target=store.search, kwargs={'prefix': 'ap'})
+        thread.start()
+        thread.join()
+
+    assert len(opened) == 1
+    store.close()
@@ -0,0 +1,113 @@
+"""
+Rate Limit Tests
+Token buckets, endpoint costs and the shared store
+"""
+import multiprocessing
+
+import pytest
+from flask import Flask, jsonify
+
+from utils.rate_limit import Limit, MemoryStore, RateLimiter, SharedFileStore, init_rate_limiting
+
+
+def test_bucket_allows_capacity_then_denies():
+    limiter = RateLimiter(MemoryStore(), '10/minute')
+
+    results = [limiter.check('1.2.3.4', 'brand.generate_brand_names', 1, now=1000.0) for _ in range(11)]
+
+    assert [result.allowed for result in results] == [True] * 10 + [False]
+    assert [result.remaining for result in results[:3]] == [9, 8, 7]
+    # One token refills every 6 seconds
+    assert results[-1].retry_after == pytest.approx(6.0)
+    assert limiter.check('1.2.3.4', 'brand.generate_brand_names', 1, now=1005.0).allowed is False
+    assert limiter.check('1.2.3.4', 'brand.generate_brand_names', 1, now=1006.0).allowed is True
+    # Other clients have their own bucket
+    assert limiter.check('5.6.7.8', 'brand.generate_brand_names', 1, now=1000.0).allowed is True
+
+
+def test_route_limit_has_its_own_bucket():
+    limiter = RateLimiter(MemoryStore(), '2/minute', routes={'brand.generate_brand_names': '5/minute'})
+
+    assert all(limiter.check('c', 'brand.generate_brand_names', 1, now=0.0).allowed for _ in range(5))
+    assert limiter.check('c', 'brand.generate_brand_names', 1, now=0.0).allowed is False
+    assert limiter.check('c', 'brand.get_suggestions', 2, now=0.0).allowed is True
+
+
+def test_cost_above_capacity_is_denied_and_takes_nothing():
+    limiter = RateLimiter(MemoryStore(), '100/hour')
+
+    assert limiter.check('c', 'brand.generate_brand_names_batch', 1000, now=0.0).allowed is False
+    result = limiter.check('c', 'brand.generate_brand_names', 100, now=0.0)
+    assert result.allowed is True
+    assert result.remaining == 0
+
+
+@pytest.mark.parametrize('endpoint, data, cost', [
+    ('brand.generate_brand_names', {}, 1),
+    ('brand.generate_brand_names', {'count': 10}, 1),
+    ('brand.generate_brand_names', {'count': 11}, 2),
+    ('brand.generate_brand_names', {'count': 500}, 5),
+    ('brand.generate_brand_names', {'count': 'many'}, 1),
+    ('brand.generate_brand_names', {'count': 20, 'ranked': True}, 4),
+    ('brand.generate_brand_names_batch', {'jobs': [{'count': 10}, {'count': 50, 'ranked': True}, 'x']}, 11),
+    ('brand.generate_brand_names_batch', {'jobs': 'x'}, 1),
+    ('brand.check_availability_batch', {'names': ['n'] * 25}, 3),
+    ('brand.check_availability_batch', {'names': []}, 1),
+    ('generate_palette_batch', {'jobs': [{}] * 10}, 1),
+    ('generate_content_batch', {'jobs': [{}] * 11}, 2),
+    ('health', {}, 0),
+    ('metrics', {}, 0),
+    ('brand.get_suggestions', {}, 1),
+])
+def test_endpoint_costs(endpoint, data, cost):
+    assert RateLimiter(MemoryStore(), '100/hour').cost(endpoint, data) == cost
+
+
+@pytest.fixture
+def limited_app():
+    app = Flask(__name__)
+    app.config.update(RATE_LIMIT_DEFAULT='2/minute', RATE_LIMIT_SLOTS=1024)
+
+    @app.route('/api/content/generate/batch', methods=['POST'], endpoint='generate_content_batch')
+    def generate_content_batch():
+        return jsonify({'success': True})
+
+    init_rate_limiting(app)
+    return app
+
+
+def test_denied_request_gets_429_with_retry_after(limited_app):
+    client = limited_app.test_client()
+    responses = [client.post('/api/content/generate/batch', json={'jobs': [{}]}) for _ in range(3)]
+
+    assert [response.status_code for response in responses] == [200, 200, 429]
+    assert responses[0].headers['X-RateLimit-Limit'] == '2'
+    assert responses[0].headers['X-RateLimit-Remaining'] == '1'
+    assert int(responses[2].headers['Retry-After']) == 30
+    assert responses[2].get_json()['error'] == 'Rate limit exceeded'
+
+
+def test_request_above_capacity_gets_413(limited_app):
+    client = limited_app.test_client()
+
+    response = client.post('/api/content/generate/batch', json={'jobs': [{}] * 30})
+    assert response.status_code == 413
+    assert 'Retry-After' not in response.headers
+    # Nothing was taken from the bucket
+    assert client.post('/api/content/generate/batch', json={'jobs': [{}] * 20}).status_code == 200
+
+
+def _hit_shared(path, count):
+    store = SharedFileStore(path, slots=64)
+    limit = Limit('20/hour')
+    return sum(store.hit('*|1.2.3.4', limit, 1, 1000.0)[0] for _ in range(count))
+
+
+def test_shared_store_is_shared_across_processes(tmp_path):
+    path = str(tmp_path / 'ratelimit')
+    with multiprocessing.get_context('fork').Pool(4) as pool:
+        allowed = pool.starmap(_hit_shared, [(path, 10)] * 4)
+
+    assert sum(allowed) == 20
+    # The bucket is empty for this process too
+    assert _hit_shared(path, 1) == 0
@@ -0,0 +1,34 @@
+"""
+Trademark Service Tests
+Bounded edit distance search
+"""
+import random
+
+import pytest
+
+from services.trademark_service import MAX_DISTANCE, TrademarkIndex
+
+
+def _distance(a, b):
+    row = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        previous, row[0] = row[0], i
+        for j, cb in enumerate(b, 1):
+            previous, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, previous + (ca != cb))
+    return row[-1]
+
+
+@pytest.mark.parametrize('max_distance', range(1, MAX_DISTANCE + 1))
+def test_search_finds_every_mark_within_max_distance(max_distance):
+    rng = random.Random(7)
+    # A small alphabet, so that many marks are near each other
+    marks = sorted({''.join(rng.choice('abc') for _ in range(rng.randint(1, 7))) for _ in range(400)})
+    index = TrademarkIndex()
+    for mark in marks:
+        index.add(mark)
+
+    queries = marks[::7] + [''.join(rng.choice('abcd') for _ in range(rng.randint(1, 8))) for _ in range(60)]
+    for query in queries:
+        found = index.search(query, max_distance=max_distance, limit=len(marks))
+        within = {match['mark'] for match in found if match['distance'] <= max_distance}
+        assert within == {mark for mark in marks if _distance(query, mark) <= max_distance}, query
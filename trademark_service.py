@@ -0,0 +1,360 @@
+"""
+Trademark Service
+Similarity index over a registry of existing marks for conflict screening
+"""
+import gzip
+import heapq
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional - candidates are verified one by one instead
+    np = None
+
+MAX_DISTANCE = 2  # largest edit distance the segment index can answer
+PHONETIC_SLACK = 2  # extra edits allowed for marks that sound the same
+VECTOR_MIN_CANDIDATES = 64  # verify with numpy from this many candidates on
+_VECTOR_MAX_LENGTH = 63  # longest label the uint64 bit-vector path handles
+
+# Consonant classes for the phonetic key (vowels, h, w and y are dropped
+# after the first letter). Finer than Soundex so that buckets stay small
+# on large registries: only letters that are commonly confused share a code.
+_PHONETIC_CODES = {
+    **dict.fromkeys('bp', 'p'),
+    **dict.fromkeys('fv', 'f'),
+    **dict.fromkeys('cgkq', 'k'),
+    'j': 'j',
+    **dict.fromkeys('sz', 's'),
+    **dict.fromkeys('dt', 't'),
+    'l': 'l',
+    'm': 'm',
+    'n': 'n',
+    'r': 'r',
+}
+# Spellings that sound alike, folded before coding
+_PHONETIC_FOLDS = (('ph', 'f'), ('ck', 'k'), ('gh', 'g'), ('kn', 'n'), ('wr', 'r'), ('qu', 'kw'),
+                   ('ce', 'se'), ('ci', 'si'), ('cy', 'sy'), ('x', 'ks'))
+
+
+def mark_label(name):
+    """Lowercase letters and digits only - the form marks are compared in"""
+    return ''.join(c for c in name.lower() if c.isalnum())
+
+
+def phonetic_key(label):
+    """
+    Soundex-style key of a label: first letter plus consonant-class codes
+    with vowels dropped and repeats collapsed, e.g. 'nexus' and 'nexxus'
+    both give 'nkss'. Digits are kept as-is.
+    """
+    if not label:
+        return ''
+    # Doubled letters sound single
+    label = ''.join(c for i, c in enumerate(label) if i == 0 or c != label[i - 1])
+    for spelling, sound in _PHONETIC_FOLDS:
+        label = label.replace(spelling, sound)
+    key = [label[0]]
+    last = _PHONETIC_CODES.get(label[0])
+    for c in label[1:]:
+        code = _PHONETIC_CODES.get(c, c if c.isdigit() else None)
+        if code is not None and code != last:
+            key.append(code)
+        if c not in 'hw':
+            last = code
+    return ''.join(key)
+
+
+def default_max_distance(label):
+    """Edit distance that still counts as confusingly similar for a label's length"""
+    if len(label) <= 3:
+        return 0
+    if len(label) <= 6:
+        return 1
+    return 2
+
+
+def _pattern(a):
+    """Per-character position bitmasks of a, for _levenshtein"""
+    peq = {}
+    for i, c in enumerate(a):
+        peq[c] = peq.get(c, 0) | (1 << i)
+    return peq
+
+
+def _levenshtein(peq, m, b):
+    """Levenshtein distance of a pattern (from _pattern, length m) and b - Myers' bit-vector algorithm"""
+    if m == 0:
+        return len(b)
+    full = (1 << m) - 1
+    last = 1 << (m - 1)
+    pv, mv, score = full, 0, m
+    get = peq.get
+    for c in b:
+        eq = get(c, 0)
+        xv = eq | mv
+        xh = ((((eq & pv) + pv) & full) ^ pv) | eq
+        ph = mv | (~(xh | pv) & full)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = ((ph << 1) | 1) & full
+        mh = (mh << 1) & full
+        pv = mh | (~(xv | ph) & full)
+        mv = ph & xv
+    return score
+
+
+def bounded_levenshtein(a, b, limit):
+    """Levenshtein distance of a and b, or limit + 1 if it exceeds limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    return min(_levenshtein(_pattern(a), len(a), b), limit + 1)
+
+
+def _levenshtein_rows(table, m, rows):
+    """_levenshtein of one pattern against every row of an equal-length uint8 matrix"""
+    full = np.uint64((1 << m) - 1)
+    last = np.uint64(1 << (m - 1))
+    one = np.uint64(1)
+    pv = np.full(len(rows), full, dtype=np.uint64)
+    mv = np.zeros(len(rows), dtype=np.uint64)
+    score = np.full(len(rows), m, dtype=np.int64)
+    for j in range(rows.shape[1]):
+        eq = table[rows[:, j]]
+        xv = eq | mv
+        xh = ((((eq & pv) + pv) & full) ^ pv) | eq
+        ph = mv | (~(xh | pv) & full)
+        mh = pv & xh
+        score += (ph & last) != 0
+        score -= (mh & last) != 0
+        ph = ((ph << one) | one) & full
+        mh = (mh << one) & full
+        pv = mh | (~(xv | ph) & full)
+        mv = ph & xv
+    return score
+
+
+def _segments(length, k):
+    """
+    (start, size) of the k + 1 segments a label of this length is split
+    into for distance-k search; later segments take the remainder
+    """
+    parts = min(k + 1, length)
+    base, extra = divmod(length, parts)
+    segments = []
+    start = 0
+    for i in range(parts):
+        size = base + (1 if i >= parts - extra else 0)
+        segments.append((start, size))
+        start += size
+    return tuple(segments)
+
+
+class TrademarkIndex:
+    """
+    In-memory index of registered marks.
+
+    Two structures answer a query:
+    - a (length, phonetic key) -> mark ids map, for sound-alikes
+    - a segment index for marks within a bounded edit distance
+
+    For each k up to MAX_DISTANCE every mark is also split into k + 1
+    segments. k edits can touch at most k of them, so a mark within k
+    edits of a query has a segment that appears unchanged in the query,
+    shifted by at most k positions (narrowed further as in Pass-Join). A
+    query therefore looks up each segment slot of each mark length within
+    k of its own, at each allowed shift - a few dozen dict lookups - and
+    verifies the marks found with a bit-parallel Levenshtein, vectorized
+    over all candidates of a length when numpy is installed.
+
+    Marks of at most k characters cannot be split into k + 1 segments;
+    they are kept in one list per length and all checked.
+    """
+
+    def __init__(self):
+        self.marks = []       # id -> registered form
+        self.classes = []     # id -> Nice class string or None
+        self._labels = []     # id -> mark_label form
+        self._exact = {}      # label -> [ids]
+        self._phonetic = {}   # chr(length) + phonetic key -> [ids]
+        self._postings = {}   # chr(length) + chr(k) + chr(segment) + segment text -> [ids]
+        self._short = {}      # length -> [ids] of marks no longer than MAX_DISTANCE
+        self._matrix = None   # numpy (labels as padded byte rows, lengths), built on first use
+
+    def __len__(self):
+        return len(self.marks)
+
+    def add(self, mark, nice_class=None):
+        """Index one mark; marks with no letters or digits are skipped"""
+        label = mark_label(mark)
+        if not label:
+            return
+        mark_id = len(self.marks)
+        self._matrix = None
+        self.marks.append(mark)
+        self.classes.append(nice_class)
+        self._labels.append(label)
+        self._exact.setdefault(label, []).append(mark_id)
+        length = chr(len(label))
+        self._phonetic.setdefault(length + phonetic_key(label), []).append(mark_id)
+        if len(label) <= MAX_DISTANCE:
+            self._short.setdefault(len(label), []).append(mark_id)
+        for k in range(1, min(MAX_DISTANCE, len(label) - 1) + 1):
+            for i, (start, size) in enumerate(_segments(len(label), k)):
+                self._postings.setdefault(length + chr(k) + chr(i) + label[start:start + size], []).append(mark_id)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Build an index from a registry file (optionally .gz): one mark per
+        line, optionally followed by a tab and its class; '#' lines are skipped
+        """
+        index = cls()
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                line = line.rstrip('\n')
+                if not line or line.startswith('#'):
+                    continue
+                mark, _, nice_class = line.partition('\t')
+                index.add(mark.strip(), nice_class.strip() or None)
+        return index
+
+    def search(self, name, max_distance=None, limit=5):
+        """
+        Nearest registered marks for a name, closest first.
+
+        Returns [{'mark', 'class', 'distance', 'phonetic'}, ...] for marks
+        within `max_distance` edits (default: by length, see
+        default_max_distance) plus marks of about the same length with the
+        same phonetic key that are within PHONETIC_SLACK further edits.
+        """
+        label = mark_label(name)
+        if not label:
+            return []
+        k = default_max_distance(label) if max_distance is None else max_distance
+        if not 0 <= k <= MAX_DISTANCE:
+            raise ValueError(f'max_distance must be between 0 and {MAX_DISTANCE}')
+
+        edit = self._edit_candidates(label, k) if k > 0 else ()
+        phonetic_ids = set()
+        key = phonetic_key(label)
+        for length in range(max(1, len(label) - 1), len(label) + 2):
+            phonetic_ids.update(self._phonetic.get(chr(length) + key, ()))
+        distances = self._distances(label, set(edit) | phonetic_ids)
+
+        found = {mark_id: 0 for mark_id in self._exact.get(label, ())}  # id -> distance
+        found.update((mark_id, distances[mark_id]) for mark_id in edit if distances[mark_id] <= k)
+        # Sound-alikes within PHONETIC_SLACK extra edits also conflict
+        phonetic = {mark_id for mark_id in phonetic_ids if distances[mark_id] <= k + PHONETIC_SLACK}
+        found.update((mark_id, distances[mark_id]) for mark_id in phonetic)
+
+        ranked = heapq.nsmallest(limit, found.items(), key=lambda item: (item[1], item[0] not in phonetic, item[0]))
+        return [
+            {
+                'mark': self.marks[mark_id],
+                'class': self.classes[mark_id],
+                'distance': distance,
+                'phonetic': mark_id in phonetic
+            }
+            for mark_id, distance in ranked
+        ]
+
+    def search_bulk(self, names, max_distance=None, limit=5):
+        """{name: search(name)} for many names; repeated labels are searched once"""
+        by_label = {}
+        results = {}
+        for name in names:
+            label = mark_label(name)
+            if label not in by_label:
+                by_label[label] = self.search(name, max_distance, limit)
+            results[name] = by_label[label]
+        return results
+
+    def conflicting(self, names, max_distance=None):
+        """The subset of names that have at least one conflict"""
+        return {name for name, matches in self.search_bulk(names, max_distance, 1).items() if matches}
+
+    def stats(self):
+        return {
+            'marks': len(self.marks),
+            'phoneticKeys': len(self._phonetic),
+            'postingLists': len(self._postings)
+        }
+
+    def _distances(self, label, ids):
+        """{id: Levenshtein distance to label} for candidate mark ids"""
+        if not ids:
+            return {}
+        peq = _pattern(label)
+        m = len(label)
+        if np is None or len(ids) < VECTOR_MIN_CANDIDATES or m > _VECTOR_MAX_LENGTH or not label.isascii():
+            labels = self._labels
+            return {mark_id: _levenshtein(peq, m, labels[mark_id]) for mark_id in ids}
+
+        rows, lengths = self._label_matrix()
+        ids = np.fromiter(ids, dtype=np.int64, count=len(ids))
+        # Rows of non-ASCII or very long labels have length 0 and are scored one by one
+        scalar = ids[lengths[ids] == 0]
+        distances = {int(mark_id): _levenshtein(peq, m, self._labels[mark_id]) for mark_id in scalar.tolist()}
+        table = np.zeros(256, dtype=np.uint64)
+        for c, bits in peq.items():
+            table[ord(c)] = bits
+        id_lengths = lengths[ids]
+        for length in np.unique(id_lengths[id_lengths > 0]).tolist():
+            group = ids[id_lengths == length]
+            scores = _levenshtein_rows(table, m, rows[group, :length])
+            distances.update(zip(group.tolist(), scores.tolist()))
+        return distances
+
+    def _label_matrix(self):
+        """Labels as a zero-padded uint8 matrix plus lengths (0 for labels left to the scalar path)"""
+        if self._matrix is None:
+            width = max((len(label) for label in self._labels if len(label) <= _VECTOR_MAX_LENGTH), default=1)
+            eligible = [label.isascii() and len(label) <= _VECTOR_MAX_LENGTH for label in self._labels]
+            encoded = np.array(
+                [label if ok else '' for label, ok in zip(self._labels, eligible)],
+                dtype=f'S{width}'
+            )
+            rows = encoded.view(np.uint8).reshape(len(self._labels), width)
+            lengths = np.array([len(label) if ok else 0 for label, ok in zip(self._labels, eligible)], dtype=np.int64)
+            self._matrix = (rows, lengths)
+        return self._matrix
+
+    def _edit_candidates(self, label, k):
+        postings_get = self._postings.get
+        size_q = len(label)
+        candidates = set()
+        for length in range(max(1, size_q - k), size_q + k + 1):
+            if length <= k:
+                # Too short to split into k + 1 segments, and few: check them all
+                candidates.update(self._short.get(length, ()))
+                continue
+            prefix = chr(length) + chr(k)
+            delta = size_q - length
+            for i, (start, size) in enumerate(_segments(length, k)):
+                key = prefix + chr(i)
+                # Pass-Join window: the first unchanged segment has at most i
+                # edits before it and at most k - i after it
+                low = max(0, start - i, start + delta - (k - i))
+                high = min(size_q - size, start + i, start + delta + (k - i))
+                for shifted in range(low, high + 1):
+                    ids = postings_get(key + label[shifted:shifted + size])
+                    if ids:
+                        candidates.update(ids)
+        return candidates
+
+
+def create_trademark_index(config):
+    """Load the registry named by TRADEMARK_REGISTRY_PATH, or None if unset"""
+    if not config.TRADEMARK_REGISTRY_PATH:
+        return None
+    started = time.perf_counter()
+    index = TrademarkIndex.load(config.TRADEMARK_REGISTRY_PATH)
+    if np is not None:
+        index._label_matrix()  # build it now rather than on the first request
+    print(f'✅ Loaded {len(index)} trademarks in {time.perf_counter() - started:.1f}s', file=sys.stderr)
+    return index